@@ -71,12 +71,24 @@ class FinanceAgent:
     def get_multiple_prices(self, symbols: list):
         return self.tool.get_multiple_prices(symbols)
 
+    def get_market_overview(self, symbols: list, days=None):
+        return self.tool.get_market_overview(symbols, days)
+
     def get_flight_price(self, origin, dest, departure, return_date=None):
         return self.tool.get_flight_price(origin, dest, departure, return_date)
 
+    def get_flight_matrix(self, origin, dest, departure, return_date=None, **kwargs):
+        return self.tool.get_flight_matrix(origin, dest, departure, return_date, **kwargs)
+
+    def get_exchange_rate(self, from_currency="USD", to_currency="INR"):
+        return self.tool.get_exchange_rate(from_currency, to_currency)
+
     def get_hotel_price(self, city, checkin, checkout):
         return self.tool.get_hotel_price(city, checkin, checkout)
 
+    def search_hotels(self, city, checkin, checkout, pages=None):
+        return self.tool.search_hotels(city, checkin, checkout, pages)
+
     def get_city_cost(self, city):
         return self.tool.get_city_cost(city)
 
@@ -2,13 +2,14 @@ from langchain.agents import initialize_agent, Tool, AgentType
 from tools.search_tool import get_search_tool
 from config import Config
 
-def get_planner_agent():
+def get_planner_agent(search=None):
     """Agent that breaks user goals into actionable steps."""
-    llm = Config.get_llm(provider="groq") # Planner works best with Groq/Llama3
+    llm = Config.get_llm(provider=Config.PLANNER_LLM_PROVIDER)
+    search = search or get_search_tool()
 
     search_tool = Tool(
         name="Search",
-        func=get_search_tool().run,
+        func=search.run,
         description="Use this to look up general information online."
     )
 
@@ -18,6 +19,6 @@ def get_planner_agent():
         tools,
         llm,
         agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-        verbose=True,
+        verbose=False,  # steps are logged per run instead (NeuroOrchestrator.run(verbose=True))
         handle_parsing_errors=True
     )
@@ -0,0 +1,38 @@
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from utils import get_logger
+
+logger = get_logger("Agents")
+
+
+class AgentStepLogger(BaseCallbackHandler):
+    """
+    Logs each agent step (tool calls and their results, completions, the final
+    answer) through the logging queue, for runs with verbose=True. Replaces
+    LangChain's verbose mode, which prints every step to stdout from the
+    calling thread.
+    """
+
+    run_inline = True  # only enqueues records; no need for a worker thread
+
+    def on_agent_action(self, action, **kwargs: Any) -> None:
+        logger.info("Agent action %s: %.200s", action.tool, action.tool_input)
+
+    def on_tool_end(self, output: Any, **kwargs: Any) -> None:
+        logger.info("Tool result: %.300s", output)
+
+    def on_llm_end(self, response, **kwargs: Any) -> None:
+        text = "".join(g.text for gens in response.generations for g in gens)
+        logger.info("Completion: %d chars", len(text))
+        logger.debug("Completion text: %.500s", text)
+
+    def on_agent_finish(self, finish, **kwargs: Any) -> None:
+        logger.info("Agent finished: %.300s", finish.return_values.get("output"))
+
+    def on_chain_error(self, error: BaseException, **kwargs: Any) -> None:
+        logger.warning("Chain error: %s", error)
+
+    def on_tool_error(self, error: BaseException, **kwargs: Any) -> None:
+        logger.warning("Tool error: %s", error)
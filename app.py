@@ -7,11 +7,20 @@ from typing import Dict, Any
 
 from config import Config
 from orchestrator import NeuroOrchestrator
+from memory.mission_store import get_mission_store
 from tools.finance_tool import FinanceTool
+from tools.budget_engine import BudgetEngine
+from tools.cache_warmer import start_prewarm
+from tools.ollama_client import start_warm_up
 
 # Apply nest_asyncio for async loop in Streamlit
 nest_asyncio.apply()
 
+# Preload local models when the app starts (once per process; no-op unless a provider is ollama)
+start_warm_up()
+# Fill the price caches for popular destinations in the background (no-op unless PREWARM_ON_START)
+start_prewarm()
+
 # Page Config
 st.set_page_config(
     page_title="NeuroNavigator | AI Travel Assistant",
@@ -98,7 +107,27 @@ with st.sidebar:
     status_chk("Groq API", Config.GROQ_API_KEY)
     status_chk("OpenAI API", Config.OPENAI_API_KEY)
     status_chk("Amadeus API", Config.AMADEUS_CLIENT_ID)
+    verbose_agents = st.checkbox("Log agent steps", value=Config.AGENT_VERBOSE,
+                                 help="Log every agent step of the next mission (tool calls, completions)")
     
+    # Mission history: replay a stored mission, or re-run it with a new budget/dates
+    st.markdown("---")
+    st.subheader("🗂️ Mission History")
+    history = get_mission_store().recent() if Config.MISSION_STORE_ENABLED else []
+    replay_btn = rerun_btn = False
+    if history:
+        past = st.selectbox("Previous missions", history,
+                            format_func=lambda m: f"{m['goal'][:40]} ({m['status']})")
+        replay_btn = st.button("⏪ Replay", use_container_width=True)
+        with st.expander("Re-run with changes"):
+            new_budget = st.number_input("Budget (USD, 0 = as stated)", min_value=0.0, step=100.0)
+            change_dates = st.checkbox("Change dates")
+            new_departure = st.date_input("Departure", disabled=not change_dates)
+            new_days = st.number_input("Days (0 = as planned)", min_value=0, step=1)
+            rerun_btn = st.button("🔁 Re-run changed stages", use_container_width=True)
+    else:
+        st.caption("Completed missions appear here.")
+
     st.markdown("---")
     st.info("💡 **Tip:** Use specific goals like *'7-day trip to Tokyo with $2000'* for best results.")
     st.markdown("---")
@@ -124,13 +153,14 @@ _, user_currency = ft.detect_currency(goal)
 
 
 # --- Orchestration Logic ---
-if run_btn and goal:
+if (run_btn and goal) or replay_btn or rerun_btn:
     st.divider()
     
     # State containers
     status_container = st.status("🚀 **Mission Control Active**", expanded=True)
     
     # Layout for results
+    market_ph = st.empty()
     col_plan, col_research = st.columns(2)
     col_finance, col_exec = st.columns(2)
     
@@ -138,6 +168,7 @@ if run_btn and goal:
     with col_plan:
         st.subheader("📝 Strategic Plan")
         plan_ph = st.empty()
+        weather_ph = st.empty()
     with col_research:
         st.subheader("🔍 Intelligence")
         research_ph = st.empty()
@@ -154,8 +185,39 @@ if run_btn and goal:
         
         status_container.write("🧠 Agents coordinating...")
         
+        streamed = {"research": [], "execution": []}
+
+        if replay_btn:
+            events = orchestrator.replay(past["id"], realtime=True)
+        elif rerun_btn:
+            dates = {"departure": new_departure.isoformat() if change_dates else None, "days": int(new_days) or None}
+            events = orchestrator.rerun(past["id"],
+                                        budget={"amount": new_budget, "currency": "USD"} if new_budget else None,
+                                        dates=dates if any(dates.values()) else None,
+                                        verbose=verbose_agents)
+        else:
+            events = orchestrator.run(goal, verbose=verbose_agents)
+
         try:
-            async for label, data in orchestrator.run(goal):
+            async for label, data in events:
+                # 0. PARTIAL - render list items while the agent is still generating
+                if label == "partial":
+                    if data["stage"] == "execution":
+                        streamed["execution"].append(data["item"])
+                        with exec_ph.container():
+                            for day_plan in streamed["execution"]:
+                                if isinstance(day_plan, dict):
+                                    with st.expander(f"📅 {day_plan.get('day', 'Day')}", expanded=False):
+                                        for act in day_plan.get("activities", []):
+                                            st.markdown(f"- {act}")
+                            st.caption("⏳ Generating remaining days...")
+                    elif data["stage"] == "research" and data["key"] == "insights":
+                        streamed["research"].append(data["item"])
+                        with research_ph.container():
+                            for insight in streamed["research"]:
+                                st.success(f"📌 {insight}")
+                    continue
+
                 results[label] = data
                 
                 # Update Status
@@ -173,6 +235,32 @@ if run_btn and goal:
                         else:
                             st.write(data)
 
+                # 1a. MARKET - prices and trends from the local price history
+                elif label == "market":
+                    with market_ph.container():
+                        st.subheader("📈 Market")
+                        for symbol, info in data.items():
+                            if not isinstance(info, dict) or "price" not in info:
+                                st.caption(f"{symbol}: {info.get('error') if isinstance(info, dict) else info}")
+                                continue
+                            c1, c2, c3 = st.columns([1, 1, 3])
+                            change = info.get("change_pct")
+                            c1.metric(symbol, f"{info['price']:,}", delta=f"{change:+.1f}%" if change is not None else None)
+                            c2.caption(f"As of {info.get('as_of')}  \nRSI 14: {info.get('rsi_14')}  \n"
+                                       f"SMA 20/50: {info.get('sma_20')} / {info.get('sma_50')}")
+                            if info.get("history"):
+                                c3.line_chart(pd.DataFrame(info["history"]).set_index("date")["close"], height=120)
+
+                # 1b. WEATHER - forecast for the trip dates, resolved alongside the plan
+                elif label == "weather":
+                    with weather_ph.container():
+                        if data.get("daily"):
+                            st.caption(f"🌦️ Forecast for {data.get('location')}"
+                                       + (f" ({data['note']})" if data.get("note") else ""))
+                            st.dataframe(pd.DataFrame(data["daily"]), hide_index=True, use_container_width=True)
+                        else:
+                            st.caption(f"🌦️ {data.get('error', 'Forecast unavailable')}")
+
                 # 2. RESEARCH
                 elif label == "research":
                     with research_ph.container():
@@ -210,6 +298,9 @@ if run_btn and goal:
                             
                             # API Sources
                             st.caption(f"Sources: {', '.join(data.get('sources', []))}")
+                            # Keep the fetched prices for the what-if panel below
+                            if data.get("scenario_inputs"):
+                                st.session_state["scenario_inputs"] = data["scenario_inputs"]
                         else:
                             st.write(data)
 
@@ -237,3 +328,39 @@ if run_btn and goal:
 
 elif run_btn and not goal:
     st.warning("⚠️ Please define a mission objective.")
+
+# --- What-if Budgets ---
+# Sweeps run on the last mission's fetched prices, so changing a control costs no API calls
+if st.session_state.get("scenario_inputs"):
+    engine = BudgetEngine.from_dict(st.session_state["scenario_inputs"])
+    st.divider()
+    st.subheader("🧮 What-if Budgets")
+
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        day_range = st.slider("Trip length (days)", 1, Config.BUDGET_SWEEP_MAX_DAYS, (3, 14))
+        travelers = st.slider("Travelers", 1, 8, (1, 2))
+    with c2:
+        tiers = st.multiselect("Hotel tiers", list(engine.hotel_tiers), default=list(engine.hotel_tiers))
+        flight = st.selectbox("Flight option", list(engine.flights))
+    with c3:
+        currency = st.selectbox("Currency", list(engine.rates))
+        limit = st.number_input(f"Budget limit ({currency})", min_value=0.0, value=2000.0, step=100.0)
+
+    if tiers:
+        table = engine.sweep(range(day_range[0], day_range[1] + 1), tiers=tiers,
+                             travelers=range(travelers[0], travelers[1] + 1), currencies=[currency], flights=[flight])
+        chart = alt.Chart(table).mark_line(point=True).encode(
+            x=alt.X("days:Q", title="Days"),
+            y=alt.Y("total:Q", title=f"Total ({currency})"),
+            color="hotel_tier:N",
+            strokeDash="travelers:N",
+            tooltip=["days", "hotel_tier", "travelers", "total", "per_person", "per_day"]
+        ).properties(height=280)
+        rule = alt.Chart(pd.DataFrame({"limit": [limit]})).mark_rule(color="#e45756").encode(y="limit:Q")
+        st.altair_chart(chart + rule, use_container_width=True)
+
+        fits = engine.max_days_under(limit, currency=currency, tiers=tiers,
+                                     travelers=range(travelers[0], travelers[1] + 1), flights=[flight])
+        st.caption(f"Longest trip under {limit:,.0f} {currency}")
+        st.dataframe(fits.drop(columns="flight"), hide_index=True, use_container_width=True)
@@ -0,0 +1,110 @@
+"""
+Micro-benchmark: GoalAnalyzer against the previous per-function goal scanning.
+
+    python -m benchmarks.bench_goal_analyzer --universe-size 5000
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import timeit
+from typing import Any, Dict, List
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from goal_analyzer import GoalAnalyzer, get_goal_analyzer  # noqa: E402
+from benchmarks.run_benchmarks import RESULTS_DIR, write_results  # noqa: E402
+
+LEGACY_TICKERS = {
+    "apple": "AAPL", "tesla": "TSLA", "google": "GOOG", "microsoft": "MSFT", "bitcoin": "BTC-USD",
+    "ethereum": "ETH-USD", "btc": "BTC-USD", "eth": "ETH-USD", "nvidia": "NVDA", "meta": "META", "amazon": "AMZN"
+}
+LEGACY_CURRENCIES = {
+    "$": "USD", "usd": "USD", "dollar": "USD", "rupee": "INR", "₹": "INR", "inr": "INR",
+    "€": "EUR", "eur": "EUR", "euro": "EUR", "£": "GBP", "gbp": "GBP", "pound": "GBP",
+    "¥": "JPY", "jpy": "JPY", "yen": "JPY"
+}
+
+GOALS = [
+    "Plan a 7-day trip to Tokyo with $2,000",
+    "Weekend in Paris under 1500 euros for two people",
+    "2 weeks in New York City for ₹150000, mostly museums and food",
+    "Should I invest 2k USD in Apple, NVDA or Bitcoin this month?",
+    "Plan a relaxed 10 day honeymoon around Bali and Singapore with a budget of $4500",
+]
+
+
+def legacy_scan(goal: str, ticker_map: Dict[str, str] = LEGACY_TICKERS) -> Dict[str, Any]:
+    """The previous scans: ticker loop + regex, currency loop, duration and budget regexes."""
+    goal_lower = goal.lower()
+    tickers = [symbol for name, symbol in ticker_map.items() if name in goal_lower]
+    for pt in re.findall(r"\b[A-Z]{3,5}\b", goal):
+        if pt not in tickers and pt not in ["AND", "FOR", "THE", "WITH"]:
+            tickers.append(pt)
+
+    amount = re.findall(r"[\d,.]+", goal_lower)
+    currency = next((v for k, v in LEGACY_CURRENCIES.items() if k in goal_lower), "USD")
+    digits = re.findall(r"\d+", goal)
+    budget = re.search(r"\$(\d+)", goal)
+    return {
+        "tickers": list(set(tickers)),
+        "currency": currency,
+        "amount": amount[0] if amount else None,
+        "duration": int(digits[0]) if digits else 0,
+        "budget": int(budget.group(1)) if budget else 0,
+    }
+
+
+def synthetic_universe(size: int) -> Dict[str, Any]:
+    """A universe of `size` made-up companies, used to show how matching scales."""
+    return {
+        "tickers": {f"Z{i:04d}": [f"zcorp{i} industries"] for i in range(size)},
+        "currencies": {"USD": ["$", "dollars"], "EUR": ["€", "euros"], "INR": ["₹", "rupees"]},
+        "cities": [f"Town{i}" for i in range(size // 10)],
+    }
+
+
+def per_call_us(fn, goals: List[str], number: int) -> float:
+    timer = lambda: [fn(g) for g in goals]  # noqa: E731
+    return min(timeit.repeat(timer, number=number, repeat=3)) / (number * len(goals)) * 1e6
+
+
+def run(universe_size: int, number: int) -> Dict[str, Any]:
+    default = get_goal_analyzer()
+    synthetic = synthetic_universe(universe_size)
+    big = GoalAnalyzer(synthetic)
+    big_map = {names[0]: symbol for symbol, names in synthetic["tickers"].items()}
+
+    return {
+        "goals": len(GOALS),
+        "default_universe": {
+            "legacy_us": round(per_call_us(legacy_scan, GOALS, number), 2),
+            "analyzer_us": round(per_call_us(default.analyze, GOALS, number), 2),
+        },
+        "synthetic_universe": {
+            "size": universe_size,
+            "legacy_us": round(per_call_us(lambda g: legacy_scan(g, big_map), GOALS, number), 2),
+            "analyzer_us": round(per_call_us(big.analyze, GOALS, number), 2),
+            "build_ms": round(timeit.timeit(lambda: GoalAnalyzer(synthetic).analyze(""), number=1) * 1e3, 1),
+        },
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="GoalAnalyzer micro-benchmark")
+    parser.add_argument("--universe-size", type=int, default=5000, help="tickers in the synthetic universe")
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--out", default=RESULTS_DIR)
+    args = parser.parse_args(argv)
+
+    results = run(args.universe_size, args.number)
+    path = write_results(results, args.out, prefix="goal_analyzer")
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
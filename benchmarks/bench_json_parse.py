@@ -0,0 +1,104 @@
+"""
+Micro-benchmark: safe_json_parse against the previous regex-based implementation.
+
+    python -m benchmarks.bench_json_parse --days 30 --repeat 200
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import sys
+import timeit
+from typing import Any, Dict
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from utils import safe_json_parse  # noqa: E402
+from benchmarks.run_benchmarks import RESULTS_DIR, write_results  # noqa: E402
+
+
+def legacy_safe_json_parse(text: str) -> Dict[str, Any]:
+    """The pre-scanner implementation, kept for equivalence checks and comparison."""
+    if isinstance(text, dict):
+        return text
+
+    cleaned_text = re.sub(r"```json\s*", "", text)
+    cleaned_text = re.sub(r"```\s*", "", cleaned_text)
+    cleaned_text = cleaned_text.strip()
+
+    match = re.search(r"\{.*\}", cleaned_text, re.DOTALL)
+    if match:
+        cleaned_text = match.group(0)
+
+    try:
+        return json.loads(cleaned_text)
+    except json.JSONDecodeError:
+        try:
+            fixed = cleaned_text.replace("'", '"')
+            fixed = re.sub(r",\s*}", "}", fixed)
+            fixed = re.sub(r",\s*]", "]", fixed)
+            return json.loads(fixed)
+        except Exception:
+            try:
+                return ast.literal_eval(cleaned_text)
+            except Exception:
+                return {"raw_text": text}
+
+
+def make_itinerary(days: int, activities: int = 6) -> Dict[str, Any]:
+    return {
+        "itinerary": [
+            {
+                "day": f"Day {d + 1}",
+                "activities": [f"Morning visit {a + 1}: walk through the old town and try local food"
+                               for a in range(activities)]
+            }
+            for d in range(days)
+        ]
+    }
+
+
+def make_cases(days: int) -> Dict[str, str]:
+    body = json.dumps(make_itinerary(days), indent=2)
+    return {
+        "clean": body,
+        "markdown": f"```json\n{body}\n```",
+        "prose_after": f"{body}\n\nLet me know if you want to {{adjust}} anything.",
+        "trailing_commas": body.replace("\n    }", ",\n    }"),
+        "single_quotes": str(make_itinerary(days)),
+    }
+
+
+def run(days: int, repeat: int) -> Dict[str, Any]:
+    results = {"days": days, "repeat": repeat, "cases": {}}
+    for name, text in make_cases(days).items():
+        legacy = min(timeit.repeat(lambda: legacy_safe_json_parse(text), number=repeat, repeat=3)) / repeat
+        current = min(timeit.repeat(lambda: safe_json_parse(text), number=repeat, repeat=3)) / repeat
+        results["cases"][name] = {
+            "bytes": len(text),
+            "legacy_us": round(legacy * 1e6, 1),
+            "current_us": round(current * 1e6, 1),
+            "speedup": round(legacy / current, 2) if current else None,
+            "same_result": legacy_safe_json_parse(text) == safe_json_parse(text),
+        }
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="safe_json_parse micro-benchmark")
+    parser.add_argument("--days", type=int, default=30, help="itinerary length")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--out", default=RESULTS_DIR)
+    args = parser.parse_args(argv)
+
+    results = run(args.days, args.repeat)
+    path = write_results(results, args.out, prefix="json_parse")
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+import asyncio
+import hashlib
+import json
+import re
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+
+DESTINATIONS = ["Tokyo", "Paris", "London", "Rome", "Bangkok", "Lisbon", "Sydney", "Delhi"]
+
+
+def _destination_from(prompt: str) -> str:
+    """Pick a destination mentioned in the prompt, or a stable one derived from its hash."""
+    for city in DESTINATIONS:
+        if city.lower() in prompt.lower():
+            return city
+    digest = int(hashlib.md5(prompt.encode("utf-8")).hexdigest(), 16)
+    return DESTINATIONS[digest % len(DESTINATIONS)]
+
+
+def _days_from(prompt: str, default: int) -> int:
+    match = re.search(r"(\d+)[- ]day", prompt)
+    return int(match.group(1)) if match else default
+
+
+def _day_range(prompt: str, default: int) -> range:
+    """Day numbers an itinerary prompt asks for: "Days 6-10" or the whole trip."""
+    match = re.search(r"Days (\d+)-(\d+)", prompt)
+    if match:
+        return range(int(match.group(1)), int(match.group(2)) + 1)
+    return range(1, _days_from(prompt, default) + 1)
+
+
+def fake_completion(prompt: str, output_days: int = 5, activities_per_day: int = 3) -> str:
+    """
+    Deterministic completion shaped like the output each agent asks for.
+    The same prompt always yields the same text; output size scales with
+    the number of days and activities per day.
+    """
+    destination = _destination_from(prompt)
+    days = _days_from(prompt, output_days)
+
+    # ReAct planner: answer immediately without calling tools
+    if "Final Answer" in prompt:
+        plan = {
+            "destination": destination,
+            "duration": f"{days} days",
+            "steps": [f"Step {i + 1}: explore {destination}" for i in range(max(days, 1))]
+        }
+        return f"Thought: I now know the final answer.\nFinal Answer: {json.dumps(plan)}"
+
+    if "itinerary" in prompt:
+        payload = {
+            "itinerary": [
+                {
+                    "day": f"Day {d}",
+                    "activities": [f"{destination} activity {d}.{a + 1}" for a in range(activities_per_day)]
+                }
+                for d in _day_range(prompt, output_days)
+            ]
+        }
+    elif "insights" in prompt:
+        payload = {
+            "insights": [f"{destination} insight {i + 1}" for i in range(activities_per_day + 2)],
+            "sources": [f"https://example.com/{destination.lower()}/{i + 1}" for i in range(2)]
+        }
+    else:
+        payload = {"response": f"Fake answer about {destination}"}
+
+    return f"```json\n{json.dumps(payload, indent=2)}\n```"
+
+
+class FakeLLM(LLM):
+    """
+    Offline LLM with configurable latency and output size, used for benchmarks and tests.
+    When streamed, the completion arrives in `chunk_chars` pieces with the latency
+    spread across them. `ms_per_chunk` adds decode time per piece, so longer
+    completions take longer, as with a real model.
+    """
+
+    latency_ms: float = 0.0
+    ms_per_chunk: float = 0.0
+    output_days: int = 5
+    activities_per_day: int = 3
+    chunk_chars: int = 32
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+        pieces = self._chunks(prompt)
+        delay = self._total_delay(pieces)
+        if delay:
+            time.sleep(delay)
+        return "".join(pieces)
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+        pieces = self._chunks(prompt)
+        delay = self._total_delay(pieces)
+        if delay:
+            await asyncio.sleep(delay)
+        return "".join(pieces)
+
+    def _total_delay(self, pieces: List[str]) -> float:
+        return (self.latency_ms + self.ms_per_chunk * len(pieces)) / 1000
+
+    def _chunks(self, prompt: str) -> List[str]:
+        text = fake_completion(prompt, self.output_days, self.activities_per_day)
+        return [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)]
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                **kwargs: Any) -> Iterator[GenerationChunk]:
+        pieces = self._chunks(prompt)
+        delay = self._total_delay(pieces) / max(len(pieces), 1)
+        for piece in pieces:
+            if delay:
+                time.sleep(delay)
+            chunk = GenerationChunk(text=piece)
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                       **kwargs: Any) -> AsyncIterator[GenerationChunk]:
+        pieces = self._chunks(prompt)
+        delay = self._total_delay(pieces) / max(len(pieces), 1)
+        for piece in pieces:
+            if delay:
+                await asyncio.sleep(delay)
+            chunk = GenerationChunk(text=piece)
+            if run_manager:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
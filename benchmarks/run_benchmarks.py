@@ -0,0 +1,371 @@
+"""
+Offline end-to-end benchmark suite.
+
+Runs full NeuroOrchestrator missions against the fake LLM provider and a local
+stub of every external API, so results are reproducible on a machine with no
+network. Usage:
+
+    python -m benchmarks.run_benchmarks --missions 20 --concurrency 8 --check
+    python -m benchmarks.run_benchmarks --baseline benchmarks/results/previous.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+BENCH_DIR = os.path.join(ROOT, "benchmarks")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+THRESHOLDS_FILE = os.path.join(BENCH_DIR, "thresholds.json")
+
+# Offline environment; must be in place before config is imported
+OFFLINE_ENV = {
+    "LLM_PROVIDER": "fake",
+    "PLANNER_LLM_PROVIDER": "fake",
+    "EMBEDDINGS_PROVIDER": "fake",
+    "AMADEUS_CLIENT_ID": "stub",
+    "AMADEUS_CLIENT_SECRET": "stub",
+    "RAPIDAPI_KEY": "stub",
+    "NUMBEO_API_KEY": "stub",
+    "SERPAPI_API_KEY": "stub",
+    # The stub has no rate limit; flight grid size still shows up in upstream_calls
+    "AMADEUS_RATE_LIMIT": "0",
+    # Keep stub prices out of the shared city-cost cache
+    "CITY_COST_AUTO_REFRESH": "false",
+}
+
+# Metrics compared against a baseline run: (dotted key, "lower" or "higher" is better)
+TRACKED_METRICS = [
+    ("startup.import_s", "lower"),
+    ("mission_latency.normal.p50_s", "lower"),
+    ("mission_latency.normal.p95_s", "lower"),
+    ("mission_latency.normal.p99_s", "lower"),
+    ("throughput.missions_per_s", "higher"),
+    ("peak_rss_mb", "lower"),
+]
+
+GOALS = [
+    "Plan a 5-day trip to Tokyo with $2500",
+    "Plan a 3-day weekend in Paris for under $1500",
+    "Plan a 7-day trip to Bangkok with $1800",
+    "Plan a 4-day trip to Lisbon with $1200",
+]
+
+
+def apply_offline_env(llm_latency_ms: float, output_days: int, llm_ms_per_chunk: float = 0.0):
+    for key, value in OFFLINE_ENV.items():
+        os.environ[key] = value
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(llm_latency_ms)
+    os.environ["FAKE_LLM_MS_PER_CHUNK"] = str(llm_ms_per_chunk)
+    os.environ["FAKE_LLM_OUTPUT_DAYS"] = str(output_days)
+    # Stub missions and stub price history go to a throwaway directory
+    scratch = tempfile.mkdtemp(prefix="neuronav-bench-")
+    os.environ["MISSION_STORE_PATH"] = os.path.join(scratch, "missions.sqlite")
+    os.environ["PRICE_HISTORY_PATH"] = os.path.join(scratch, "prices")
+    os.environ["DEST_ID_CACHE_PATH"] = os.path.join(scratch, "dest_ids.json")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (pct in 0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(latencies),
+        "mean_s": round(sum(latencies) / len(latencies), 4) if latencies else 0.0,
+        "p50_s": round(percentile(latencies, 50), 4),
+        "p95_s": round(percentile(latencies, 95), 4),
+        "p99_s": round(percentile(latencies, 99), 4),
+        "max_s": round(max(latencies), 4) if latencies else 0.0,
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
+
+
+# --- Scenarios ---
+def measure_startup(repeats: int = 3) -> Dict[str, float]:
+    """Time a cold `import orchestrator` in a fresh interpreter."""
+    code = "import time; t = time.perf_counter(); import orchestrator; print(time.perf_counter() - t)"
+    imports, totals = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=os.environ.copy(),
+                             capture_output=True, text=True, check=True)
+        totals.append(time.perf_counter() - start)
+        imports.append(float(out.stdout.strip().splitlines()[-1]))
+    return {"import_s": round(percentile(imports, 50), 4), "process_s": round(percentile(totals, 50), 4)}
+
+
+async def run_mission(goal: str) -> Dict[str, Any]:
+    from orchestrator import NeuroOrchestrator
+
+    start = time.perf_counter()
+    labels = []
+    first_item_s = None
+    async for label, _ in NeuroOrchestrator().run(goal):
+        if label == "partial" and first_item_s is None:
+            first_item_s = time.perf_counter() - start
+        labels.append(label)
+    return {"elapsed_s": time.perf_counter() - start, "first_item_s": first_item_s, "labels": labels}
+
+
+async def measure_latency(missions: int) -> Dict[str, Any]:
+    latencies, first_items, errors = [], [], 0
+    for i in range(missions):
+        result = await run_mission(GOALS[i % len(GOALS)])
+        latencies.append(result["elapsed_s"])
+        if result["first_item_s"] is not None:
+            first_items.append(result["first_item_s"])
+        errors += result["labels"].count("error")
+    summary = summarize(latencies)
+    summary["first_item_p50_s"] = round(percentile(first_items, 50), 4)
+    summary["error_events"] = errors
+    return summary
+
+
+async def measure_incremental(missions: int) -> Dict[str, Any]:
+    """Budget-only re-runs and replays of stored missions (no LLM calls in either)."""
+    from orchestrator import NeuroOrchestrator
+
+    reruns, replays = [], []
+    for i in range(missions):
+        orchestrator = NeuroOrchestrator()
+        async for _ in orchestrator.run(GOALS[i % len(GOALS)]):
+            pass
+        mission_id = orchestrator.mission_id
+
+        start = time.perf_counter()
+        async for _ in orchestrator.rerun(mission_id, budget={"amount": 1000 + 100 * i, "currency": "USD"}):
+            pass
+        reruns.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        async for _ in orchestrator.replay(mission_id):
+            pass
+        replays.append(time.perf_counter() - start)
+    return {"rerun_budget": summarize(reruns), "replay": summarize(replays)}
+
+
+def measure_local_llm(stub, load_ms: float) -> Dict[str, Any]:
+    """Time to first token of the first call on the stand-in Ollama server: cold, then after warm-up."""
+    from config import Config
+    from benchmarks.stub_server import OllamaState
+    from tools.ollama_client import llm_metrics, warm_up
+
+    def first_ttft():
+        llm_metrics.reset()
+        Config.get_llm("ollama").invoke(GOALS[0])
+        return llm_metrics.summary()[Config.OLLAMA_MODEL]["ttft_p50_s"]
+
+    stub.ollama = OllamaState(load_ms=load_ms)
+    cold = first_ttft()
+    stub.ollama = OllamaState(load_ms=load_ms)
+    start = time.perf_counter()
+    warm_up()
+    warm_up_s = time.perf_counter() - start
+    return {"load_ms": load_ms, "cold_first_ttft_s": cold, "warm_up_s": round(warm_up_s, 4),
+            "warm_first_ttft_s": first_ttft()}
+
+
+async def measure_throughput(missions: int, concurrency: int) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(i):
+        async with semaphore:
+            return await run_mission(GOALS[i % len(GOALS)])
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(bounded(i) for i in range(missions)))
+    elapsed = time.perf_counter() - start
+    return {
+        "missions": missions,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 4),
+        "missions_per_s": round(missions / elapsed, 3) if elapsed else 0.0,
+        "latency": summarize([r["elapsed_s"] for r in results]),
+    }
+
+
+def reset_caches():
+    """Drop cached stage results and tool responses so the next run reaches the stub again."""
+    from pipeline import clear_stage_cache
+    from tools.finance_tool import clear_flight_cache, clear_fx_cache, clear_hotel_cache
+    from tools.weather_tool import clear_weather_cache
+
+    clear_stage_cache()
+    clear_flight_cache(), clear_hotel_cache(), clear_fx_cache()
+    clear_weather_cache()
+
+
+def measure_modes(modes: List[str], missions: int, api_latency_ms: float = 0.0,
+                  slow_ms: float = 250.0) -> Tuple[Dict[str, Any], Dict[str, Dict[str, int]]]:
+    """Mission latency and upstream calls per stub mode, each mode starting from cold caches."""
+    from benchmarks.stub_server import StubServer
+
+    latency, calls = {}, {}
+    for mode in modes:
+        reset_caches()  # otherwise the slow and fail modes are served from the normal mode's results
+        with StubServer(mode=mode, latency_ms=api_latency_ms, slow_ms=slow_ms) as stub:
+            stub.configure()
+            latency[mode] = asyncio.run(measure_latency(missions))
+            calls[mode] = dict(stub.counts)
+    return latency, calls
+
+
+def run_suite(args) -> Dict[str, Any]:
+    from benchmarks.stub_server import StubServer
+
+    results = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "params": {
+            "missions": args.missions,
+            "concurrency": args.concurrency,
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_ms_per_chunk": args.llm_ms_per_chunk,
+            "output_days": args.output_days,
+            "api_latency_ms": args.api_latency_ms,
+            "ollama_load_ms": args.ollama_load_ms,
+        },
+        "startup": measure_startup(args.startup_repeats),
+    }
+
+    # Silence agent chatter so it does not skew timings (after utils has configured logging)
+    import orchestrator  # noqa: F401
+    logging.getLogger().setLevel(logging.WARNING)
+    with contextlib.redirect_stdout(io.StringIO()):
+        results["mission_latency"], results["upstream_calls"] = measure_modes(
+            args.modes, args.missions, args.api_latency_ms, args.slow_ms)
+
+        reset_caches()
+        with StubServer(mode="normal", latency_ms=args.api_latency_ms) as stub:
+            stub.configure()
+            results["throughput"] = asyncio.run(measure_throughput(args.missions, args.concurrency))
+            results["incremental"] = asyncio.run(measure_incremental(args.missions))
+            results["local_llm"] = measure_local_llm(stub, args.ollama_load_ms)
+
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+# --- Regression checks ---
+def lookup(results: Dict[str, Any], dotted: str):
+    node = results
+    for part in dotted.split("."):
+        if not isinstance(node, dict) or part not in node:
+            return None
+        node = node[part]
+    return node
+
+
+def check_thresholds(results: Dict[str, Any], thresholds: Dict[str, Dict[str, float]]) -> List[str]:
+    """Return a violation message for every metric outside its absolute bound."""
+    violations = []
+    for key, bound in thresholds.items():
+        value = lookup(results, key)
+        if value is None:
+            continue
+        if "max" in bound and value > bound["max"]:
+            violations.append(f"{key}={value} exceeds max {bound['max']}")
+        if "min" in bound and value < bound["min"]:
+            violations.append(f"{key}={value} below min {bound['min']}")
+    return violations
+
+
+def check_baseline(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return a violation message for every tracked metric that regressed by more than `tolerance`."""
+    violations = []
+    for key, better in TRACKED_METRICS:
+        new, old = lookup(results, key), lookup(baseline, key)
+        if new is None or not old:
+            continue
+        change = (new - old) / old
+        if (better == "lower" and change > tolerance) or (better == "higher" and -change > tolerance):
+            violations.append(f"{key} regressed {change:+.1%} ({old} -> {new})")
+    return violations
+
+
+def write_results(results: Dict[str, Any], out_dir: str, prefix: str = "bench") -> str:
+    """Write `<prefix>-<timestamp>.json` and `<prefix>-latest.json`; return the timestamped path."""
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = os.path.join(out_dir, f"{prefix}-{stamp}.json")
+    for target in (path, os.path.join(out_dir, f"{prefix}-latest.json")):
+        with open(target, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline NeuroNavigator benchmark suite")
+    parser.add_argument("--missions", type=int, default=20, help="missions per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent missions in the throughput scenario")
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0, help="fake LLM latency per completion")
+    parser.add_argument("--llm-ms-per-chunk", type=float, default=0.0,
+                        help="fake LLM decode time per streamed 32-char piece")
+    parser.add_argument("--output-days", type=int, default=5, help="fake itinerary length (output size)")
+    parser.add_argument("--api-latency-ms", type=float, default=5.0, help="stub API latency per request")
+    parser.add_argument("--slow-ms", type=float, default=250.0, help="extra stub latency in slow mode")
+    parser.add_argument("--ollama-load-ms", type=float, default=500.0,
+                        help="model load time of the stand-in Ollama server (local_llm scenario)")
+    parser.add_argument("--modes", nargs="+", default=["normal", "slow", "fail"], help="stub modes to run")
+    parser.add_argument("--startup-repeats", type=int, default=3)
+    parser.add_argument("--out", default=RESULTS_DIR, help="directory for JSON results")
+    parser.add_argument("--check", action="store_true", help="fail on threshold violations")
+    parser.add_argument("--thresholds", default=THRESHOLDS_FILE)
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression vs baseline")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    apply_offline_env(args.llm_latency_ms, args.output_days, args.llm_ms_per_chunk)
+
+    results = run_suite(args)
+    path = write_results(results, args.out)
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {path}")
+
+    violations = []
+    if args.check:
+        with open(args.thresholds, encoding="utf-8") as f:
+            violations += check_thresholds(results, json.load(f))
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            violations += check_baseline(results, json.load(f), args.tolerance)
+
+    for v in violations:
+        print(f"REGRESSION: {v}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,382 @@
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+MODES = ("normal", "slow", "fail")
+
+
+def _stable_price(key: str, low: float, high: float) -> float:
+    """Deterministic pseudo-price in [low, high) for a request key."""
+    digest = int(hashlib.md5(key.encode("utf-8")).hexdigest()[:8], 16)
+    return round(low + (digest / 0xFFFFFFFF) * (high - low), 2)
+
+
+def _daily_close(symbol: str, day: int) -> float:
+    """Deterministic daily close: a slow cycle around the symbol's base price plus day-to-day noise."""
+    base = _stable_price(symbol, 0.5, 500)
+    noise = _stable_price(f"{symbol}:{day}", -0.02, 0.02)
+    return round(base * (1 + 0.1 * math.sin(day / 20) + noise), 4)
+
+
+def _duration_s(keep_alive) -> float:
+    """Ollama keep_alive ("30m", "1h", 300, "-1", ...) in seconds; negative keeps the model loaded."""
+    if keep_alive is None:
+        return 300.0
+    if isinstance(keep_alive, (int, float)):
+        return float(keep_alive)
+    value = str(keep_alive).strip()
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    for unit in ("ms", "s", "m", "h"):
+        if value.endswith(unit):
+            return float(value[:-len(unit)]) * units[unit]
+    return float(value)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Routes requests to fake Amadeus, Booking.com, Numbeo, Yahoo, Open-Meteo and Ollama payloads."""
+
+    server_version = "NeuroStub/1.0"
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        stub = self.server.stub
+        parsed = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        route = self._route(method, parsed.path)
+        stub.record(route)
+
+        if stub.latency_ms:
+            time.sleep(stub.latency_ms / 1000)
+        if stub.mode == "slow":
+            time.sleep(stub.slow_ms / 1000)
+        if stub.mode == "fail" or route is None:
+            status = 404 if route is None else 503
+            return self._send(status, {"error": "stub failure" if route else "unknown route"})
+
+        if method == "POST":
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length)
+            if route.startswith("ollama_"):
+                params = json.loads(body or b"{}")
+        payload = getattr(self, f"_{route}")(parsed.path, params)
+        if isinstance(payload, _Stream):
+            return self._send_stream(payload)
+        return self._send(200, payload)
+
+    @staticmethod
+    def _route(method, path):
+        if method == "POST" and path == "/v1/security/oauth2/token":
+            return "amadeus_token"
+        if method == "POST" and path in ("/api/generate", "/api/chat"):
+            return "ollama_" + path.rsplit("/", 1)[-1]
+        if method != "GET":
+            return None
+        if path == "/v2/shopping/flight-offers":
+            return "amadeus_flights"
+        if path == "/v1/hotels/locations":
+            return "booking_locations"
+        if path == "/v1/hotels/search":
+            return "booking_search"
+        if path == "/api/price_items":
+            return "numbeo_prices"
+        if path.startswith("/v8/finance/chart/"):
+            return "yahoo_chart"
+        if path == "/v1/forecast":
+            return "open_meteo_forecast"
+        if path == "/api/ps":
+            return "ollama_ps"
+        return None
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, stream):
+        # NDJSON without a length: the body ends when the connection closes, as with chunked replies
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        for line in stream.lines:
+            self.wfile.write(json.dumps(line).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+    # --- Payloads ---
+    def _amadeus_token(self, path, params):
+        return {"access_token": "stub-token", "token_type": "Bearer", "expires_in": 1799}
+
+    def _amadeus_flights(self, path, params):
+        key = "|".join(params.get(k, "") for k in ("originLocationCode", "destinationLocationCode",
+                                                   "departureDate", "returnDate"))
+        return {"data": [{"price": {"currency": "USD", "total": f"{_stable_price(key, 350, 1400):.2f}"}}]}
+
+    def _booking_locations(self, path, params):
+        name = params.get("name", "")
+        dest_id = str(-100000 - int(hashlib.md5(name.lower().encode("utf-8")).hexdigest()[:5], 16))
+        return [{"dest_id": dest_id, "dest_type": "city", "name": name}]
+
+    def _booking_search(self, path, params):
+        key = params.get("dest_id", "")
+        page = int(params.get("page_number", 0))
+        base = _stable_price(key, 60, 240)
+        return {
+            "result": [
+                {
+                    "hotel_id": page * 20 + i,
+                    "class": 2 + (i % 4),
+                    "price_breakdown": {"gross_price": round(base + 7.5 * (page * 20 + i), 2), "currency": "USD"}
+                }
+                for i in range(20)
+            ]
+        }
+
+    def _numbeo_prices(self, path, params):
+        key = params.get("query", "")
+        return {
+            "name": key,
+            "prices": [
+                {"item_name": "Meal, Inexpensive Restaurant", "average_price": _stable_price(key, 5, 30)},
+                {"item_name": "One-way Ticket (Local Transport)", "average_price": _stable_price(key + "bus", 0.3, 4)},
+                {"item_name": "Taxi 1km (Normal Tariff)", "average_price": _stable_price(key + "taxi", 1, 4)},
+                {"item_name": "Cappuccino (regular)", "average_price": _stable_price(key + "cap", 1, 6)}
+            ]
+        }
+
+    def _yahoo_chart(self, path, params):
+        symbol = path.rsplit("/", 1)[-1]
+        today = int(time.time()) // 86400
+        if "period1" in params:
+            first = int(params["period1"]) // 86400
+            last = min(int(params.get("period2", today * 86400)) // 86400, today)
+            days = list(range(first, last + 1))
+        else:
+            days = [today]
+        closes = [_daily_close(symbol, d) for d in days]
+        return {
+            "chart": {
+                "result": [{
+                    "meta": {"symbol": symbol, "currency": "USD"},
+                    "timestamp": [d * 86400 for d in days],
+                    "indicators": {"quote": [{"open": [round(c * 0.995, 2) for c in closes],
+                                              "high": [round(c * 1.01, 2) for c in closes],
+                                              "low": [round(c * 0.985, 2) for c in closes],
+                                              "close": closes, "volume": [1000] * len(closes)}]}
+                }],
+                "error": None
+            }
+        }
+
+    def _open_meteo_forecast(self, path, params):
+        lats = params.get("latitude", "0").split(",")
+        lons = params.get("longitude", "0").split(",")
+        days = int(params.get("forecast_days", 7))
+        start = int(time.time()) // 86400 * 86400
+        dates = [time.strftime("%Y-%m-%d", time.gmtime(start + 86400 * d)) for d in range(days)]
+        payloads = []
+        for lat, lon in zip(lats, lons):
+            base = _stable_price(lat + lon, -5, 30)
+            payloads.append({
+                "latitude": float(lat),
+                "longitude": float(lon),
+                "daily": {
+                    "time": dates,
+                    "temperature_2m_max": [round(base + 8 + d % 3, 1) for d in range(days)],
+                    "temperature_2m_min": [round(base + d % 3, 1) for d in range(days)],
+                    "precipitation_sum": [round((d * 1.7) % 5, 1) for d in range(days)],
+                },
+            })
+        return payloads if len(payloads) > 1 else payloads[0]
+
+
+    # --- Ollama ---
+    def _ollama_generate(self, path, body):
+        ollama = self.server.stub.ollama
+        load_s = ollama.acquire(body.get("model", ""), body.get("keep_alive"))
+        if not body.get("prompt"):
+            # An empty prompt only loads the model
+            ollama.release()
+            return {"model": body.get("model"), "response": "", "done": True, "done_reason": "load",
+                    "load_duration": int(load_s * 1e9)}
+        return ollama.reply(body, body["prompt"], load_s, key="response")
+
+    def _ollama_chat(self, path, body):
+        ollama = self.server.stub.ollama
+        load_s = ollama.acquire(body.get("model", ""), body.get("keep_alive"))
+        prompt = "\n".join(m.get("content", "") for m in body.get("messages", []))
+        return ollama.reply(body, prompt, load_s, key="message")
+
+    def _ollama_ps(self, path, params):
+        # Models kept loaded indefinitely report a far-future expiry, as Ollama does
+        return {"models": [{"name": m, "model": m, "size_vram": 0,
+                            "expires_at": "2318-01-01T00:00:00Z" if math.isinf(expires)
+                            else time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(expires))}
+                           for m, expires in self.server.stub.ollama.resident().items()]}
+
+
+class _Stream:
+    """NDJSON lines to send one by one."""
+
+    def __init__(self, lines):
+        self.lines = lines
+
+
+class OllamaState:
+    """
+    Model residency of the stand-in Ollama server. A model that is not loaded
+    costs `load_ms` on its next request (loads are serialized, as in Ollama),
+    stays loaded for its request's keep_alive (default 5m) and is evicted
+    least-recently-used beyond `max_loaded` models. Replies stream
+    `fake_completion` text after `prompt_ms`, one piece per `ms_per_token`.
+    """
+
+    def __init__(self, load_ms: float = 500.0, prompt_ms: float = 10.0, ms_per_token: float = 1.0,
+                 max_loaded: int = 3):
+        self.load_ms = load_ms
+        self.prompt_ms = prompt_ms
+        self.ms_per_token = ms_per_token
+        self.max_loaded = max_loaded
+        self.loads = Counter()
+        self.inflight = 0
+        self.peak_inflight = 0
+        self._expires = {}  # model -> expiry (epoch seconds, inf when kept forever)
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def resident(self):
+        now = time.time()
+        with self._lock:
+            for model in [m for m, t in self._expires.items() if t <= now]:
+                del self._expires[model]
+            return dict(self._expires)
+
+    def acquire(self, model, keep_alive):
+        """Count the request in flight and load `model` if needed; returns the load time."""
+        with self._lock:
+            self.inflight += 1
+            self.peak_inflight = max(self.peak_inflight, self.inflight)
+        load_s = 0.0
+        with self._load_lock:
+            if model not in self.resident():
+                time.sleep(self.load_ms / 1000)
+                load_s = self.load_ms / 1000
+                self.loads[model] += 1
+            ttl = _duration_s(keep_alive)
+            with self._lock:
+                self._expires.pop(model, None)
+                self._expires[model] = math.inf if ttl < 0 else time.time() + ttl
+                while len(self._expires) > self.max_loaded:
+                    del self._expires[next(iter(self._expires))]
+        return load_s
+
+    def release(self):
+        with self._lock:
+            self.inflight -= 1
+
+    def reply(self, body, prompt, load_s, key):
+        """Completion payload (a stream unless "stream" is false); the request stays in flight until it ends."""
+        from benchmarks.fake_llm import fake_completion
+        time.sleep(self.prompt_ms / 1000)
+        text = fake_completion(prompt)
+        pieces = [text[i:i + 32] for i in range(0, len(text), 32)]
+
+        def line(piece, done=False):
+            content = {"role": "assistant", "content": piece} if key == "message" else piece
+            return {"model": body.get("model"), key: content, "done": done}
+
+        def lines():
+            try:
+                for piece in pieces:
+                    time.sleep(self.ms_per_token / 1000)
+                    yield line(piece)
+                yield {**line(""), "done": True, "load_duration": int(load_s * 1e9),
+                       "eval_count": len(pieces), "eval_duration": int(len(pieces) * self.ms_per_token * 1e6)}
+            finally:
+                self.release()
+
+        if body.get("stream", True):
+            return _Stream(lines())
+        self.release()
+        return {**line(text), "done": True, "load_duration": int(load_s * 1e9), "eval_count": len(pieces)}
+
+
+class StubServer:
+    """
+    Local HTTP server emulating the external APIs used by the tools.
+
+    Modes:
+        normal - fast, deterministic responses
+        slow   - every response is delayed by `slow_ms`
+        fail   - every request returns HTTP 503
+    `latency_ms` is added to every response regardless of mode. `ollama`
+    holds the stand-in Ollama server's model residency and timing knobs.
+    """
+
+    def __init__(self, mode: str = "normal", latency_ms: float = 0.0, slow_ms: float = 250.0,
+                 host: str = "127.0.0.1", port: int = 0):
+        if mode not in MODES:
+            raise ValueError(f"Unsupported stub mode: {mode}")
+        self.mode = mode
+        self.latency_ms = latency_ms
+        self.slow_ms = slow_ms
+        self.counts = Counter()
+        self.ollama = OllamaState()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _StubHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, route):
+        with self._lock:
+            self.counts[route or "unknown"] += 1
+
+    def reset_counts(self):
+        with self._lock:
+            self.counts.clear()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def configure(self):
+        """Point Config at this server so every tool talks to the stub."""
+        from config import Config
+        Config.AMADEUS_BASE_URL = self.base_url
+        Config.BOOKING_BASE_URL = self.base_url
+        Config.NUMBEO_BASE_URL = self.base_url
+        Config.YAHOO_BASE_URL = self.base_url
+        Config.WEATHER_BASE_URL = self.base_url
+        Config.OLLAMA_BASE_URL = self.base_url
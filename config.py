@@ -22,10 +22,139 @@ class Config:
     RAPIDAPI_HOST = os.getenv("RAPIDAPI_HOST")
     NUMBEO_API_KEY = os.getenv("NUMBEO_API_KEY")
 
+    # Service endpoints (overridable so tools can be pointed at local stubs)
+    AMADEUS_BASE_URL = os.getenv("AMADEUS_BASE_URL", "https://test.api.amadeus.com")
+    BOOKING_BASE_URL = os.getenv("BOOKING_BASE_URL")  # None -> https://<RAPIDAPI_HOST>
+    NUMBEO_BASE_URL = os.getenv("NUMBEO_BASE_URL", "https://www.numbeo.com")
+    YAHOO_BASE_URL = os.getenv("YAHOO_BASE_URL")  # None -> yfinance client
+    WEATHER_BASE_URL = os.getenv("WEATHER_BASE_URL", "https://api.open-meteo.com")
+
+    # Weather
+    GAZETTEER_PATH = os.getenv(
+        "GAZETTEER_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer.csv")
+    )
+    WEATHER_CACHE_TTL = int(os.getenv("WEATHER_CACHE_TTL", "10800"))  # seconds
+    WEATHER_FORECAST_DAYS = int(os.getenv("WEATHER_FORECAST_DAYS", "14"))  # Open-Meteo allows up to 16
+
+    # Flights (Amadeus flexible-date search)
+    FLIGHT_ORIGIN = os.getenv("FLIGHT_ORIGIN", "NYC")  # city, metro or airport code
+    FLIGHT_LEAD_DAYS = int(os.getenv("FLIGHT_LEAD_DAYS", "30"))  # default departure = today + lead days
+    FLIGHT_FLEX_DAYS = int(os.getenv("FLIGHT_FLEX_DAYS", "1"))  # +/- days around departure and return
+    FLIGHT_MAX_AIRPORTS = int(os.getenv("FLIGHT_MAX_AIRPORTS", "2"))  # per side of the route
+    # Cap on Amadeus queries per search; cached cells are always included. Uncached cells go nearest
+    # dates first, main airports first at the same distance: on a cold cache 12 covers the exact dates on
+    # all 4 airport pairs, every one-day shift on the main pair and 4 of the 8 on the next-ranked pairs.
+    # The full default grid is 36 cells; later searches within FLIGHT_CACHE_TTL query the next ones.
+    FLIGHT_MAX_QUERIES = int(os.getenv("FLIGHT_MAX_QUERIES", "12"))
+    FLIGHT_CACHE_TTL = int(os.getenv("FLIGHT_CACHE_TTL", "1800"))  # seconds
+    AMADEUS_MAX_CONCURRENCY = int(os.getenv("AMADEUS_MAX_CONCURRENCY", "4"))
+    AMADEUS_RATE_LIMIT = float(os.getenv("AMADEUS_RATE_LIMIT", "10"))  # requests/second (test env limit)
+
+    # Hotels (Booking.com multi-page search)
+    HOTEL_SEARCH_PAGES = int(os.getenv("HOTEL_SEARCH_PAGES", "3"))
+    HOTEL_SEARCH_CONCURRENCY = int(os.getenv("HOTEL_SEARCH_CONCURRENCY", "4"))
+    HOTEL_CACHE_TTL = int(os.getenv("HOTEL_CACHE_TTL", "1800"))  # seconds
+    FX_CACHE_TTL = int(os.getenv("FX_CACHE_TTL", "900"))  # seconds per exchange rate
+
+    # City costs: bundled index (built from the CSV source) plus a refreshed copy in the cache
+    CITY_COSTS_SOURCE = os.getenv(
+        "CITY_COSTS_SOURCE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "city_costs.csv")
+    )
+    CITY_COSTS_PATH = os.getenv(
+        "CITY_COSTS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "city_costs.bin")
+    )
+    CITY_COST_MAX_AGE = int(os.getenv("CITY_COST_MAX_AGE", str(90 * 86400)))  # seconds before re-pricing
+    CITY_COST_AUTO_REFRESH = os.getenv("CITY_COST_AUTO_REFRESH", "true").lower() in ("1", "true", "yes")
+    CITY_COST_REFRESH_CONCURRENCY = int(os.getenv("CITY_COST_REFRESH_CONCURRENCY", "2"))
+
     # LLM Settings
     DEFAULT_LLM_PROVIDER = os.getenv("LLM_PROVIDER", "groq")  # groq, openai, ollama, huggingface
     MODEL_NAME = os.getenv("LLM_MODEL", "llama3-70b-8192")
     TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.0"))
+    PLANNER_LLM_PROVIDER = os.getenv("PLANNER_LLM_PROVIDER", "groq")  # Planner works best with Groq/Llama3
+
+    # Local inference (Ollama)
+    OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+    OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "mistral")
+    OLLAMA_PRELOAD_MODELS = [m.strip() for m in os.getenv("OLLAMA_PRELOAD_MODELS", "").split(",") if m.strip()]
+    OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")  # residency after each request; -1 keeps models loaded
+    OLLAMA_WARMUP = os.getenv("OLLAMA_WARMUP", "true").lower() in ("true", "1", "yes")
+    OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "2"))  # match the server's OLLAMA_NUM_PARALLEL
+    OLLAMA_TIMEOUT = int(os.getenv("OLLAMA_TIMEOUT", "300"))  # seconds, covers a cold model load
+
+    # Prompt budgets: full prompt tokens per stage; the plan context is trimmed to fit
+    PROMPT_TOKEN_BUDGETS = {
+        "research": int(os.getenv("RESEARCH_PROMPT_TOKENS", "400")),
+        "execution": int(os.getenv("EXECUTION_PROMPT_TOKENS", "800")),
+    }
+
+    # Itineraries longer than the threshold are generated in concurrent day ranges
+    ITINERARY_CHUNK_THRESHOLD = int(os.getenv("ITINERARY_CHUNK_THRESHOLD", "10"))  # days; 0 disables chunking
+    ITINERARY_CHUNK_DAYS = int(os.getenv("ITINERARY_CHUNK_DAYS", "5"))
+    ITINERARY_MAX_PARALLEL = int(os.getenv("ITINERARY_MAX_PARALLEL", "4"))
+
+    # Mission stage scheduler
+    MAX_CONCURRENT_STAGES = int(os.getenv("MAX_CONCURRENT_STAGES", "6"))
+    STAGE_CACHE_TTL = int(os.getenv("STAGE_CACHE_TTL", "900"))  # seconds, for cacheable stages
+
+    # Market history (local daily bars per symbol)
+    PRICE_HISTORY_MAX_AGE = int(os.getenv("PRICE_HISTORY_MAX_AGE", "900"))  # seconds before a delta fetch
+    PRICE_HISTORY_BACKFILL_DAYS = int(os.getenv("PRICE_HISTORY_BACKFILL_DAYS", "365"))
+    MARKET_TREND_DAYS = int(os.getenv("MARKET_TREND_DAYS", "90"))
+
+    # Budget what-if sweeps
+    BUDGET_SWEEP_CURRENCIES = [c.strip().upper() for c in os.getenv("BUDGET_SWEEP_CURRENCIES", "USD,EUR,GBP,INR").split(",")
+                               if c.strip()]
+    BUDGET_SWEEP_FLIGHTS = int(os.getenv("BUDGET_SWEEP_FLIGHTS", "5"))  # cheapest date pairs offered as options
+    BUDGET_SWEEP_MAX_DAYS = int(os.getenv("BUDGET_SWEEP_MAX_DAYS", "30"))
+
+    # Mission store (incremental re-runs and replay)
+    MISSION_STORE_ENABLED = os.getenv("MISSION_STORE_ENABLED", "true").lower() in ("true", "1", "yes")
+
+    # Logging: records are formatted and written on a background thread
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json, text
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))  # share of DEBUG records kept per call site
+    AGENT_VERBOSE = os.getenv("AGENT_VERBOSE", "false").lower() in ("true", "1", "yes")  # default for run(verbose=)
+
+    # Embeddings (memory store)
+    EMBEDDINGS_PROVIDER = os.getenv("EMBEDDINGS_PROVIDER", "huggingface")  # huggingface, fake
+    EMBEDDINGS_MODEL = os.getenv("EMBEDDINGS_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+
+    # Local caches
+    CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+    CITY_COSTS_CACHE_PATH = os.getenv("CITY_COSTS_CACHE_PATH", os.path.join(CACHE_DIR, "city_costs.bin"))
+    MISSION_STORE_PATH = os.getenv("MISSION_STORE_PATH", os.path.join(CACHE_DIR, "missions.sqlite"))
+    PRICE_HISTORY_PATH = os.getenv("PRICE_HISTORY_PATH", os.path.join(CACHE_DIR, "prices"))
+    DEST_ID_CACHE_PATH = os.getenv("DEST_ID_CACHE_PATH", os.path.join(CACHE_DIR, "dest_ids.json"))
+
+    # Cache pre-warming (tools/cache_warmer.py)
+    PREWARM_LIST_PATH = os.getenv(
+        "PREWARM_LIST_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "prewarm.json")
+    )
+    PREWARM_HISTORY_MISSIONS = int(os.getenv("PREWARM_HISTORY_MISSIONS", "200"))  # past goals mined for targets
+    PREWARM_TOP_N = int(os.getenv("PREWARM_TOP_N", "10"))  # destinations taken from the history
+    PREWARM_CONCURRENCY = int(os.getenv("PREWARM_CONCURRENCY", "4"))
+    PREWARM_ON_START = os.getenv("PREWARM_ON_START", "false").lower() in ("true", "1", "yes")
+    PREWARM_INTERVAL = int(os.getenv("PREWARM_INTERVAL", "0"))  # seconds between runs; 0 = startup only
+
+    # Search (SerpAPI)
+    SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", os.path.join(CACHE_DIR, "search_cache.sqlite"))
+    SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "86400"))  # seconds
+    SEARCH_MAX_CONCURRENCY = int(os.getenv("SEARCH_MAX_CONCURRENCY", "4"))
+    SERPAPI_COST_PER_SEARCH = float(os.getenv("SERPAPI_COST_PER_SEARCH", "0.015"))  # USD, for savings reports
+
+    # Goal analysis: JSON symbol universe plus optional exchange listings (os.pathsep-separated)
+    SYMBOL_UNIVERSE_PATH = os.getenv(
+        "SYMBOL_UNIVERSE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "symbol_universe.json")
+    )
+    SYMBOL_LISTINGS = os.getenv("SYMBOL_LISTINGS", "")
+
+    # Fake provider (offline benchmarks and tests)
+    FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "0"))
+    FAKE_LLM_MS_PER_CHUNK = float(os.getenv("FAKE_LLM_MS_PER_CHUNK", "0"))  # decode time per 32-char piece
+    FAKE_LLM_OUTPUT_DAYS = int(os.getenv("FAKE_LLM_OUTPUT_DAYS", "5"))
+    FAKE_LLM_ACTIVITIES = int(os.getenv("FAKE_LLM_ACTIVITIES", "3"))
 
     @staticmethod
     def validate_keys():
@@ -64,10 +193,13 @@ class Config:
                 )
                 
             elif provider == "ollama":
-                from langchain_community.chat_models import ChatOllama
-                return ChatOllama(
-                    model=os.getenv("OLLAMA_MODEL", "mistral"),
-                    temperature=Config.TEMPERATURE
+                from tools.ollama_client import ManagedChatOllama, keep_alive_value
+                return ManagedChatOllama(
+                    base_url=Config.OLLAMA_BASE_URL,
+                    model=Config.OLLAMA_MODEL,
+                    temperature=Config.TEMPERATURE,
+                    keep_alive=keep_alive_value(Config.OLLAMA_KEEP_ALIVE),
+                    timeout=Config.OLLAMA_TIMEOUT
                 )
                 
             elif provider == "huggingface":
@@ -78,6 +210,15 @@ class Config:
                     huggingfacehub_api_token=Config.HUGGINGFACEHUB_API_TOKEN,
                     model_kwargs={"temperature": Config.TEMPERATURE, "max_length": 512}
                 )
+
+            elif provider == "fake":
+                from benchmarks.fake_llm import FakeLLM
+                return FakeLLM(
+                    latency_ms=Config.FAKE_LLM_LATENCY_MS,
+                    ms_per_chunk=Config.FAKE_LLM_MS_PER_CHUNK,
+                    output_days=Config.FAKE_LLM_OUTPUT_DAYS,
+                    activities_per_day=Config.FAKE_LLM_ACTIVITIES
+                )
             else:
                 raise ValueError(f"Unsupported LLM provider: {provider}")
                 
@@ -85,3 +226,17 @@ class Config:
             raise ImportError(f"Missing dependency for provider {provider}. Error: {e}")
         except Exception as e:
             raise Exception(f"Failed to initialize LLM: {e}")
+
+    @staticmethod
+    def get_embeddings(provider: Optional[str] = None):
+        """Factory method to get the embeddings model used by the memory store."""
+        provider = provider or Config.EMBEDDINGS_PROVIDER
+
+        if provider == "huggingface":
+            from langchain_community.embeddings import HuggingFaceEmbeddings
+            return HuggingFaceEmbeddings(model_name=Config.EMBEDDINGS_MODEL)
+        elif provider == "fake":
+            from langchain_core.embeddings import DeterministicFakeEmbedding
+            return DeterministicFakeEmbedding(size=384)
+        else:
+            raise ValueError(f"Unsupported embeddings provider: {provider}")
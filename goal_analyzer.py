@@ -0,0 +1,268 @@
+import csv
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+
+# Numbers ("2,000", "7", "1.5k"), words (incl. "coca-cola", "at&t", "brk-b") or single symbols ("$", "₹")
+_TOKEN = re.compile(r"\d+(?:,\d{3})*(?:\.\d+)?[kK]?(?!\w)|\w+(?:['&.-]\w+)*|[^\w\s]")
+_NUMBER = re.compile(r"\d+(?:,\d{3})*(?:\.\d+)?[kK]?$")
+
+DURATION_UNITS = {"day": 1, "days": 1, "night": 1, "nights": 1, "week": 7, "weeks": 7, "fortnight": 14}
+NUMBER_WORDS = {"a": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+                "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fourteen": 14}
+DESTINATION_CUES = {"to", "in", "visit", "visiting", "explore", "exploring", "around", "at"}
+MARKET_CUES = {"stock", "stocks", "share", "shares", "price", "prices", "invest", "investing", "investment",
+               "ticker", "tickers", "crypto", "market", "markets", "portfolio", "trading", "trade"}
+# Suffixes stripped from security names in exchange listing files
+_NAME_SUFFIXES = re.compile(
+    r"[\s,]+(inc|incorporated|corp|corporation|co|company|ltd|limited|plc|holdings?|group|"
+    r"n\.?v|s\.?a|ag|se|class [a-z]|common stock|ordinary shares|ads|adr)\.?$"
+)
+
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """Split text into (token, start, end) triples."""
+    return [(m.group(), m.start(), m.end()) for m in _TOKEN.finditer(text)]
+
+
+def _norm(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class _Automaton:
+    """Aho-Corasick automaton over lowercase tokens; patterns are token sequences."""
+
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[int]] = [[]]
+        self.patterns: List[Dict[str, Any]] = []
+        self.built = False
+
+    def add(self, phrase: str, **payload):
+        tokens = [t.lower() for t, _, _ in tokenize(phrase)]
+        if not tokens:
+            return
+        state = 0
+        for tok in tokens:
+            nxt = self.goto[state].get(tok)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][tok] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = nxt
+        payload.update(phrase=_norm(phrase), length=len(tokens))
+        self.out[state].append(len(self.patterns))
+        self.patterns.append(payload)
+        self.built = False
+
+    def build(self):
+        queue = list(self.goto[0].values())
+        for s in queue:
+            self.fail[s] = 0
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for tok, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and tok not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(tok, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+        self.built = True
+
+    def step(self, state: int, tok: str) -> int:
+        goto, fail = self.goto, self.fail
+        while state and tok not in goto[state]:
+            state = fail[state]
+        return goto[state].get(tok, 0)
+
+
+class GoalAnalyzer:
+    """
+    Single-pass extraction of tickers, currency, amount, duration and
+    destination from a goal string.
+
+    Tickers, currencies and cities come from a symbol universe compiled once
+    into a token-level Aho-Corasick automaton, so matching cost does not grow
+    with the size of the universe and matches always fall on word boundaries.
+    """
+
+    def __init__(self, universe: Dict[str, Any]):
+        self.version = universe.get("version", 1)
+        self._automaton = _Automaton()
+        stopwords = set(universe.get("ticker_stopwords", []))
+        ambiguous = {n.lower() for n in universe.get("ambiguous_names", [])}
+        case_sensitive_codes = set(universe.get("case_sensitive_codes", []))
+
+        for symbol, names in universe.get("tickers", {}).items():
+            self.add_ticker(symbol, names, ambiguous_names=ambiguous, stopword=symbol in stopwords)
+        for code, aliases in universe.get("currencies", {}).items():
+            self._automaton.add(code, kind="currency", value=code,
+                                surface=code if code in case_sensitive_codes else None)
+            for alias in aliases:
+                self._automaton.add(alias, kind="currency", value=code)
+        for city in universe.get("cities", []):
+            self._automaton.add(city, kind="city", value=city)
+
+    @classmethod
+    def from_file(cls, path: Optional[str] = None, listings: Iterable[str] = ()) -> "GoalAnalyzer":
+        """Load a JSON universe, plus optional exchange listing files for extra tickers."""
+        with open(path or Config.SYMBOL_UNIVERSE_PATH, encoding="utf-8") as f:
+            analyzer = cls(json.load(f))
+        for listing in listings:
+            analyzer.load_listing(listing)
+        return analyzer
+
+    def add_ticker(self, symbol: str, names: Iterable[str] = (), ambiguous_names=(), stopword: bool = False):
+        # Bare symbols must appear in upper case ("NVDA", not "nvda")
+        if not stopword:
+            self._automaton.add(symbol, kind="ticker", value=symbol, surface=symbol)
+        for name in names:
+            self._automaton.add(name, kind="ticker", value=symbol,
+                                ambiguous=name.lower() in ambiguous_names)
+
+    def load_listing(self, path: str) -> int:
+        """
+        Add tickers from a delimited listing file with "Symbol" and "Security Name"
+        (or "Name") columns, e.g. nasdaqlisted.txt. Names from listings only count
+        when the goal also mentions markets or prices. Returns the number added.
+        """
+        with open(path, encoding="utf-8", newline="") as f:
+            sample = f.readline()
+            f.seek(0)
+            reader = csv.DictReader(f, delimiter="|" if "|" in sample else ",")
+            added = 0
+            for row in reader:
+                symbol = (row.get("Symbol") or "").strip()
+                name = (row.get("Security Name") or row.get("Name") or "").split(" - ")[0].strip()
+                if not symbol or not symbol.replace("-", "").replace(".", "").isalnum():
+                    continue
+                name = name.lower()
+                stripped = _NAME_SUFFIXES.sub("", name)
+                while stripped != name:
+                    name, stripped = stripped, _NAME_SUFFIXES.sub("", stripped)
+                name = name.strip()
+                names = [name] if len(name) >= 4 else []
+                self.add_ticker(symbol, names, ambiguous_names=set(names), stopword=len(symbol) < 2)
+                added += 1
+        return added
+
+    def analyze(self, text: str) -> Dict[str, Any]:
+        """
+        Return {"tickers", "currency", "amount", "duration", "destination", "cities", "numbers"}.
+        `amount` is only set for a number written next to a currency; other
+        numbers that are not durations are listed in `numbers`. Missing fields
+        are None (or empty lists).
+        """
+        automaton = self._automaton
+        if not automaton.built:
+            automaton.build()
+
+        tokens = tokenize(text)
+        lowered = [t.lower() for t, _, _ in tokens]
+        patterns = automaton.patterns
+        matches = []
+        numbers = {}
+        market_context = False
+        state = 0
+        for i, tok in enumerate(lowered):
+            state = automaton.step(state, tok)
+            for pid in automaton.out[state]:
+                matches.append((i - patterns[pid]["length"] + 1, i, pid))
+            if tok in MARKET_CUES:
+                market_context = True
+            elif tok[0].isdigit() and _NUMBER.match(tok):
+                value = float(tok.rstrip("kK").replace(",", ""))
+                numbers[i] = value * 1000 if tok[-1] in "kK" else value
+
+        # Leftmost-longest, non-overlapping; drop matches whose surface text does not fit
+        matches.sort(key=lambda m: (m[0], m[0] - m[1]))
+        selected = {}
+        last_end = -1
+        for start, end, pid in matches:
+            if start <= last_end:
+                continue
+            p = patterns[pid]
+            surface = text[tokens[start][1]:tokens[end][2]]
+            if p.get("surface") and surface != p["surface"]:
+                continue
+            if p["length"] > 1 and _norm(surface) != p["phrase"]:
+                continue  # tokens were not contiguous as in the pattern (e.g. "a $" vs "a$")
+            if p.get("ambiguous") and not market_context:
+                continue
+            selected[start] = (end, p)
+            last_end = end
+
+        tickers, cities = [], []
+        currency = destination = amount = duration = None
+        ends = {}
+        for start, (end, p) in sorted(selected.items()):
+            ends[end] = p
+            if p["kind"] == "ticker" and p["value"] not in tickers:
+                tickers.append(p["value"])
+            elif p["kind"] == "currency" and currency is None:
+                currency = p["value"]
+            elif p["kind"] == "city":
+                cities.append(p["value"])
+                if destination is None and start > 0 and lowered[start - 1] in DESTINATION_CUES:
+                    destination = p["value"]
+
+        # Amounts sit next to a currency ("$2000", "2,000 USD"); durations precede a unit ("7-day")
+        loose = []
+        for i, value in sorted(numbers.items()):
+            before, after = ends.get(i - 1), selected.get(i + 1)
+            nxt = i + 2 if i + 1 < len(lowered) and lowered[i + 1] == "-" else i + 1
+            if nxt < len(lowered) and lowered[nxt] in DURATION_UNITS:
+                if duration is None:
+                    duration = int(value * DURATION_UNITS[lowered[nxt]])
+            elif before and before["kind"] == "currency":
+                if amount is None:
+                    amount, currency = value, before["value"]
+            elif after and after[1]["kind"] == "currency":
+                if amount is None:
+                    amount, currency = value, after[1]["value"]
+            else:
+                loose.append(value)
+
+        if duration is None:
+            for i, tok in enumerate(lowered):
+                if tok in DURATION_UNITS and i > 0 and lowered[i - 1] in NUMBER_WORDS:
+                    duration = NUMBER_WORDS[lowered[i - 1]] * DURATION_UNITS[tok]
+                    break
+                if tok == "weekend":
+                    duration = 2
+                    break
+
+        return {
+            "tickers": tickers,
+            "currency": currency,
+            "amount": amount,
+            "duration": duration,
+            "destination": destination or (cities[0] if cities else None),
+            "cities": cities,
+            "numbers": loose,
+        }
+
+
+_goal_analyzer = None
+
+
+def get_goal_analyzer() -> GoalAnalyzer:
+    """Return the shared analyzer, building it from the configured universe on first use."""
+    global _goal_analyzer
+    if _goal_analyzer is None:
+        listings = [p for p in Config.SYMBOL_LISTINGS.split(os.pathsep) if p]
+        _goal_analyzer = GoalAnalyzer.from_file(Config.SYMBOL_UNIVERSE_PATH, listings)
+    return _goal_analyzer
+
+
+def analyze_goal(text: str) -> Dict[str, Any]:
+    return get_goal_analyzer().analyze(text)
@@ -0,0 +1,131 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import Config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS missions (
+    id TEXT PRIMARY KEY,
+    goal TEXT NOT NULL,
+    context TEXT NOT NULL,
+    parent TEXT,
+    status TEXT NOT NULL,
+    created REAL NOT NULL,
+    finished REAL
+);
+CREATE TABLE IF NOT EXISTS stages (
+    mission_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    input_hash TEXT,
+    status TEXT NOT NULL,
+    output TEXT,
+    started REAL NOT NULL,
+    elapsed REAL NOT NULL,
+    PRIMARY KEY (mission_id, stage)
+);
+CREATE TABLE IF NOT EXISTS events (
+    mission_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    at REAL NOT NULL,
+    label TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (mission_id, seq)
+);
+CREATE INDEX IF NOT EXISTS missions_created ON missions (created);
+"""
+
+# Stage outcomes whose output can stand in for a re-run
+_REUSABLE = ("done", "reused")
+
+_mission_store = None
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=str, ensure_ascii=False)
+
+
+class MissionStore:
+    """
+    Every mission's stage outputs (with the hash of the inputs that produced
+    them) and its full event stream, in SQLite. Used to re-run a mission
+    incrementally and to replay it without calling any LLM or API.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or Config.MISSION_STORE_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex[:12]
+
+    def save(self, mission_id: str, goal: str, context: Dict[str, Any], status: str,
+             stages: List[Tuple[str, Optional[str], str, Any, float, float]],
+             events: List[Tuple[float, str, Any]], parent: Optional[str] = None,
+             created: Optional[float] = None):
+        """
+        Write a finished (or interrupted) mission in one transaction. `stages`
+        are (name, input_hash, status, output, started, elapsed) and `events`
+        are (offset_s, label, data) in the order they were yielded.
+        """
+        created = created or time.time()
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO missions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (mission_id, goal, _dumps(context), parent, status, created, time.time()))
+            conn.execute("DELETE FROM stages WHERE mission_id = ?", (mission_id,))
+            conn.execute("DELETE FROM events WHERE mission_id = ?", (mission_id,))
+            conn.executemany("INSERT INTO stages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             [(mission_id, name, digest, state, None if output is None else _dumps(output),
+                               started, elapsed) for name, digest, state, output, started, elapsed in stages])
+            conn.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?)",
+                             [(mission_id, seq, offset, label, _dumps(data))
+                              for seq, (offset, label, data) in enumerate(events)])
+
+    def get(self, mission_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT id, goal, context, parent, status, created, finished "
+                               "FROM missions WHERE id = ?", (mission_id,)).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "goal": row[1], "context": json.loads(row[2]), "parent": row[3],
+                "status": row[4], "created": row[5], "finished": row[6]}
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id, goal, parent, status, created FROM missions "
+                                "ORDER BY created DESC LIMIT ?", (limit,)).fetchall()
+        return [{"id": r[0], "goal": r[1], "parent": r[2], "status": r[3], "created": r[4]} for r in rows]
+
+    def stages(self, mission_id: str) -> Dict[str, Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT stage, input_hash, status, output, started, elapsed "
+                                "FROM stages WHERE mission_id = ?", (mission_id,)).fetchall()
+        return {r[0]: {"input_hash": r[1], "status": r[2], "output": None if r[3] is None else json.loads(r[3]),
+                       "started": r[4], "elapsed": r[5]} for r in rows}
+
+    def reusable(self, mission_id: str) -> Dict[str, Tuple[str, Any]]:
+        """{stage: (input_hash, output)} for the stages of a mission that completed."""
+        return {name: (s["input_hash"], s["output"]) for name, s in self.stages(mission_id).items()
+                if s["status"] in _REUSABLE}
+
+    def events(self, mission_id: str) -> List[Tuple[float, str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT at, label, data FROM events WHERE mission_id = ? ORDER BY seq",
+                                (mission_id,)).fetchall()
+        return [(r[0], r[1], json.loads(r[2])) for r in rows]
+
+
+def get_mission_store() -> MissionStore:
+    global _mission_store
+    if _mission_store is None:
+        _mission_store = MissionStore()
+    return _mission_store
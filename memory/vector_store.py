@@ -1,19 +1,29 @@
+import threading
 from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
+from config import Config
 
-# Create a single embeddings instance
-embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+# A single embeddings instance, built on first use (loading the model is slow)
+_embeddings = None
+_embeddings_lock = threading.Lock()
 
 # Keep FAISS in memory for this session
 memory_store = None
 
+def get_embeddings():
+    """Return the shared embeddings model, loading it on first call."""
+    global _embeddings
+    with _embeddings_lock:
+        if _embeddings is None:
+            _embeddings = Config.get_embeddings()
+        return _embeddings
+
 def init_vector_store():
     """Initialize FAISS with a dummy doc so it's never None."""
     global memory_store
     if memory_store is None:
         memory_store = FAISS.from_texts(
             ["Initial placeholder document."],
-            embedding=embeddings
+            embedding=get_embeddings()
         )
 
 def add_to_vector_store(text):
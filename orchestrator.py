@@ -1,41 +1,209 @@
 import asyncio
+import hashlib
 import json
-import re
-from typing import AsyncGenerator, Dict, Any
+import logging
+import time
+from datetime import date, timedelta
+from typing import AsyncGenerator, Dict, Any, List, Optional, Sequence, Tuple
+
+from langchain.chains import LLMChain
 
 from config import Config
-from utils import safe_json_parse, extract_tickers_from_goal, get_logger
+from utils import safe_json_parse, get_logger, log_context, SingleFlight, StreamingJSONParser
+from goal_analyzer import analyze_goal
+from prompts import build_prompt, count_tokens
 from memory.vector_store import add_to_vector_store
+from memory.mission_store import get_mission_store
 
 # Import agents (will be refactored to classes later, for now using existing factories)
 from agents.planner import get_planner_agent
 from agents.researcher import get_researcher_agent
 from agents.finance import get_finance_agent
 from agents.execution import get_execution_agent
+from agents.step_logger import AgentStepLogger
+from tools.search_tool import get_search_tool
+from tools.weather_tool import WeatherTool
+from tools.budget_engine import BudgetEngine
+from tools.ollama_client import start_warm_up
+from pipeline import Pipeline, Stage
 
 logger = get_logger("Orchestrator")
 
+
+# Identical LLM calls in flight across missions
+_llm_flight = SingleFlight()
+
+
+def _call_key(agent, prompt: str) -> str:
+    """What makes two agent calls interchangeable: agent type, model settings, prompt template and input."""
+    chain = getattr(getattr(agent, "agent", None), "llm_chain", None) or agent  # AgentExecutor wraps an LLMChain
+    llm = getattr(chain, "llm", None)
+    template = getattr(getattr(chain, "prompt", None), "template", None)
+    params = getattr(llm, "_identifying_params", None)
+    blob = json.dumps([type(agent).__name__, type(llm).__name__, params, template, prompt], sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def _plan_ok(plan: Any) -> bool:
+    return isinstance(plan, dict) and "error" not in plan
+
+
+def _trip_days(goal: str, plan: Dict[str, Any]) -> int:
+    # "5 days", "2 weeks" or a bare number; fall back to the goal's own duration
+    plan_duration = analyze_goal(str(plan.get("duration", "")))
+    return int(plan_duration["duration"] or analyze_goal(goal)["duration"] or (plan_duration["numbers"] or [0])[0])
+
+
+def merge_itinerary_chunks(chunks: Sequence[List[Dict[str, Any]]],
+                           ranges: Sequence[Tuple[int, int]]) -> Dict[str, Any]:
+    """
+    Merge per-range itineraries into one "Day 1".."Day N" sequence. Days a range
+    failed to produce are filled with empty placeholders and listed in "issues".
+    """
+    itinerary, issues = [], []
+    for chunk, (start, end) in zip(chunks, ranges):
+        for n in range(start, end + 1):
+            offset = n - start
+            if offset < len(chunk) and isinstance(chunk[offset].get("activities"), list):
+                itinerary.append(dict(chunk[offset], day=f"Day {n}"))
+            else:
+                itinerary.append({"day": f"Day {n}", "activities": []})
+                issues.append(f"Day {n} missing")
+    if issues:
+        logger.warning("Chunked itinerary incomplete: %s", ", ".join(issues))
+    return {"itinerary": itinerary, "chunks": len(ranges), "issues": issues}
+
 class NeuroOrchestrator:
     """
     Orchestrates the multi-agent workflow:
     1. Plan
     2. Parallel Execution (Research, Finance, Execution strategy)
     3. Aggregate Results
+
+    Besides one (label, data) event per stage, streamed stages emit
+    ("partial", {"stage", "key", "item"}) events as each list element
+    (an itinerary day, a research insight) is completed.
     """
 
     def __init__(self):
         self.config = Config()
+        self.mission_id = None  # id of the last mission run() stored
+        self.verbose = Config.AGENT_VERBOSE  # log each agent step (set per run)
+        self._finance = None  # finance agent shared by one run's market, flight and budget stages
+        # Local models load in the background instead of on the first mission (no-op unless ollama)
+        start_warm_up()
 
-    async def run(self, goal: str) -> AsyncGenerator[tuple[str, Any], None]:
+    async def run(self, goal: str, budget: Optional[Dict[str, Any]] = None,
+                  dates: Optional[Dict[str, Any]] = None,
+                  parent: Optional[str] = None,
+                  verbose: Optional[bool] = None) -> AsyncGenerator[tuple[str, Any], None]:
         """
         Main entry point to run the agents against a goal.
         Yields (label, data) tuples for real-time UI updates.
+
+        `budget` ({"amount", "currency"}) and `dates` ({"departure", "days"})
+        override what the goal states. With `parent`, stages whose inputs are
+        unchanged since that stored mission reuse its outputs instead of running.
+        `verbose` logs every agent step (default AGENT_VERBOSE).
         """
-        logger.info(f"Starting mission for goal: {goal}")
+        store = get_mission_store() if Config.MISSION_STORE_ENABLED else None
+        previous = store.reusable(parent) if store and parent else None
+        self.mission_id = store.new_id() if store else None
+        self.verbose = Config.AGENT_VERBOSE if verbose is None else verbose
+        self._finance = None
+        logger.info("Starting mission %s for goal: %s", self.mission_id, goal)
         add_to_vector_store(goal)
+        context = {"goal": goal, "budget_limit": budget, "dates": dates}
+
+        stages, events = [], []
+        created, t0 = time.time(), time.perf_counter()
+        status = "incomplete"
+        # Every record logged by this mission's stages carries its id
+        log_token = log_context.set({**log_context.get(), "mission": self.mission_id})
+        try:
+            async for label, data in Pipeline(self.build_stages()).run(
+                    context, previous=previous, record=lambda *row: stages.append(row)):
+                events.append((time.perf_counter() - t0, label, data))
+                yield label, data
+            status = "complete"
+        finally:
+            if store:
+                try:
+                    store.save(self.mission_id, goal, context, status, stages, events,
+                               parent=parent, created=created)
+                except Exception as e:
+                    logger.warning("Could not store mission %s: %s", self.mission_id, e)
+            try:
+                log_context.reset(log_token)
+            except ValueError:  # closed from another context (e.g. garbage-collected)
+                pass
+
+    async def rerun(self, mission_id: str, budget: Optional[Dict[str, Any]] = None,
+                    dates: Optional[Dict[str, Any]] = None,
+                    verbose: Optional[bool] = None) -> AsyncGenerator[tuple[str, Any], None]:
+        """
+        Re-run a stored mission with a changed budget and/or dates; only the
+        stages downstream of the change run again (e.g. budget alone re-prices,
+        plan, research and execution are reused).
+        """
+        mission = get_mission_store().get(mission_id)
+        if mission is None:
+            raise KeyError(f"Unknown mission: {mission_id}")
+        context = mission["context"]
+        async for event in self.run(mission["goal"], budget=budget or context.get("budget_limit"),
+                                    dates=dates or context.get("dates"), parent=mission_id, verbose=verbose):
+            yield event
 
-        # --- 1. Planner Agent ---
-        planner = get_planner_agent()
+    async def replay(self, mission_id: str, realtime: bool = False) -> AsyncGenerator[tuple[str, Any], None]:
+        """Stream a stored mission's events back without calling any LLM or API."""
+        events = get_mission_store().events(mission_id)
+        if not events and get_mission_store().get(mission_id) is None:
+            raise KeyError(f"Unknown mission: {mission_id}")
+        t0 = time.perf_counter()
+        for at, label, data in events:
+            if realtime:
+                await asyncio.sleep(max(0.0, at - (time.perf_counter() - t0)))
+            yield label, data
+
+    def build_stages(self) -> List[Stage]:
+        """
+        The mission DAG. Each stage starts as soon as its inputs resolve, so
+        weather and flights run alongside the LLM stages instead of after them.
+        A new stage only needs an entry here (and a renderer for its label in app.py).
+        """
+        def travel(inputs):
+            return inputs["trip"]["travel"]
+
+        return [
+            Stage("analysis", self._stage_analysis, inputs=("goal",), cacheable=True),
+            Stage("plan", self._stage_plan, inputs=("goal",), label="plan", timeout=180, check=_plan_ok),
+            Stage("market", self._stage_market, inputs=("plan", "analysis"), label="market", timeout=60,
+                  when=lambda inputs: bool(inputs["analysis"]["tickers"]), reusable=False),
+            Stage("research", self._stage_research, inputs=("plan",), label="research", timeout=180),
+            Stage("trip", self._stage_trip, inputs=("goal", "plan", "analysis", "dates"), outputs=("trip", "days")),
+            Stage("execution", self._stage_execution, inputs=("plan", "days"), label="execution", timeout=300),
+            # Live data is fetched again on re-runs; the stage cache still absorbs repeats
+            Stage("weather", self._stage_weather, inputs=("trip",), label="weather", timeout=30,
+                  cacheable=True, when=travel, reusable=False),
+            Stage("flights", self._stage_flights, inputs=("trip",), timeout=60,
+                  cacheable=True, when=travel, reusable=False),
+            Stage("budget", self._stage_budget, inputs=("trip", "analysis", "flights", "budget_limit"), label="budget",
+                  timeout=90, when=travel),
+        ]
+
+    def _finance_agent(self):
+        # Built on first use so missions without a finance stage never build one
+        if self._finance is None:
+            self._finance = get_finance_agent()
+        return self._finance
+
+    # --- Stages ---
+    async def _stage_analysis(self, inputs, emit):
+        return analyze_goal(inputs["goal"])
+
+    async def _stage_plan(self, inputs, emit):
+        search = get_search_tool()
+        planner = get_planner_agent(search)
         plan_prompt = f"""
         Create a travel plan for the user's goal.
         Respond with JSON in this exact schema:
@@ -45,164 +213,289 @@ class NeuroOrchestrator:
           "steps": ["step1", "step2", ...]
         }}
 
-        Goal: {goal}
+        Goal: {inputs["goal"]}
         """
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Prompt tokens [planner]: %d", count_tokens(plan_prompt, Config.PLANNER_LLM_PROVIDER))
         plan = await self._arun_compat(planner, plan_prompt)
-        yield "plan", plan
-
-        if "error" in plan or not isinstance(plan, dict):
-            logger.error(f"Planning failed: {plan}")
-            return
-
-        # --- 2. Parallel Agents ---
-        # We define them here to capture 'plan' from scope
-        
-        async def run_research():
-            agent = get_researcher_agent()
-            prompt = f"""
-            Based on the plan, provide research insights and sources.
-            Respond with JSON in this exact schema:
-            {{
-              "insights": ["insight1", "insight2", ...],
-              "sources": ["url1", "url2", ...]
-            }}
-
-            Plan: {plan}
-            """
-            return "research", await self._arun_compat(agent, prompt)
-
-        async def run_finance():
-            agent = get_finance_agent()
-            tickers = extract_tickers_from_goal(goal)
-
-            # --- Case 1: Stocks/Crypto ---
-            if tickers:
-                return "market", agent.get_multiple_prices(tickers)
-
-            # --- Case 2: Trip budgeting ---
-            destination = plan.get("destination", "Unknown")
-            duration_str = plan.get("duration", "0")
-            # Simple digit extraction
-            digits = re.findall(r"\d+", str(duration_str))
-            duration = int(digits[0]) if digits else 0
-
-            # --- API Prices ---
-            def safe_call(func, fallback_msg):
-                try:
-                    value = func
-                    return value if value not in [None, "N/A", {}] else fallback_msg
-                except Exception as e:
-                    logger.warning(f"API call failed: {e}")
-                    return f"{fallback_msg} (Error: {e})"
-
-            # Note: Hardcoded dates/cities for demo purposes in original logic
-            # In a real app, these should be extracted from the plan
-            api_prices = {
-                "flight": safe_call(agent.get_flight_price("NYC", "LON", "2025-09-01"),
-                                    "Flight price unavailable"),
-                "hotel": safe_call(agent.get_hotel_price(destination, "2025-09-01", "2025-09-07"),
-                                   f"Hotel price unavailable for {destination}"),
-                "daily_costs": safe_call(agent.get_city_cost(destination),
-                                         f"City costs unavailable for {destination}"),
-                # We assume conversion from USD to INR for now as in original
-                "currency_conversion": safe_call(agent.convert_currency(100, "USD", "INR"),
-                                                 "Currency conversion unavailable")
-            }
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Planner search stats: %s", search.report())
+        if not _plan_ok(plan):
+            logger.error("Planning failed: %s", plan)
+        return plan
 
-            # --- Compute Budget ---
-            total_budget = 0.0
-            try:
-                # Flight
-                f_price = api_prices["flight"]
-                if isinstance(f_price, (int, float)) or (isinstance(f_price, str) and f_price.replace('.', '').isdigit()):
-                     total_budget += float(f_price)
-
-                # Hotel
-                h_price = api_prices["hotel"]
-                if isinstance(h_price, (int, float)) or (isinstance(h_price, str) and h_price.replace('.', '').isdigit()):
-                    total_budget += float(h_price) * max(duration, 1)
-
-                # Daily
-                daily = api_prices["daily_costs"]
-                if isinstance(daily, dict):
-                    meal = daily.get("meal", 0)
-                    transport = daily.get("transport", 0)
-                    if isinstance(meal, (int, float)) and isinstance(transport, (int, float)):
-                        total_budget += (meal + transport) * max(duration, 1)
-            except Exception as e:
-                logger.error(f"Budget calculation error: {e}")
-
-            # User budget parse
-            user_budget_match = re.search(r'\$(\d+)', goal)
-            user_budget = int(user_budget_match.group(1)) if user_budget_match else 0
-            
-            remaining = "N/A"
-            if user_budget > 0:
-                remaining = user_budget - total_budget
-
-            result = {
-                "daily_budget": [{"day": f"Day {i+1}", "cost": (total_budget / max(duration, 1))} for i in range(duration)],
-                "total_budget": round(total_budget, 2) if total_budget else "N/A",
-                "remaining_balance": remaining,
-                "api_prices": api_prices,
-                "sources": ["Amadeus API", "Booking.com API", "Numbeo API", "Yahoo Finance"]
-            }
-            return "budget", result
-
-        async def run_execution():
-            agent = get_execution_agent()
-            prompt = f"""
-            Based on the plan, create a structured itinerary.
-            Respond with JSON in this exact schema:
-            {{
-              "itinerary": [
-                {{
-                  "day": "Day 1",
-                  "activities": ["activity1", "activity2"]
-                }},
-                {{
-                  "day": "Day 2",
-                  "activities": ["activity1", "activity2"]
-                }}
-              ]
-            }}
-
-            Plan: {plan}
-            """
-            raw_result = await self._arun_compat(agent, prompt)
-            return "execution", safe_json_parse(raw_result)
-
-        # Run concurrent tasks
-        tasks = [
-            asyncio.create_task(run_research()),
-            asyncio.create_task(run_finance()),
-            asyncio.create_task(run_execution()),
-        ]
+    async def _stage_market(self, inputs, emit):
+        agent = self._finance_agent()
+        loop = asyncio.get_running_loop()
+        # Prices and trends come from the local history; stale symbols fetch only their missing bars
+        return await loop.run_in_executor(None, agent.get_market_overview, inputs["analysis"]["tickers"])
+
+    async def _stage_research(self, inputs, emit):
+        agent = get_researcher_agent()
+        # The chain adds the JSON schema; the input only carries the plan fields research needs
+        prompt, _ = build_prompt("research", inputs["plan"], "Give research insights and sources for this trip plan.",
+                                 template=self._chain_template(agent))
+        return await self._astream_compat(agent, prompt, ("insights", "sources"), emit)
+
+    async def _stage_execution(self, inputs, emit):
+        agent = get_execution_agent()
+        plan, days = inputs["plan"], inputs["days"]
+        if Config.ITINERARY_CHUNK_THRESHOLD and days > Config.ITINERARY_CHUNK_THRESHOLD:
+            return await self._chunked_itinerary(agent, plan, days, emit)
+
+        prompt, _ = build_prompt("execution", plan, "Create a day-by-day itinerary for this trip plan.",
+                                 template=self._chain_template(agent))
+        raw_result = await self._astream_compat(agent, prompt, ("itinerary",), emit)
+        return safe_json_parse(raw_result)
+
+    async def _stage_trip(self, inputs, emit):
+        """Destination, length and dates shared by the itinerary, weather, flight and budget stages."""
+        plan, analysis = inputs["plan"], inputs["analysis"]
+        dates = inputs["dates"] or {}
+        days = int(dates.get("days") or _trip_days(inputs["goal"], plan))
+        # Depart after the configured lead time unless the dates were given, return after the stay
+        if dates.get("departure"):
+            departure = date.fromisoformat(str(dates["departure"]))
+        else:
+            departure = date.today() + timedelta(days=Config.FLIGHT_LEAD_DAYS)
+        trip = {
+            "destination": plan.get("destination") or analysis["destination"] or "Unknown",
+            "days": days,
+            "departure": departure.isoformat(),
+            "return": (departure + timedelta(days=max(days, 1))).isoformat(),
+            # Market goals get an itinerary but no weather, flights or budget
+            "travel": not analysis["tickers"],
+        }
+        # The itinerary only depends on the length, so moving the dates does not regenerate it
+        return {"trip": trip, "days": days}
 
-        for finished_task in asyncio.as_completed(tasks):
+    async def _stage_weather(self, inputs, emit):
+        trip = inputs["trip"]
+        forecast = await WeatherTool().aget_forecast(trip["destination"])
+        if "error" in forecast:
+            return forecast
+        during = [d for d in forecast["daily"] if trip["departure"] <= d["date"] <= trip["return"]]
+        if during:
+            return dict(forecast, daily=during)
+        return dict(forecast, note="Trip dates are beyond the forecast horizon; showing the current outlook.")
+
+    async def _stage_flights(self, inputs, emit):
+        # Flexible-date fare grid around the trip dates; the budget uses its cheapest cell
+        trip = inputs["trip"]
+        agent = self._finance_agent()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, agent.get_flight_matrix, Config.FLIGHT_ORIGIN, trip["destination"],
+            trip["departure"], trip["return"]
+        )
+
+    async def _stage_budget(self, inputs, emit):
+        trip, analysis, flights = inputs["trip"], inputs["analysis"], inputs["flights"]
+        agent = self._finance_agent()
+        destination, duration = trip["destination"], trip["days"]
+
+        # --- API Prices ---
+        def safe_call(func, fallback_msg):
             try:
-                label, result = await finished_task
-                yield label, result
+                value = func
+                return value if value not in [None, "N/A", {}] else fallback_msg
             except Exception as e:
-                logger.error(f"Task failed: {e}")
-                yield "error", str(e)
+                logger.warning("API call failed: %s", e)
+                return f"{fallback_msg} (Error: {e})"
+
+        # User budget as given for this run, else as stated in the goal
+        stated = inputs["budget_limit"] or {"amount": analysis["amount"], "currency": analysis["currency"]}
+        user_budget = stated.get("amount") or 0
+        currency = stated.get("currency") or analysis["currency"] or "USD"
+
+        # Hotel price distribution and the exchange rates for the what-if sweeps (and the user's currency),
+        # fetched together
+        wanted = [c for c in dict.fromkeys(Config.BUDGET_SWEEP_CURRENCIES + [currency, "INR"]) if c != "USD"]
+        loop = asyncio.get_running_loop()
+        hotels, *fetched = await asyncio.gather(
+            loop.run_in_executor(None, agent.search_hotels, destination, trip["departure"], trip["return"]),
+            *(loop.run_in_executor(None, agent.get_exchange_rate, "USD", c) for c in wanted),
+            return_exceptions=True,
+        )
+        rates = {c: r for c, r in zip(wanted, fetched) if isinstance(r, float) and r > 0}
+
+        cheapest = flights.get("cheapest") if isinstance(flights, dict) else None
+        # Median nightly price across the result pages (the stay total divided by the nights, so the
+        # budget's nightly rate x trip length holds); per-tier medians feed the what-if tiers. The
+        # baseline prices the standard tier, so that median is the rate shown when there is one
+        if isinstance(hotels, Exception):
+            hotel = f"Hotel price unavailable for {destination} (Error: {hotels})"
+        elif isinstance(hotels, dict) and hotels.get("nightly"):
+            hotel = hotels.get("by_tier", {}).get("standard", hotels["nightly"])["median"]
+        else:
+            hotel = (hotels.get("error") if isinstance(hotels, dict) else None) \
+                or f"Hotel price unavailable for {destination}"
+        api_prices = {
+            "flight": cheapest["price"] if cheapest else "Flight price unavailable",
+            "flight_search": flights,
+            "hotel": hotel,
+            "hotel_search": hotels if isinstance(hotels, dict) else None,
+            "hotel_tiers": {t: s["median"] for t, s in hotels.get("by_tier", {}).items()}
+            if isinstance(hotels, dict) else {},
+            "daily_costs": safe_call(agent.get_city_cost(destination),
+                                     f"City costs unavailable for {destination}"),
+            # We assume conversion from USD to INR for now as in original
+            "currency_conversion": round(100 * rates["INR"], 2) if "INR" in rates
+            else "Currency conversion unavailable"
+        }
+
+        # --- Compute Budget ---
+        engine = BudgetEngine.from_prices(api_prices, rates)
+        total_budget = engine.baseline(duration)["total"]
+
+        # Normalize the user budget to USD
+        if user_budget and currency != "USD":
+            if currency in rates:
+                user_budget = user_budget / rates[currency]
+            else:
+                converted = agent.convert_currency(user_budget, currency, "USD")
+                user_budget = converted if isinstance(converted, (int, float)) else 0
+
+        remaining = "N/A"
+        if user_budget > 0:
+            remaining = user_budget - total_budget
+
+        return {
+            "daily_budget": [{"day": f"Day {i+1}", "cost": (total_budget / max(duration, 1))} for i in range(duration)],
+            "total_budget": round(total_budget, 2) if total_budget else "N/A",
+            "remaining_balance": remaining,
+            "api_prices": api_prices,
+            # Prices the UI's what-if sweeps run on without fetching anything again
+            "scenario_inputs": engine.to_dict(),
+            "sources": ["Amadeus API", "Booking.com API", "Numbeo API", "Yahoo Finance"]
+        }
 
     async def _arun_compat(self, agent, prompt: str) -> Any:
-        """Helper to run agents compatible with different LangChain versions."""
+        """
+        Helper to run agents compatible with different LangChain versions.
+        Concurrent identical calls (same model, template and prompt) share one LLM request.
+        """
+        callbacks = [AgentStepLogger()] if self.verbose else None
         try:
-            if hasattr(agent, "arun"):
-                out = await agent.arun(prompt)
-            elif hasattr(agent, "ainvoke"):
-                out = await agent.ainvoke(prompt)
-                if hasattr(out, 'content'): # Chat result
-                    out = out.content
-            elif hasattr(agent, "run"):
-                loop = asyncio.get_running_loop()
-                out = await loop.run_in_executor(None, lambda: agent.run(prompt))
-            else:
-                raise TypeError(f"Unsupported agent type: {type(agent)}")
-            
+            out = await _llm_flight.ado(_call_key(agent, prompt), self._invoke, agent, prompt, callbacks)
             return safe_json_parse(out)
         except Exception as e:
-            logger.error(f"Agent execution error: {e}")
+            logger.error("Agent execution error: %s", e)
+            return {"error": str(e)}
+
+    @staticmethod
+    async def _invoke(agent, prompt: str, callbacks=None) -> Any:
+        extra = {"callbacks": callbacks} if callbacks else {}
+        if hasattr(agent, "arun"):
+            out = await agent.arun(prompt, **extra)
+        elif hasattr(agent, "ainvoke"):
+            out = await agent.ainvoke(prompt, config=extra or None)
+            if hasattr(out, 'content'): # Chat result
+                out = out.content
+        elif hasattr(agent, "run"):
+            loop = asyncio.get_running_loop()
+            out = await loop.run_in_executor(None, lambda: agent.run(prompt))
+        else:
+            raise TypeError(f"Unsupported agent type: {type(agent)}")
+        return out
+
+    async def _chunked_itinerary(self, agent, plan: Dict[str, Any], days: int, on_item) -> Dict[str, Any]:
+        """
+        Generate a long itinerary as concurrent day ranges of ITINERARY_CHUNK_DAYS.
+        Each range sees the shared plan context, its share of the plan's steps and
+        the steps either side of it as continuity hints. Streamed days are
+        renumbered and emitted in trip order; the merged result is validated so
+        every day 1..days appears exactly once.
+        """
+        size = max(Config.ITINERARY_CHUNK_DAYS, 1)
+        ranges = [(start, min(start + size - 1, days)) for start in range(1, days + 1, size)]
+        steps = plan.get("steps") if isinstance(plan.get("steps"), list) else []
+        step_slices = [steps[(s - 1) * len(steps) // days:e * len(steps) // days] for s, e in ranges]
+        template = self._chain_template(agent)
+        limit = asyncio.Semaphore(max(Config.ITINERARY_MAX_PARALLEL, 1))
+
+        # Days from later ranges are held back until every earlier range has finished
+        buffers: List[List[Any]] = [[] for _ in ranges]
+        done = [False] * len(ranges)
+        cursor = 0
+
+        def flush():
+            nonlocal cursor
+            while cursor < len(ranges):
+                for item in buffers[cursor]:
+                    on_item("itinerary", item)
+                buffers[cursor] = []
+                if not done[cursor]:
+                    return
+                cursor += 1
+
+        async def generate(i: int) -> List[Any]:
+            start, end = ranges[i]
+            received = []
+
+            def on_day(key, item):
+                if not isinstance(item, dict) or len(received) > end - start:
+                    return
+                item = dict(item, day=f"Day {start + len(received)}")
+                received.append(item)
+                buffers[i].append(item)
+                if i == cursor:
+                    flush()
+
+            chunk_plan = {
+                "destination": plan.get("destination"),
+                "duration": plan.get("duration"),
+                "days": f"{start}-{end}",
+                "steps": step_slices[i],
+                "before": next((s[-1] for s in reversed(step_slices[:i]) if s), None),
+                "after": next((s[0] for s in step_slices[i + 1:] if s), None),
+            }
+            instructions = (f"Create the itinerary for Days {start}-{end} of this {days}-day trip, "
+                            f"numbering days from Day {start}. Continue from 'before' and lead into "
+                            f"'after' without repeating them.")
+            prompt, _ = build_prompt(f"execution[{start}-{end}]", chunk_plan, instructions, template=template,
+                                     budget=Config.PROMPT_TOKEN_BUDGETS.get("execution"))
+            async with limit:
+                raw = await self._astream_compat(agent, prompt, ("itinerary",), on_day)
+            parsed = safe_json_parse(raw) if isinstance(raw, str) else raw
+            if not received and isinstance(parsed, dict) and isinstance(parsed.get("itinerary"), list):
+                # Non-streaming agents: renumber the parsed days instead
+                for item in parsed["itinerary"]:
+                    on_day("itinerary", item)
+            done[i] = True
+            if i == cursor:
+                flush()
+            return received
+
+        chunks = await asyncio.gather(*(generate(i) for i in range(len(ranges))))
+        return merge_itinerary_chunks(chunks, ranges)
+
+    @staticmethod
+    def _chain_template(agent):
+        """How an LLMChain wraps its input, so prompt budgets count the full prompt."""
+        if not isinstance(agent, LLMChain):
+            return None
+        key = agent.input_keys[0]
+        return lambda text: agent.prompt.format(**{key: text})
+
+    async def _astream_compat(self, agent, prompt: str, keys, on_item) -> Any:
+        """
+        Stream an LLMChain's completion through StreamingJSONParser, calling
+        on_item(key, element) as each element of the `keys` arrays closes.
+        Other agent types fall back to _arun_compat.
+        """
+        if not isinstance(agent, LLMChain):
+            return await self._arun_compat(agent, prompt)
+
+        try:
+            parser = StreamingJSONParser(keys)
+            runnable = agent.prompt | agent.llm
+            config = {"callbacks": [AgentStepLogger()]} if self.verbose else None
+            async for chunk in runnable.astream({agent.input_keys[0]: prompt}, config=config):
+                text = chunk.content if hasattr(chunk, "content") else chunk
+                for key, item in parser.feed(text):
+                    on_item(key, item)
+            return parser.close()
+        except Exception as e:
+            logger.error("Agent streaming error: %s", e)
             return {"error": str(e)}
@@ -0,0 +1,225 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, AsyncGenerator, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config import Config
+from utils import get_logger
+
+logger = get_logger("Pipeline")
+
+Emit = Callable[[str, Any], None]
+StageFunc = Callable[[Dict[str, Any], Emit], Any]
+# record(stage, input_hash, status, value, started, elapsed) for every stage that settles
+Recorder = Callable[[str, Optional[str], str, Any, float, float], None]
+
+# Finished-stage outcomes; dependents of anything but DONE or REUSED are skipped
+DONE, FAILED, SKIPPED, REUSED = "done", "failed", "skipped", "reused"
+
+_stage_cache: Dict[str, Tuple[float, Any]] = {}
+_STAGE_CACHE_SIZE = 256
+
+
+def clear_stage_cache():
+    _stage_cache.clear()
+
+
+class Stage:
+    """
+    One node of a mission DAG.
+
+    `func(inputs, emit)` is awaited with a dict of the declared `inputs` and
+    an `emit(key, item)` callback for partial results. Its return value is the
+    stage's single output, or a dict with one entry per declared output. The
+    value is yielded as a (`label`, value) event unless `label` is None.
+
+    `when(inputs)` may skip the stage, `check(value)` marks a returned value as
+    unusable (the event is still yielded but dependents are skipped), and
+    `cacheable` stages reuse results for identical inputs for STAGE_CACHE_TTL.
+    `reusable=False` keeps a stage (live prices, forecasts) from being taken
+    over from a previous run's results.
+    """
+
+    def __init__(self, name: str, func: StageFunc, inputs: Sequence[str] = (),
+                 outputs: Optional[Sequence[str]] = None, label: Optional[str] = None,
+                 timeout: Optional[float] = None, cacheable: bool = False,
+                 when: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                 check: Optional[Callable[[Any], bool]] = None, reusable: bool = True):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs or (name,))
+        self.label = label
+        self.timeout = timeout
+        self.cacheable = cacheable
+        self.when = when
+        self.check = check
+        self.reusable = reusable
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, inputs={self.inputs}, outputs={self.outputs})"
+
+
+class Pipeline:
+    """
+    Runs stages as soon as their inputs resolve, at most `max_concurrency` at a
+    time, yielding (label, data) events in completion order. Stage failures and
+    timeouts are yielded as ("error", message) and skip the stages downstream.
+    """
+
+    def __init__(self, stages: Iterable[Stage], max_concurrency: Optional[int] = None):
+        self.stages: List[Stage] = list(stages)
+        self.max_concurrency = max_concurrency or Config.MAX_CONCURRENT_STAGES
+        self.producers: Dict[str, Stage] = {}
+        for stage in self.stages:
+            for output in stage.outputs:
+                if output in self.producers:
+                    raise ValueError(f"Output {output!r} produced by both {self.producers[output].name!r} "
+                                     f"and {stage.name!r}")
+                self.producers[output] = stage
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        state: Dict[str, int] = {}
+
+        def visit(stage: Stage, path: Tuple[str, ...]):
+            if state.get(stage.name) == 2:
+                return
+            if state.get(stage.name) == 1:
+                raise ValueError(f"Stage cycle: {' -> '.join(path + (stage.name,))}")
+            state[stage.name] = 1
+            for name in stage.inputs:
+                if name in self.producers:
+                    visit(self.producers[name], path + (stage.name,))
+            state[stage.name] = 2
+
+        for stage in self.stages:
+            visit(stage, ())
+
+    def dependencies(self, stage: Stage) -> List[Stage]:
+        return [self.producers[name] for name in stage.inputs if name in self.producers]
+
+    async def run(self, context: Optional[Dict[str, Any]] = None,
+                  previous: Optional[Dict[str, Tuple[str, Any]]] = None,
+                  record: Optional[Recorder] = None) -> AsyncGenerator[Tuple[str, Any], None]:
+        """
+        Run every stage. `context` supplies inputs no stage produces (e.g. the
+        goal); a missing input raises before anything starts.
+
+        `previous` maps stage names to (input_hash, value) from an earlier run:
+        a reusable stage whose inputs hash the same takes that value instead of
+        running. `record` is called as each stage settles.
+        """
+        previous = previous or {}
+        values: Dict[str, Any] = dict(context or {})
+        for stage in self.stages:
+            missing = [n for n in stage.inputs if n not in self.producers and n not in values]
+            if missing:
+                raise ValueError(f"Stage {stage.name!r} needs inputs nobody provides: {missing}")
+
+        events: asyncio.Queue = asyncio.Queue()
+        outcome: Dict[str, str] = {}
+        started = set()
+        tasks: List[asyncio.Task] = []
+        limit = asyncio.Semaphore(self.max_concurrency)
+
+        def launch_ready():
+            # Loop because skipping a stage can settle the stages behind it
+            progress = True
+            while progress:
+                progress = False
+                for stage in self.stages:
+                    if stage.name in started:
+                        continue
+                    deps = self.dependencies(stage)
+                    if any(d.name not in outcome for d in deps):
+                        continue
+                    started.add(stage.name)
+                    blocked = [d.name for d in deps if outcome[d.name] not in (DONE, REUSED)]
+                    if blocked:
+                        logger.info("Skipping stage %s: %s did not complete", stage.name, ", ".join(blocked))
+                        outcome[stage.name] = SKIPPED
+                        if record:
+                            record(stage.name, None, SKIPPED, None, time.time(), 0.0)
+                        progress = True
+                        continue
+                    tasks.append(asyncio.create_task(
+                        self._execute(stage, values, limit, events, previous.get(stage.name), record)))
+
+        try:
+            launch_ready()
+            # Each stage queues its events before its "finished" marker, so nothing is left behind
+            while len(outcome) < len(self.stages):
+                kind, payload = await events.get()
+                if kind == "finished":
+                    name, result = payload
+                    outcome[name] = result
+                    launch_ready()
+                else:
+                    yield kind, payload
+        finally:
+            # The consumer stopped early (or failed): do not leave stages running
+            for task in tasks:
+                task.cancel()
+
+    async def _execute(self, stage: Stage, values: Dict[str, Any], limit: asyncio.Semaphore,
+                       events: asyncio.Queue, earlier: Optional[Tuple[str, Any]] = None,
+                       record: Optional[Recorder] = None):
+        inputs = {name: values[name] for name in stage.inputs}
+        digest = input_hash(inputs)
+        started, t0 = time.time(), time.perf_counter()
+
+        def emit(key: str, item: Any):
+            events.put_nowait(("partial", {"stage": stage.name, "key": key, "item": item}))
+
+        result, value = FAILED, None
+        try:
+            if stage.when and not stage.when(inputs):
+                result = SKIPPED
+                return
+
+            key = f"{stage.name}:{digest}" if stage.cacheable else None
+            cached = _stage_cache.get(key) if key else None
+            reused = stage.reusable and earlier is not None and earlier[0] == digest
+            if reused:
+                value = earlier[1]
+                logger.info("Stage %s reused from the previous run", stage.name)
+            elif cached and time.time() - cached[0] < Config.STAGE_CACHE_TTL:
+                value = cached[1]
+            else:
+                async with limit:
+                    t0 = time.perf_counter()
+                    value = await asyncio.wait_for(stage.func(inputs, emit), stage.timeout)
+                    logger.info("Stage %s finished in %.2fs", stage.name, time.perf_counter() - t0)
+
+            produced = {stage.outputs[0]: value} if len(stage.outputs) == 1 else dict(value)
+            ok = stage.check(value) if stage.check else True
+            values.update(produced)
+            if key and ok:
+                _remember(key, value)
+            if stage.label:
+                events.put_nowait((stage.label, value))
+            result = (REUSED if reused else DONE) if ok else FAILED
+        except asyncio.TimeoutError:
+            logger.error("Stage %s timed out after %ss", stage.name, stage.timeout)
+            events.put_nowait(("error", f"{stage.name} timed out after {stage.timeout}s"))
+        except Exception as e:
+            logger.error("Stage %s failed: %s", stage.name, e)
+            events.put_nowait(("error", str(e)))
+        finally:
+            if record:
+                record(stage.name, digest, result, value, started, time.perf_counter() - t0)
+            events.put_nowait(("finished", (stage.name, result)))
+
+
+def input_hash(inputs: Dict[str, Any]) -> str:
+    """Stable digest of a stage's inputs (key order does not matter)."""
+    blob = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def _remember(key: str, value: Any):
+    if len(_stage_cache) >= _STAGE_CACHE_SIZE:
+        _stage_cache.pop(next(iter(_stage_cache)))
+    _stage_cache[key] = (time.time(), value)
@@ -0,0 +1,95 @@
+import json
+import math
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import Config
+from utils import get_logger
+
+logger = get_logger("Prompts")
+
+# Plan fields each stage reads; anything else the planner returns stays out of the prompt
+STAGE_FIELDS = {
+    "research": ("destination", "duration", "steps"),
+    "execution": ("destination", "duration", "steps"),
+}
+
+# tiktoken encodings per provider (Llama 3 on Groq uses a cl100k-derived vocabulary)
+TIKTOKEN_ENCODINGS = {"openai": "cl100k_base", "groq": "cl100k_base"}
+# Fallback estimate when no tokenizer is available
+CHARS_PER_TOKEN = {"openai": 4.0, "groq": 3.8, "ollama": 3.5, "huggingface": 3.5, "fake": 4.0}
+
+_MIN_TEXT = 24  # strings are never trimmed below this many characters
+
+
+def compact_json(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+@lru_cache(maxsize=None)
+def _encoder(provider: str):
+    name = TIKTOKEN_ENCODINGS.get(provider)
+    if not name:
+        return None
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception:
+        # tiktoken missing or its encoding files unavailable offline
+        return None
+
+
+def count_tokens(text: str, provider: Optional[str] = None) -> int:
+    """Prompt tokens for `provider`: exact with tiktoken where it applies, estimated otherwise."""
+    provider = provider or Config.DEFAULT_LLM_PROVIDER
+    encoder = _encoder(provider)
+    if encoder is not None:
+        return len(encoder.encode(text))
+    return math.ceil(len(text) / CHARS_PER_TOKEN.get(provider, 3.5))
+
+
+def _shrink(fields: Dict[str, Any]) -> bool:
+    """Trim the largest field one step: drop a list's last item or cut a long string by a quarter."""
+    for key in sorted(fields, key=lambda k: len(compact_json(fields[k])), reverse=True):
+        value = fields[key]
+        if isinstance(value, list) and len(value) > 1:
+            fields[key] = value[:-1]
+            return True
+        if isinstance(value, list) and value and isinstance(value[0], str) and len(value[0]) > _MIN_TEXT:
+            fields[key] = [value[0][:max(_MIN_TEXT, len(value[0]) * 3 // 4)].rstrip() + "…"]
+            return True
+        if isinstance(value, str) and len(value) > _MIN_TEXT:
+            fields[key] = value[:max(_MIN_TEXT, len(value) * 3 // 4)].rstrip() + "…"
+            return True
+    return False
+
+
+def build_prompt(stage: str, plan: Dict[str, Any], instructions: str,
+                 template: Optional[Callable[[str], str]] = None,
+                 budget: Optional[int] = None, provider: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    Stage input: `instructions` followed by the plan fields the stage needs as
+    compact JSON. While the full prompt (`template` wraps the input the way the
+    agent's chain will) is over the stage's token budget, the largest field is
+    trimmed. Returns (input, stats) and logs the prompt size.
+    """
+    budget = Config.PROMPT_TOKEN_BUDGETS.get(stage) if budget is None else budget
+    wanted = STAGE_FIELDS.get(stage) or tuple(plan)
+    fields = {k: plan[k] for k in wanted if plan.get(k) not in (None, "", [], {})}
+
+    def render() -> Tuple[str, int]:
+        text = f"{instructions}\nPlan: {compact_json(fields)}"
+        return text, count_tokens(template(text) if template else text, provider)
+
+    text, tokens = render()
+    trims = 0
+    while budget and tokens > budget and _shrink(fields):
+        trims += 1
+        text, tokens = render()
+
+    stats = {"stage": stage, "tokens": tokens, "budget": budget, "trims": trims}
+    logger.info("Prompt tokens [%s]: %d (budget %s, %d trims)", stage, tokens, budget, trims)
+    if budget and tokens > budget:
+        logger.warning("Prompt for %s is over its %d-token budget after trimming", stage, budget)
+    return text, stats
+
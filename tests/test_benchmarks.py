@@ -0,0 +1,113 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest import mock
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import Config
+from utils import safe_json_parse
+from tools.finance_tool import FinanceTool
+from benchmarks.fake_llm import fake_completion
+from benchmarks.stub_server import StubServer
+import memory.mission_store as mission_store
+from memory.mission_store import MissionStore
+from benchmarks.run_benchmarks import percentile, check_thresholds, check_baseline, measure_modes, reset_caches
+
+
+class TestFakeLLM(unittest.TestCase):
+
+    def test_deterministic_itinerary(self):
+        prompt = 'Create a structured itinerary. Plan: {"destination": "Paris", "duration": "4 days"}'
+        first = fake_completion(prompt)
+        self.assertEqual(first, fake_completion(prompt))
+        data = safe_json_parse(first)
+        self.assertEqual(len(data["itinerary"]), 4)
+        self.assertIn("Paris", data["itinerary"][0]["activities"][0])
+
+    def test_planner_final_answer(self):
+        out = fake_completion("Answer in the format ... Final Answer: ...\nGoal: 3-day trip to Rome")
+        plan = safe_json_parse(out.split("Final Answer:", 1)[1])
+        self.assertEqual(plan["destination"], "Rome")
+        self.assertEqual(plan["duration"], "3 days")
+
+
+class TestStubServer(unittest.TestCase):
+
+    def setUp(self):
+        self._saved = {k: getattr(Config, k) for k in
+                       ("AMADEUS_BASE_URL", "BOOKING_BASE_URL", "NUMBEO_BASE_URL", "YAHOO_BASE_URL",
+                        "DEST_ID_CACHE_PATH")}
+        self._env = mock.patch.dict(os.environ, {"NUMBEO_API_KEY": os.environ.get("NUMBEO_API_KEY") or "stub"})
+        self._env.start()
+        self.tmp = tempfile.TemporaryDirectory()
+        Config.DEST_ID_CACHE_PATH = os.path.join(self.tmp.name, "dest_ids.json")
+
+    def tearDown(self):
+        self._env.stop()
+        self.tmp.cleanup()
+        for k, v in self._saved.items():
+            setattr(Config, k, v)
+
+    def test_tools_against_stub(self):
+        with StubServer() as stub:
+            stub.configure()
+            tool = FinanceTool()
+            self.assertIsInstance(float(tool.get_flight_price("NYC", "LON", "2025-09-01")), float)
+            self.assertIsInstance(tool.get_hotel_price("Tokyo", "2025-09-01", "2025-09-07"), float)
+            self.assertIsInstance(tool.convert_currency(100, "USD", "INR"), float)
+            self.assertEqual(stub.counts["amadeus_flights"], 1)
+
+    def test_fail_mode(self):
+        with StubServer(mode="fail") as stub:
+            stub.configure()
+            self.assertEqual(FinanceTool().convert_currency(100, "USD", "INR"), "N/A")
+
+
+class TestModes(unittest.TestCase):
+
+    def setUp(self):
+        self._saved = {k: getattr(Config, k) for k in
+                       ("DEFAULT_LLM_PROVIDER", "PLANNER_LLM_PROVIDER", "EMBEDDINGS_PROVIDER", "AMADEUS_BASE_URL",
+                        "BOOKING_BASE_URL", "NUMBEO_BASE_URL", "YAHOO_BASE_URL", "WEATHER_BASE_URL",
+                        "OLLAMA_BASE_URL", "FLIGHT_FLEX_DAYS", "DEST_ID_CACHE_PATH")}
+        Config.DEFAULT_LLM_PROVIDER = Config.PLANNER_LLM_PROVIDER = "fake"
+        Config.EMBEDDINGS_PROVIDER = "fake"
+        Config.FLIGHT_FLEX_DAYS = 0
+        self.tmp = tempfile.TemporaryDirectory()
+        Config.DEST_ID_CACHE_PATH = os.path.join(self.tmp.name, "dest_ids.json")
+        self._store_patch = mock.patch.object(mission_store, "_mission_store",
+                                              MissionStore(os.path.join(self.tmp.name, "missions.sqlite")))
+        self._store_patch.start()
+
+    def tearDown(self):
+        self._store_patch.stop()
+        reset_caches()
+        self.tmp.cleanup()
+        for k, v in self._saved.items():
+            setattr(Config, k, v)
+
+    def test_every_mode_reaches_the_stub(self):
+        _, calls = measure_modes(["normal", "slow", "fail"], missions=1, slow_ms=10)
+        for mode in ("normal", "slow", "fail"):
+            # In fail mode the token request already fails, so no offers are asked for
+            self.assertGreater(sum(n for route, n in calls[mode].items() if route.startswith("amadeus")), 0, mode)
+            self.assertGreater(calls[mode].get("open_meteo_forecast", 0), 0, mode)
+
+
+class TestRegressionChecks(unittest.TestCase):
+
+    def test_percentile(self):
+        values = [float(i) for i in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 99), 99.0)
+
+    def test_thresholds_and_baseline(self):
+        results = {"throughput": {"missions_per_s": 1.0}, "peak_rss_mb": 900}
+        violations = check_thresholds(results, {"throughput.missions_per_s": {"min": 2.0},
+                                                "peak_rss_mb": {"max": 1000}})
+        self.assertEqual(len(violations), 1)
+        baseline = {"throughput": {"missions_per_s": 2.0}, "peak_rss_mb": 880}
+        self.assertEqual(len(check_baseline(results, baseline, tolerance=0.25)), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import math
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from tools.budget_engine import BudgetEngine, UNPRICED
+
+API_PRICES = {
+    "flight": 420.0,
+    "flight_search": {"cells": [
+        {"departure_date": "2030-05-10", "return_date": "2030-05-17", "price": 450.0},
+        {"departure_date": "2030-05-09", "return_date": "2030-05-16", "price": 420.0},
+        {"departure_date": "2030-05-10", "return_date": "2030-05-17", "price": 480.0},
+    ]},
+    "hotel": "100",
+    "daily_costs": {"meal": 30.0, "transport": 10.0},
+}
+
+
+class TestBudgetEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = BudgetEngine.from_prices(API_PRICES, rates={"EUR": 0.9})
+
+    def test_from_prices(self):
+        self.assertEqual(self.engine.flights, {"2030-05-09 → 2030-05-16": 420.0, "2030-05-10 → 2030-05-17": 450.0})
+        self.assertEqual(self.engine.hotel_tiers["standard"], 100.0)
+        self.assertEqual(self.engine.cheapest_flight, "2030-05-09 → 2030-05-16")
+        # Same total as the original scalar budget: flight + nightly hotel and daily costs per day
+        self.assertEqual(self.engine.baseline(5)["total"], 420.0 + 100 * 5 + 40 * 5)
+
+        failed = {"departure_date": "2030-05-08", "return_date": "2030-05-15", "error": "Amadeus auth failed"}
+        search = {"cells": API_PRICES["flight_search"]["cells"] + [failed]}
+        self.assertEqual(BudgetEngine.from_prices({**API_PRICES, "flight_search": search}).flights, self.engine.flights)
+
+        empty = BudgetEngine.from_prices({"flight": "Flight price unavailable", "hotel": "Hotel price unavailable"})
+        self.assertEqual(empty.baseline(3)["total"], 0.0)
+        self.assertEqual(empty.cheapest_flight, UNPRICED)
+
+    def test_sweep_matches_scalar_formula(self):
+        table = self.engine.sweep(range(1, 15), travelers=(1, 2, 3, 4), currencies=("USD", "EUR"))
+        self.assertEqual(len(table), 14 * 3 * 4 * 2 * 2)
+
+        for row in table.sample(25, random_state=7).itertuples():
+            rooms = math.ceil(row.travelers / 2)
+            usd = (self.engine.flights[row.flight] * row.travelers
+                   + self.engine.hotel_tiers[row.hotel_tier] * rooms * row.days
+                   + 40 * row.travelers * row.days)
+            rate = 0.9 if row.currency == "EUR" else 1.0
+            self.assertAlmostEqual(row.total, round(usd * rate, 2), places=2)
+            self.assertAlmostEqual(row.per_day, round(usd * rate / row.days, 2), places=2)
+
+        with self.assertRaises(KeyError):
+            self.engine.sweep([3], currencies=["XYZ"])
+
+    def test_max_days_under(self):
+        fits = self.engine.max_days_under(1000, tiers=["standard", "premium"], travelers=(1, 2),
+                                          flights=[self.engine.cheapest_flight])
+        by_key = {(r.hotel_tier, r.travelers): r.max_days for r in fits.itertuples()}
+        # 420 + 140/day for one traveler in a standard room
+        self.assertEqual(by_key[("standard", 1)], 4)
+        self.assertEqual(by_key[("standard", 2)], 0)  # 840 in flights + 180 for the first day
+        self.assertLess(by_key[("premium", 1)], by_key[("standard", 1)])
+
+    def test_round_trip(self):
+        again = BudgetEngine.from_dict(self.engine.to_dict())
+        self.assertTrue(again.sweep(range(1, 8)).equals(self.engine.sweep(range(1, 8))))
+
+
+if __name__ == '__main__':
+    unittest.main()
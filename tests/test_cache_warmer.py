@@ -0,0 +1,88 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest import mock
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import Config
+import memory.mission_store as mission_store
+import tools.city_costs as city_costs
+import tools.price_history as price_history
+from memory.mission_store import MissionStore
+from tools.city_costs import CityCosts
+from tools.price_history import PriceHistory
+from tools.cache_warmer import load_targets, merge_targets, prewarm, targets_from_history
+from tools.finance_tool import clear_flight_cache, clear_fx_cache, clear_hotel_cache
+from benchmarks.stub_server import StubServer
+
+
+class TestCacheWarmer(unittest.TestCase):
+
+    def setUp(self):
+        self._saved = {k: getattr(Config, k) for k in ("AMADEUS_BASE_URL", "BOOKING_BASE_URL", "NUMBEO_BASE_URL",
+                                                       "YAHOO_BASE_URL", "WEATHER_BASE_URL",
+                                                       "DEST_ID_CACHE_PATH", "FLIGHT_FLEX_DAYS")}
+        self.tmp = tempfile.TemporaryDirectory()
+        Config.DEST_ID_CACHE_PATH = os.path.join(self.tmp.name, "dest_ids.json")
+        Config.FLIGHT_FLEX_DAYS = 0
+        self._patches = [
+            mock.patch.dict(os.environ, {"NUMBEO_API_KEY": "stub"}),
+            mock.patch.object(price_history, "_price_history", PriceHistory(os.path.join(self.tmp.name, "prices"))),
+            mock.patch.object(city_costs, "_city_costs",
+                              CityCosts(cache_path=os.path.join(self.tmp.name, "city_costs.bin"), auto_refresh=False)),
+            mock.patch.object(mission_store, "_mission_store", MissionStore(os.path.join(self.tmp.name, "m.sqlite"))),
+        ]
+        for p in self._patches:
+            p.start()
+        clear_flight_cache(), clear_hotel_cache(), clear_fx_cache()
+
+    def tearDown(self):
+        for p in self._patches:
+            p.stop()
+        clear_flight_cache(), clear_hotel_cache(), clear_fx_cache()
+        self.tmp.cleanup()
+        for k, v in self._saved.items():
+            setattr(Config, k, v)
+
+    def test_targets_from_list_and_history(self):
+        listed = load_targets()
+        self.assertIn({"city": "Tokyo", "days": 7}, listed["destinations"])
+        self.assertIn(["USD", "INR"], listed["currency_pairs"])  # every budget fetches it
+
+        store = mission_store.get_mission_store()
+        for i, goal in enumerate(["Plan a 3 day trip to Lisbon", "4 days in Lisbon under 900 EUR",
+                                  "Plan a 3 day trip to Lisbon", "A week in Tokyo", "Compare AAPL and MSFT"]):
+            store.save(f"m{i}", goal, {}, "complete", [], [])
+        history = targets_from_history(missions=10, top=1)
+        self.assertEqual(history["destinations"], [{"city": "Lisbon", "days": 3}])
+        self.assertEqual(history["currency_pairs"], [["USD", "EUR"]])
+        self.assertEqual(history["symbols"], ["AAPL"])
+
+        merged = merge_targets(listed, history)
+        self.assertEqual(sum(d["city"] == "Lisbon" for d in merged["destinations"]), 1)
+        self.assertEqual(merged["currency_pairs"].count(["USD", "EUR"]), 1)
+
+    def test_prewarm_fills_caches_and_reports_coverage(self):
+        targets = {"destinations": [{"city": "Lisbon", "days": 3}, {"city": "Atlantis", "days": 2}],
+                   "currency_pairs": [["USD", "EUR"]], "symbols": ["AAPL"]}
+        with StubServer() as stub:
+            stub.configure()
+            report = prewarm(targets, concurrency=4)
+            self.assertEqual(report["coverage"]["fx"], {"warmed": 1, "total": 1})
+            self.assertEqual(report["coverage"]["hotels"]["total"], 2)
+            # Unknown to the bundled index: priced from Numbeo into the cache index
+            self.assertEqual(report["coverage"]["city_costs"], {"warmed": 2, "total": 2})
+            self.assertIsNotNone(city_costs.get_city_costs().lookup("Atlantis"))
+            self.assertIn({"kind": "flights", "target": f"{Config.FLIGHT_ORIGIN}-Atlantis"}, report["failures"])
+            self.assertLess(report["ratio"], 1.0)
+            calls = dict(stub.counts)
+
+            # Everything warmed is now served from the caches
+            again = prewarm({**targets, "destinations": targets["destinations"][:1]})
+            self.assertEqual(again["ratio"], 1.0)
+            self.assertEqual(dict(stub.counts), calls)
+        self.assertTrue(os.path.exists(Config.DEST_ID_CACHE_PATH))
+
+
+if __name__ == '__main__':
+    unittest.main()
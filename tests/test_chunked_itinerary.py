@@ -0,0 +1,48 @@
+import unittest
+import asyncio
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import Config
+from orchestrator import NeuroOrchestrator, merge_itinerary_chunks
+from agents.execution import get_execution_agent
+
+
+class TestChunkedItinerary(unittest.TestCase):
+
+    def setUp(self):
+        self._saved = {k: getattr(Config, k) for k in
+                       ("DEFAULT_LLM_PROVIDER", "ITINERARY_CHUNK_DAYS", "ITINERARY_MAX_PARALLEL")}
+        Config.DEFAULT_LLM_PROVIDER = "fake"
+        Config.ITINERARY_CHUNK_DAYS = 5
+        Config.ITINERARY_MAX_PARALLEL = 4
+
+    def tearDown(self):
+        for k, v in self._saved.items():
+            setattr(Config, k, v)
+
+    def test_merged_sequence_and_ordered_stream(self):
+        plan = {"destination": "Lisbon", "duration": "21 days",
+                "steps": [f"Step {i + 1}: explore Lisbon" for i in range(21)]}
+        streamed = []
+        result = asyncio.run(NeuroOrchestrator()._chunked_itinerary(
+            get_execution_agent(), plan, 21, lambda key, item: streamed.append(item)))
+
+        expected = [f"Day {n}" for n in range(1, 22)]
+        self.assertEqual([d["day"] for d in result["itinerary"]], expected)
+        self.assertEqual([d["day"] for d in streamed], expected)
+        self.assertEqual(result["chunks"], 5)
+        self.assertEqual(result["issues"], [])
+        # Each range was generated for its own days
+        self.assertIn("activity 17.1", result["itinerary"][16]["activities"][0])
+
+    def test_merge_fills_missing_days(self):
+        chunks = [[{"day": "Day 1", "activities": ["a"]}, {"day": "Day 1", "activities": ["b"]}], []]
+        result = merge_itinerary_chunks(chunks, [(1, 2), (3, 4)])
+        self.assertEqual([d["day"] for d in result["itinerary"]], ["Day 1", "Day 2", "Day 3", "Day 4"])
+        self.assertEqual(result["itinerary"][1]["activities"], ["b"])
+        self.assertEqual(result["issues"], ["Day 3 missing", "Day 4 missing"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import csv
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import Config
+from tools.city_costs import CityCostIndex, CityCosts, MEALS_PER_DAY, build_index, city_key, write_index
+from benchmarks.stub_server import StubServer
+
+
+class TestCityCostIndex(unittest.TestCase):
+
+    def test_bundled_index_matches_source(self):
+        with open(Config.CITY_COSTS_SOURCE, encoding="utf-8", newline="") as f:
+            source = {r["name"]: r for r in csv.DictReader(f)}
+        index = CityCostIndex(Config.CITY_COSTS_PATH)
+        self.assertEqual(len(index), len(source))
+        for record in index.records():
+            row = source[record["name"]]
+            self.assertAlmostEqual(record["meal"], float(row["meal"]), places=2)
+            self.assertAlmostEqual(record["transit_ticket"], float(row["transit_ticket"]), places=2)
+            self.assertEqual(record["country"], row["country"])
+
+    def test_build_and_find(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "costs.csv")
+            with open(source, "w", encoding="utf-8") as f:
+                f.write("name,country,meal,transit_ticket\nZurich,CH,30,4\nAccra,GH,6,0.5\nLima,PE,4,0.5\n")
+            path = os.path.join(tmp, "costs.bin")
+            self.assertEqual(build_index(source, path, 20300101), 3)
+
+            index = CityCostIndex(path)
+            self.assertEqual(index.data_version, 20300101)
+            self.assertEqual(index.keys(), ["accra", "lima", "zurich"])
+            self.assertEqual(index.find("zurich")["meal"], 30.0)
+            self.assertIsNone(index.find("paris"))
+            index.close()
+
+    def test_long_non_ascii_names(self):
+        # 31 ASCII bytes then a two-byte character: the 32-byte name field would split it
+        name = "a" * 31 + "é" + " Village"
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "costs.bin")
+            write_index(path, [{"name": name, "country": "FR", "meal": 12, "transit_ticket": 2},
+                               {"name": "東京都渋谷区恵比寿南一丁目", "country": "日本", "meal": 9, "transit_ticket": 1},
+                               {"name": "Lima", "country": "PE", "meal": 4, "transit_ticket": 0.5}], 20300101)
+            index = CityCostIndex(path)
+            record = index.find(city_key(name))
+            self.assertEqual(record["name"], "a" * 31)
+            self.assertEqual(record["country"], "FR")
+            self.assertEqual(index.find(city_key("東京都渋谷区恵比寿南一丁目"))["country"], "")  # invalid code dropped
+            self.assertEqual(len(list(index.records())), 3)
+            self.assertEqual(len(index.keys()), 3)
+            index.close()
+
+
+class TestCityCosts(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp.name, "city_costs.bin")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_matching(self):
+        costs = CityCosts(cache_path=self.cache_path, auto_refresh=False)
+        self.assertEqual(costs.get("Kyoto, Japan")["city"], "Kyoto")
+        self.assertEqual(costs.get("NYC")["city"], "New York")
+        self.assertEqual(costs.get("Bengaluru")["city"], "Bangalore")
+        self.assertEqual(costs.get("Barcelonna")["city"], "Barcelona")
+
+        tokyo = costs.get("Tokyo")
+        self.assertEqual(tokyo["meal"], round(costs.lookup("Tokyo")["meal"] * MEALS_PER_DAY, 2))
+        self.assertFalse(tokyo["estimated"])
+
+        unknown = costs.get("Atlantis")
+        self.assertTrue(unknown["estimated"])
+        self.assertIsNone(unknown["city"])
+        self.assertGreater(unknown["meal"], 0)
+
+    def test_background_refresh_swaps_index(self):
+        os.environ["NUMBEO_API_KEY"], key = "stub", os.environ.get("NUMBEO_API_KEY")
+        base_url = Config.NUMBEO_BASE_URL
+        try:
+            with StubServer() as stub:
+                Config.NUMBEO_BASE_URL = stub.base_url
+                bundled = CityCosts(cache_path=self.cache_path, auto_refresh=False).get("Lima")
+                costs = CityCosts(cache_path=self.cache_path, max_age=0)
+                before = costs.get("Lima")  # served locally, refresh queued
+                self.assertEqual(before, bundled)
+                costs.wait_for_refresh(timeout=10)
+                self.assertGreaterEqual(stub.counts["numbeo_prices"], 1)
+
+                after = CityCosts(cache_path=self.cache_path, auto_refresh=False).get("Lima")
+                self.assertNotEqual(after["meal"], before["meal"])
+                self.assertEqual(costs.get("Lima")["meal"], after["meal"])
+
+                # Cities missing from the index are added by the refresh
+                costs.max_age = float("inf")
+                self.assertTrue(costs.get("Gotham City")["estimated"])
+                costs.wait_for_refresh(timeout=10)
+                self.assertFalse(costs.get("Gotham City")["estimated"])
+        finally:
+            Config.NUMBEO_BASE_URL = base_url
+            if key is None:
+                del os.environ["NUMBEO_API_KEY"]
+            else:
+                os.environ["NUMBEO_API_KEY"] = key
+
+    def test_stale_cache_is_ignored(self):
+        costs = CityCosts(cache_path=self.cache_path, auto_refresh=False)
+        source = [dict(r, meal=999.0) for r in costs.index.records()]
+        write_index(self.cache_path, source, 20000101, built_at=costs.index.built_at - 1)
+        self.assertNotEqual(CityCosts(cache_path=self.cache_path, auto_refresh=False).get("Lima")["meal"], 999.0 * 2)
+
+        write_index(self.cache_path, source, 20990101, built_at=time.time())
+        self.assertEqual(CityCosts(cache_path=self.cache_path, auto_refresh=False).get("Lima")["meal"], 999.0 * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import Config
+from tools.finance_tool import FinanceTool, clear_flight_cache
+from tools.gazetteer import get_gazetteer
+from benchmarks.stub_server import StubServer
+
+
+class TestAirports(unittest.TestCase):
+
+    def test_metro_city_and_airport_codes(self):
+        gaz = get_gazetteer()
+        self.assertEqual(gaz.airports("NYC"), ["JFK", "EWR", "LGA"])
+        self.assertEqual(gaz.airports("Tokyo, Japan"), ["HND", "NRT"])
+        self.assertEqual(gaz.airports("CDG"), ["CDG"])
+        self.assertEqual(gaz.airports("Atlantis"), [])
+
+
+class TestFlightMatrix(unittest.TestCase):
+
+    def setUp(self):
+        self._base_url, self._budget = Config.AMADEUS_BASE_URL, Config.FLIGHT_MAX_QUERIES
+        Config.FLIGHT_MAX_QUERIES = 100
+        clear_flight_cache()
+        self.stub = StubServer().start()
+        Config.AMADEUS_BASE_URL = self.stub.base_url
+
+    def tearDown(self):
+        self.stub.stop()
+        Config.AMADEUS_BASE_URL, Config.FLIGHT_MAX_QUERIES = self._base_url, self._budget
+        clear_flight_cache()
+
+    def test_grid_and_cheapest(self):
+        result = FinanceTool().get_flight_matrix("NYC", "London", "2030-05-10", "2030-05-17",
+                                                 flex_days=1, max_airports=2)
+        # 2 origins x 2 destinations x 3 departures x 3 returns
+        self.assertEqual(result["stats"]["cells"], 36)
+        self.assertEqual(result["stats"]["errors"], 0)
+        self.assertEqual(self.stub.counts["amadeus_flights"], 36)
+        self.assertEqual(self.stub.counts["amadeus_token"], 1)
+        self.assertEqual(sorted(result["matrix"]), ["2030-05-09", "2030-05-10", "2030-05-11"])
+
+        cheapest = result["cheapest"]
+        self.assertEqual(cheapest["price"], min(c["price"] for c in result["cells"]))
+        self.assertIn(cheapest["origin"], ("JFK", "EWR"))
+        self.assertEqual(result["matrix"][cheapest["departure_date"]][cheapest["return_date"]], cheapest["price"])
+
+    def test_cells_are_cached(self):
+        tool = FinanceTool()
+        tool.get_flight_matrix("NYC", "LHR", "2030-05-10", flex_days=2)
+        self.stub.reset_counts()
+
+        again = tool.get_flight_matrix("NYC", "LHR", "2030-05-10", flex_days=2)
+        self.assertEqual(self.stub.counts["amadeus_flights"], 0)
+        self.assertEqual(again["stats"]["cached"], again["stats"]["cells"])
+        self.assertEqual(set(again["matrix"]["2030-05-10"]), {"one-way"})
+
+        # Widening the window only queries the new dates
+        wider = tool.get_flight_matrix("NYC", "LHR", "2030-05-10", flex_days=3)
+        self.assertEqual(self.stub.counts["amadeus_flights"], wider["stats"]["cells"] - again["stats"]["cells"])
+
+    def test_query_budget_keeps_nearest_dates(self):
+        Config.FLIGHT_MAX_QUERIES = 4
+        result = FinanceTool().get_flight_matrix("JFK", "LHR", "2030-05-10", "2030-05-17", flex_days=3)
+        self.assertEqual(result["stats"]["cells"], 4)
+        self.assertIn("2030-05-17", result["matrix"]["2030-05-10"])
+
+        # Within a date distance the main airports are queried first
+        clear_flight_cache()
+        Config.FLIGHT_MAX_QUERIES = 5
+        result = FinanceTool().get_flight_matrix("NYC", "LON", "2030-05-10", "2030-05-17", flex_days=1)
+        shifted = [c for c in result["cells"] if (c["departure_date"], c["return_date"]) != ("2030-05-10", "2030-05-17")]
+        self.assertEqual(len(shifted), 1)
+        self.assertEqual((shifted[0]["origin"], shifted[0]["destination"]), ("JFK", "LHR"))
+        self.assertEqual(result["stats"]["skipped"], 36 - 5)
+
+    def test_query_budget_counts_only_uncached_cells(self):
+        Config.FLIGHT_MAX_QUERIES = 4
+        tool = FinanceTool()
+        first = tool.get_flight_matrix("NYC", "LON", "2030-05-10", "2030-05-17", flex_days=1)
+        second = tool.get_flight_matrix("NYC", "LON", "2030-05-10", "2030-05-17", flex_days=1)
+        self.assertEqual(self.stub.counts["amadeus_flights"], 8)
+        self.assertEqual((second["stats"]["cached"], second["stats"]["queried"]), (4, 4))
+        self.assertEqual(second["stats"]["cells"], 8)
+        cells = {(c["origin"], c["destination"], c["departure_date"], c["return_date"]) for c in second["cells"]}
+        self.assertLessEqual({(c["origin"], c["destination"], c["departure_date"], c["return_date"])
+                              for c in first["cells"]}, cells)
+
+    def test_upstream_failure(self):
+        self.stub.mode = "fail"
+        result = FinanceTool().get_flight_matrix("JFK", "LHR", "2030-05-10")
+        self.assertIsNone(result["cheapest"])
+        self.assertEqual(result["matrix"], {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import os
+import sys
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from goal_analyzer import GoalAnalyzer, analyze_goal
+
+
+class TestGoalAnalyzer(unittest.TestCase):
+
+    def test_trip_goal(self):
+        result = analyze_goal("Plan a 7-day trip to Tokyo with $2,000")
+        self.assertEqual(result["tickers"], [])
+        self.assertEqual(result["currency"], "USD")
+        self.assertEqual(result["amount"], 2000.0)
+        self.assertEqual(result["duration"], 7)
+        self.assertEqual(result["destination"], "Tokyo")
+
+    def test_currency_names_and_units(self):
+        result = analyze_goal("2 weeks in New York City for ₹150000")
+        self.assertEqual((result["currency"], result["amount"]), ("INR", 150000.0))
+        self.assertEqual(result["duration"], 14)
+        self.assertEqual(result["destination"], "New York City")
+        self.assertEqual(analyze_goal("Weekend in Paris under 1500 euros")["duration"], 2)
+
+    def test_word_boundaries(self):
+        # "meta" in "metadata", "eth" in "Ethiopia" and lowercase symbols are not tickers
+        self.assertEqual(analyze_goal("metadata for an Ethiopia trip, nvda")["tickers"], [])
+        self.assertEqual(analyze_goal("Should I invest 2k USD in AMZN or BRK-B?")["tickers"], ["AMZN", "BRK-B"])
+
+    def test_ambiguous_names_need_market_context(self):
+        self.assertEqual(analyze_goal("Take an uber from the airport")["tickers"], [])
+        self.assertEqual(analyze_goal("uber stock price")["tickers"], ["UBER"])
+
+    def test_listing_file(self):
+        analyzer = GoalAnalyzer({"tickers": {}, "currencies": {}, "cities": []})
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as f:
+            f.write("Symbol|Security Name|Market Category\n")
+            f.write("ZNGA|Zynga Inc. - Class A Common Stock|Q\n")
+            f.write("CRWD|CrowdStrike Holdings, Inc. - Class A Common Stock|Q\n")
+        try:
+            self.assertEqual(analyzer.load_listing(f.name), 2)
+        finally:
+            os.unlink(f.name)
+        self.assertEqual(analyzer.analyze("Is crowdstrike stock a buy?")["tickers"], ["CRWD"])
+        self.assertEqual(analyzer.analyze("Compare ZNGA and CRWD")["tickers"], ["ZNGA", "CRWD"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import Config
+from tools.budget_engine import BudgetEngine
+from tools.finance_tool import FinanceTool, clear_hotel_cache, hotel_price_stats
+from benchmarks.stub_server import StubServer
+
+
+class TestHotelSearch(unittest.TestCase):
+
+    def setUp(self):
+        self._saved = {k: getattr(Config, k) for k in ("AMADEUS_BASE_URL", "BOOKING_BASE_URL", "NUMBEO_BASE_URL",
+                                                       "YAHOO_BASE_URL", "WEATHER_BASE_URL",
+                                                       "DEST_ID_CACHE_PATH")}
+        self.tmp = tempfile.TemporaryDirectory()
+        Config.DEST_ID_CACHE_PATH = os.path.join(self.tmp.name, "dest_ids.json")
+        clear_hotel_cache()
+
+    def tearDown(self):
+        clear_hotel_cache()
+        self.tmp.cleanup()
+        for k, v in self._saved.items():
+            setattr(Config, k, v)
+
+    def test_stats(self):
+        stats = hotel_price_stats([0, 2, 3, 3, 4, 5, 5], [40, 60, 90, 110, 150, 200, 260])
+        self.assertEqual(stats["nightly"], {"min": 40.0, "median": 110.0, "p75": 175.0, "count": 7})
+        self.assertEqual(stats["by_class"]["3"], {"min": 90.0, "median": 100.0, "p75": 105.0, "count": 2})
+        self.assertEqual(stats["by_tier"]["budget"]["count"], 2)  # unrated and two-star
+        self.assertEqual(stats["by_tier"]["premium"], {"min": 150.0, "median": 200.0, "p75": 230.0, "count": 3})
+        self.assertEqual(hotel_price_stats([], [])["by_tier"], {})
+
+    def test_pages_fetched_concurrently_and_cached(self):
+        with StubServer(latency_ms=200) as stub:
+            stub.configure()
+            tool = FinanceTool()
+            started = time.perf_counter()
+            result = tool.search_hotels("Lisbon", "2030-05-10", "2030-05-13", pages=4)
+            elapsed = time.perf_counter() - started
+            self.assertEqual(stub.counts["booking_search"], 4)
+            self.assertLess(elapsed, 0.7)  # destination lookup + one page's latency, not four pages
+
+            self.assertEqual((result["listings"], result["pages"], result["errors"], result["nights"]), (80, 4, 0, 3))
+            self.assertEqual(set(result["by_class"]), {"2", "3", "4", "5"})
+            # Gross prices cover the stay (stub listings are 7.5 apart); the distribution is per night
+            self.assertAlmostEqual(result["by_class"]["2"]["min"] * 3 + 7.5, result["by_class"]["3"]["min"] * 3, places=1)
+            self.assertLessEqual(result["nightly"]["median"], result["nightly"]["p75"])
+
+            again = tool.search_hotels("lisbon", "2030-05-10", "2030-05-13", pages=4)
+            self.assertEqual((stub.counts["booking_search"], stub.counts["booking_locations"]), (4, 1))
+            self.assertTrue(again["cached"])
+
+            # Other dates for the same destination are a separate search
+            later = tool.search_hotels("Lisbon", "2030-06-01", "2030-06-03", pages=4)
+            self.assertFalse(later["cached"])
+            self.assertEqual((later["checkin"], later["nights"]), ("2030-06-01", 2))
+            self.assertEqual((stub.counts["booking_search"], stub.counts["booking_locations"]), (8, 1))
+
+    def test_budget_tiers_from_search(self):
+        with StubServer() as stub:
+            stub.configure()
+            result = FinanceTool().search_hotels("Lisbon", "2030-05-10", "2030-05-13", pages=2)
+        engine = BudgetEngine.from_prices({"hotel": result["nightly"]["median"],
+                                           "hotel_tiers": {t: s["median"] for t, s in result["by_tier"].items()}})
+        self.assertEqual(engine.hotel_tiers["premium"], result["by_tier"]["premium"]["median"])
+        self.assertLess(engine.hotel_tiers["budget"], engine.hotel_tiers["premium"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import unittest
+import asyncio
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+from unittest import mock
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import Config
+import utils
+from utils import configure_logging, flush_logging, get_logger, log_context
+import memory.mission_store as mission_store
+from memory.mission_store import MissionStore
+from orchestrator import NeuroOrchestrator
+from pipeline import clear_stage_cache
+from benchmarks.stub_server import StubServer
+
+
+class FormattedOn:
+    """Argument that remembers which thread turned it into text."""
+
+    def __init__(self):
+        self.thread = None
+
+    def __str__(self):
+        self.thread = threading.current_thread().name
+        return "value"
+
+
+class LoggingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        root = logging.getLogger()
+        self._saved = (root.level, list(root.handlers))
+        self.out = io.StringIO()
+
+    def tearDown(self):
+        root = logging.getLogger()
+        if utils._listener:
+            utils._listener.stop()
+            utils._listener = None
+        root.handlers[:] = self._saved[1]
+        root.setLevel(self._saved[0])
+
+    def lines(self):
+        flush_logging()
+        return [json.loads(line) for line in self.out.getvalue().splitlines()]
+
+
+class TestLoggingPipeline(LoggingTestCase):
+
+    def test_json_records_with_context(self):
+        configure_logging("INFO", "json", stream=self.out)
+        log = get_logger("Test")
+        token = log_context.set({"mission": "m-1"})
+        try:
+            log.info("Stage %s finished", "plan", extra={"elapsed_s": 0.5})
+        finally:
+            log_context.reset(token)
+        log.warning("outside")
+        first, second = self.lines()
+        self.assertEqual((first["level"], first["logger"], first["msg"]), ("INFO", "Test", "Stage plan finished"))
+        self.assertEqual((first["mission"], first["elapsed_s"]), ("m-1", 0.5))
+        self.assertNotIn("mission", second)
+
+    def test_formatted_on_listener_thread(self):
+        configure_logging("INFO", "json", stream=self.out)
+        arg = FormattedOn()
+        get_logger("Test").info("lazy %s", arg)
+        self.assertEqual(self.lines()[0]["msg"], "lazy value")
+        self.assertIsNotNone(arg.thread)
+        self.assertNotEqual(arg.thread, threading.current_thread().name)
+
+        # Disabled levels never format their arguments
+        arg = FormattedOn()
+        get_logger("Test").debug("skipped %s", arg)
+        flush_logging()
+        self.assertIsNone(arg.thread)
+
+    def test_debug_sampled_per_call_site(self):
+        configure_logging("DEBUG", "json", debug_sample_rate=0.25, stream=self.out)
+        log = get_logger("Test")
+        for i in range(8):
+            log.debug("noisy %d", i)
+            log.debug("other %d", i)
+            log.info("kept %d", i)
+        records = self.lines()
+        self.assertEqual([r["msg"] for r in records if r["msg"].startswith("noisy")], ["noisy 0", "noisy 4"])
+        self.assertEqual(sum(r["msg"].startswith("other") for r in records), 2)
+        self.assertEqual(sum(r["level"] == "INFO" for r in records), 8)
+        self.assertEqual({r.get("sampled") for r in records if r["level"] == "DEBUG"}, {4})
+
+
+class TestAgentVerbosity(LoggingTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self._config = {k: getattr(Config, k) for k in
+                        ("DEFAULT_LLM_PROVIDER", "PLANNER_LLM_PROVIDER", "AMADEUS_BASE_URL", "BOOKING_BASE_URL",
+                         "NUMBEO_BASE_URL", "YAHOO_BASE_URL", "WEATHER_BASE_URL", "FLIGHT_FLEX_DAYS",
+                         "DEST_ID_CACHE_PATH", "EMBEDDINGS_PROVIDER")}
+        Config.DEFAULT_LLM_PROVIDER = Config.PLANNER_LLM_PROVIDER = "fake"
+        Config.EMBEDDINGS_PROVIDER = "fake"
+        Config.FLIGHT_FLEX_DAYS = 0
+        self.tmp = tempfile.TemporaryDirectory()
+        Config.DEST_ID_CACHE_PATH = os.path.join(self.tmp.name, "dest_ids.json")
+        store = MissionStore(os.path.join(self.tmp.name, "missions.sqlite"))
+        self._store_patch = mock.patch.object(mission_store, "_mission_store", store)
+        self._store_patch.start()
+        self.stub = StubServer().start()
+        self.stub.configure()
+        clear_stage_cache()
+
+    def tearDown(self):
+        self.stub.stop()
+        self._store_patch.stop()
+        self.tmp.cleanup()
+        for k, v in self._config.items():
+            setattr(Config, k, v)
+        super().tearDown()
+
+    def run_mission(self, verbose):
+        orchestrator = NeuroOrchestrator()
+
+        async def go():
+            async for _ in orchestrator.run("Plan a 3-day trip to Lisbon", verbose=verbose):
+                pass
+
+        asyncio.run(go())
+        return orchestrator.mission_id
+
+    def test_verbose_per_run(self):
+        configure_logging("INFO", "json", stream=self.out)
+        quiet = self.run_mission(verbose=False)
+        loud = self.run_mission(verbose=True)
+        records = self.lines()
+
+        steps = [r for r in records if r["logger"] == "Agents"]
+        self.assertTrue(steps)
+        self.assertEqual({r.get("mission") for r in steps}, {loud})
+        # Stage logs carry the mission id of the run that produced them
+        stage_missions = {r.get("mission") for r in records if r["logger"] == "Pipeline"}
+        self.assertEqual(stage_missions, {quiet, loud})
+
+
+if __name__ == '__main__':
+    unittest.main()
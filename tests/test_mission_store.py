@@ -0,0 +1,115 @@
+import unittest
+import asyncio
+import os
+import sys
+import tempfile
+from unittest import mock
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import Config
+import memory.mission_store as mission_store
+from memory.mission_store import MissionStore
+from orchestrator import NeuroOrchestrator
+from pipeline import clear_stage_cache
+from benchmarks.stub_server import StubServer
+
+LLM_AGENTS = ("get_planner_agent", "get_researcher_agent", "get_execution_agent")
+
+
+def collect(events):
+    async def go():
+        return [event async for event in events]
+    return asyncio.run(go())
+
+
+class TestMissionStore(unittest.TestCase):
+
+    def setUp(self):
+        self._saved = {k: getattr(Config, k) for k in
+                       ("DEFAULT_LLM_PROVIDER", "PLANNER_LLM_PROVIDER", "AMADEUS_BASE_URL", "BOOKING_BASE_URL",
+                        "NUMBEO_BASE_URL", "YAHOO_BASE_URL", "WEATHER_BASE_URL", "FLIGHT_FLEX_DAYS",
+                        "DEST_ID_CACHE_PATH", "EMBEDDINGS_PROVIDER")}
+        Config.DEFAULT_LLM_PROVIDER = Config.PLANNER_LLM_PROVIDER = "fake"
+        Config.EMBEDDINGS_PROVIDER = "fake"
+        Config.FLIGHT_FLEX_DAYS = 0  # a small fare grid keeps the rate limiter out of the timings
+        self.tmp = tempfile.TemporaryDirectory()
+        Config.DEST_ID_CACHE_PATH = os.path.join(self.tmp.name, "dest_ids.json")
+        self.store = MissionStore(os.path.join(self.tmp.name, "missions.sqlite"))
+        self._store_patch = mock.patch.object(mission_store, "_mission_store", self.store)
+        self._store_patch.start()
+        self.stub = StubServer().start()
+        self.stub.configure()
+        clear_stage_cache()
+
+    def tearDown(self):
+        self.stub.stop()
+        self._store_patch.stop()
+        self.tmp.cleanup()
+        for k, v in self._saved.items():
+            setattr(Config, k, v)
+
+    def test_mission_is_stored(self):
+        orchestrator = NeuroOrchestrator()
+        events = collect(orchestrator.run("Plan a 3-day trip to Lisbon with $1500"))
+
+        mission = self.store.get(orchestrator.mission_id)
+        self.assertEqual(mission["status"], "complete")
+        self.assertEqual(mission["context"]["goal"], "Plan a 3-day trip to Lisbon with $1500")
+        stages = self.store.stages(orchestrator.mission_id)
+        self.assertEqual(stages["plan"]["status"], "done")
+        self.assertEqual(stages["market"]["status"], "skipped")
+        self.assertEqual(stages["trip"]["output"]["days"], 3)
+        self.assertEqual(self.store.events(orchestrator.mission_id)[-1][1:], events[-1])
+
+    def test_budget_rerun_reuses_llm_stages(self):
+        orchestrator = NeuroOrchestrator()
+        first = dict(e for e in collect(orchestrator.run("Plan a 3-day trip to Lisbon with $1500"))
+                     if e[0] != "partial")
+        parent = orchestrator.mission_id
+
+        with mock.patch.multiple("orchestrator", **{name: mock.DEFAULT for name in LLM_AGENTS}) as agents:
+            events = collect(orchestrator.rerun(parent, budget={"amount": 5000, "currency": "USD"}))
+        for agent in agents.values():
+            agent.assert_not_called()
+
+        rerun = dict(e for e in events if e[0] != "partial")
+        self.assertEqual(rerun["plan"], first["plan"])
+        self.assertEqual(rerun["execution"], first["execution"])
+        self.assertEqual(rerun["budget"]["total_budget"], first["budget"]["total_budget"])
+        self.assertAlmostEqual(rerun["budget"]["remaining_balance"], 5000 - first["budget"]["total_budget"], places=2)
+
+        stages = self.store.stages(orchestrator.mission_id)
+        self.assertEqual(self.store.get(orchestrator.mission_id)["parent"], parent)
+        self.assertEqual({s for s, row in stages.items() if row["status"] == "reused"},
+                         {"analysis", "plan", "research", "trip", "execution"})
+        self.assertEqual(stages["budget"]["status"], "done")
+
+    def test_date_change_keeps_itinerary(self):
+        orchestrator = NeuroOrchestrator()
+        collect(orchestrator.run("Plan a 3-day trip to Lisbon with $1500"))
+        parent = orchestrator.mission_id
+
+        events = collect(orchestrator.rerun(parent, dates={"departure": "2030-06-01"}))
+        stages = self.store.stages(orchestrator.mission_id)
+        self.assertEqual(stages["trip"]["status"], "done")
+        self.assertEqual(stages["trip"]["output"]["trip"]["departure"], "2030-06-01")
+        self.assertEqual(stages["execution"]["status"], "reused")
+        self.assertNotIn("partial", [label for label, _ in events])
+
+    def test_replay_makes_no_calls(self):
+        orchestrator = NeuroOrchestrator()
+        events = collect(orchestrator.run("Plan a 3-day trip to Lisbon with $1500"))
+        self.stub.reset_counts()
+
+        with mock.patch.multiple("orchestrator", **{name: mock.DEFAULT for name in LLM_AGENTS}) as agents:
+            replayed = collect(orchestrator.replay(orchestrator.mission_id))
+        self.assertEqual(replayed, [tuple(e) for e in events])
+        self.assertEqual(sum(self.stub.counts.values()), 0)
+        for agent in agents.values():
+            agent.assert_not_called()
+
+        with self.assertRaises(KeyError):
+            collect(orchestrator.replay("missing"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import Config
+import tools.ollama_client as ollama_client
+from tools.ollama_client import keep_alive_value, llm_metrics, resident_models, start_warm_up, warm_up
+from benchmarks.stub_server import StubServer
+
+SETTINGS = ("OLLAMA_BASE_URL", "OLLAMA_MODEL", "OLLAMA_PRELOAD_MODELS", "OLLAMA_KEEP_ALIVE",
+            "OLLAMA_MAX_CONCURRENCY", "DEFAULT_LLM_PROVIDER", "PLANNER_LLM_PROVIDER", "OLLAMA_WARMUP")
+
+
+class TestOllamaClient(unittest.TestCase):
+
+    def setUp(self):
+        self._saved = {k: getattr(Config, k) for k in SETTINGS}
+        Config.OLLAMA_MODEL = "mistral"
+        Config.OLLAMA_PRELOAD_MODELS = ["llama3"]
+        Config.OLLAMA_KEEP_ALIVE = "30m"
+        llm_metrics.reset()
+        self.stub = StubServer().start()
+        self.stub.configure()
+        self.stub.ollama.load_ms = 200
+
+    def tearDown(self):
+        self.stub.stop()
+        for k, v in self._saved.items():
+            setattr(Config, k, v)
+
+    def test_warm_up_then_first_call_is_warm(self):
+        report = warm_up()
+        self.assertEqual(list(report), ["mistral", "llama3"])
+        self.assertTrue(all(r["ok"] and r["resident"] for r in report.values()))
+        self.assertGreaterEqual(report["mistral"]["load_s"], 0.2)
+
+        Config.get_llm("ollama").invoke("Plan a 3-day trip to Lisbon")
+        stats = llm_metrics.summary()["mistral"]
+        self.assertEqual((stats["calls"], stats["cold_starts"]), (1, 0))
+        self.assertLess(stats["ttft_p50_s"], 0.2)
+        self.assertEqual(self.stub.ollama.loads, {"mistral": 1, "llama3": 1})
+
+    def test_cold_call_reports_load(self):
+        Config.get_llm("ollama").invoke("Plan a 3-day trip to Lisbon")
+        stats = llm_metrics.summary()["mistral"]
+        self.assertEqual(stats["cold_starts"], 1)
+        self.assertGreaterEqual(stats["ttft_p50_s"], 0.2)
+
+    def test_keep_alive(self):
+        self.assertEqual(keep_alive_value("-1"), -1)
+        self.assertEqual(keep_alive_value("1h"), "1h")
+
+        Config.OLLAMA_KEEP_ALIVE = "-1"
+        Config.get_llm("ollama").invoke("hello")
+        self.assertTrue(resident_models()["mistral"].startswith("2318"))
+
+        Config.OLLAMA_KEEP_ALIVE = "0"
+        Config.get_llm("ollama").invoke("hello")
+        self.assertNotIn("mistral", resident_models())
+
+    def test_requests_capped_per_server(self):
+        Config.OLLAMA_MAX_CONCURRENCY = 2
+        self.stub.ollama.ms_per_token = 5
+        llm = Config.get_llm("ollama")
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            list(pool.map(lambda i: llm.invoke(f"question {i}"), range(6)))
+
+        async def go():
+            await asyncio.gather(*(llm.ainvoke(f"question {i}") for i in range(6)))
+
+        asyncio.run(go())
+        self.assertEqual(self.stub.ollama.peak_inflight, 2)
+        stats = llm_metrics.summary()["mistral"]
+        self.assertEqual((stats["calls"], stats["errors"]), (12, 0))
+        self.assertGreater(stats["queued_p95_s"], 0)
+
+    def test_start_warm_up_once_for_ollama(self):
+        with mock.patch.object(ollama_client, "_warm_up_thread", None):
+            Config.DEFAULT_LLM_PROVIDER = Config.PLANNER_LLM_PROVIDER = "groq"
+            self.assertIsNone(start_warm_up())
+
+            Config.PLANNER_LLM_PROVIDER, Config.OLLAMA_WARMUP = "ollama", True
+            thread = start_warm_up()
+            self.assertIs(start_warm_up(), thread)
+            thread.join(5)
+        self.assertEqual(resident_models().keys(), {"mistral", "llama3"})
+
+
+if __name__ == '__main__':
+    unittest.main()
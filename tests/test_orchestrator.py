@@ -2,46 +2,65 @@ import unittest
 import asyncio
 import os
 import sys
+import tempfile
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+import memory.mission_store as mission_store
+from memory.mission_store import MissionStore
 from orchestrator import NeuroOrchestrator
 
 class TestOrchestrator(unittest.IsolatedAsyncioTestCase):
 
+    def setUp(self):
+        # Missions go to a throwaway store, not the developer's history
+        self.tmp = tempfile.TemporaryDirectory()
+        store = MissionStore(os.path.join(self.tmp.name, "missions.sqlite"))
+        self._store_patch = patch.object(mission_store, "_mission_store", store)
+        self._store_patch.start()
+
+    def tearDown(self):
+        self._store_patch.stop()
+        self.tmp.cleanup()
+
+    @patch("orchestrator.start_warm_up")
+    @patch("orchestrator.add_to_vector_store")
+    @patch("orchestrator.WeatherTool")
     @patch("orchestrator.get_planner_agent")
     @patch("orchestrator.get_researcher_agent")
     @patch("orchestrator.get_finance_agent")
     @patch("orchestrator.get_execution_agent")
-    async def test_run_flow(self, mock_exec, mock_fin, mock_res, mock_plan):
+    async def test_run_flow(self, mock_exec, mock_fin, mock_res, mock_plan, mock_weather, mock_memory, mock_warm_up):
         # Setup Mocks
         mock_plan.return_value.run.return_value = '{"destination": "Tokyo", "duration": "5 days", "steps": ["Visit Tokyo Tower"]}'
-        # Note: _arun_compat handles sync agents by running in executor if they don't have ainvoke/arun
-        # We'll mock 'run' which is the fallback
-        
+        # Note: _arun_compat awaits `arun` when the agent has one, so the agents mock it as a coroutine
+
         # Planner
         planner_instance = MagicMock()
-        planner_instance.run.return_value = '{"destination": "Tokyo", "duration": "5 days", "steps": ["Visit Tokyo Tower"]}'
+        planner_instance.arun = AsyncMock(return_value='{"destination": "Tokyo", "duration": "5 days", "steps": ["Visit Tokyo Tower"]}')
         mock_plan.return_value = planner_instance
 
         # Researcher
         res_instance = MagicMock()
-        res_instance.run.return_value = '{"insights": ["Tokyo is big"], "sources": ["wiki"]}'
+        res_instance.arun = AsyncMock(return_value='{"insights": ["Tokyo is big"], "sources": ["wiki"]}')
         mock_res.return_value = res_instance
 
         # Finance
         fin_instance = MagicMock()
         # Mocking finance tool methods called inside the async function
-        fin_instance.get_flight_price.return_value = 1000
-        fin_instance.get_hotel_price.return_value = 500
+        fin_instance.get_flight_matrix.return_value = {"cheapest": {"price": 1000}, "matrix": {}, "cells": []}
+        fin_instance.search_hotels.return_value = {"nightly": {"median": 520}, "by_tier": {"standard": {"median": 500}}}
         fin_instance.get_city_cost.return_value = {"meal": 20, "transport": 10}
-        fin_instance.convert_currency.return_value = 83000
+        fin_instance.get_exchange_rate.return_value = 83.0
         mock_fin.return_value = fin_instance
 
         # Execution
         exec_instance = MagicMock()
-        exec_instance.run.return_value = '{"itinerary": [{"day": "Day 1", "activities": ["Tokyo Tower"]}]}'
+        exec_instance.arun = AsyncMock(return_value='{"itinerary": [{"day": "Day 1", "activities": ["Tokyo Tower"]}]}')
         mock_exec.return_value = exec_instance
 
+        # Weather
+        mock_weather.return_value.aget_forecast = AsyncMock(return_value={"daily": []})
+
         # Run Orchestrator
         orch = NeuroOrchestrator()
         results = {}
@@ -57,8 +76,13 @@ class TestOrchestrator(unittest.IsolatedAsyncioTestCase):
         self.assertIn("execution", results)
         
         # Check budget calculation
-        # Flight 1000 + Hotel 500*5 + Daily (30)*5 = 1000 + 2500 + 150 = 3650
+        # Flight 1000 (cheapest in the matrix) + Hotel 500*5 (standard tier median) + Daily (30)*5 = 3650
         self.assertEqual(results["budget"]["total_budget"], 3650.0)
+        # The nightly rate shown is the one the total was priced at
+        self.assertEqual(results["budget"]["api_prices"]["hotel"] * 5, 3650.0 - 1000 - 30 * 5)
+        self.assertEqual(results["budget"]["api_prices"]["currency_conversion"], 8300.0)
+        # The flight and budget stages share one finance agent
+        mock_fin.assert_called_once()
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import asyncio
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pipeline import Pipeline, Stage, clear_stage_cache
+
+
+def collect(pipeline, context=None):
+    async def go():
+        return [event async for event in pipeline.run(context)]
+    return asyncio.run(go())
+
+
+def stage(name, inputs=(), value=None, delay=0.0, log=None, **kwargs):
+    async def func(values, emit):
+        if log is not None:
+            log.append(("start", name))
+        await asyncio.sleep(delay)
+        if isinstance(value, Exception):
+            raise value
+        if log is not None:
+            log.append(("end", name))
+        return value if value is not None else {k: v for k, v in values.items()}
+    return Stage(name, func, inputs=inputs, label=kwargs.pop("label", name), **kwargs)
+
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        clear_stage_cache()
+
+    def test_dependencies_and_parallel_branches(self):
+        log = []
+        events = collect(Pipeline([
+            stage("plan", ("goal",), value="p", delay=0.02, log=log),
+            stage("weather", ("goal",), value="w", delay=0.01, log=log),
+            stage("itinerary", ("plan", "weather"), log=log),
+        ]), {"goal": "g"})
+
+        # Independent stages start together; the join waits for both
+        self.assertEqual(log[:2], [("start", "plan"), ("start", "weather")])
+        self.assertEqual(log[-2:], [("start", "itinerary"), ("end", "itinerary")])
+        self.assertEqual([label for label, _ in events], ["weather", "plan", "itinerary"])
+        self.assertEqual(events[-1][1], {"plan": "p", "weather": "w"})
+
+    def test_concurrency_cap(self):
+        running, peak = [0], [0]
+
+        def tracked(name):
+            async def func(values, emit):
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+                await asyncio.sleep(0.01)
+                running[0] -= 1
+                return name
+            return Stage(name, func, label=name)
+
+        events = collect(Pipeline([tracked(f"s{i}") for i in range(6)], max_concurrency=2))
+        self.assertEqual(len(events), 6)
+        self.assertEqual(peak[0], 2)
+
+    def test_failures_skip_dependents(self):
+        log = []
+        events = collect(Pipeline([
+            stage("plan", value={"error": "bad plan"}, check=lambda v: "error" not in v),
+            stage("research", ("plan",), log=log),
+            stage("flights", value=RuntimeError("no fares")),
+            stage("budget", ("flights",), log=log),
+            stage("market", value="m", when=lambda values: False),
+            stage("report", ("market",), log=log),
+        ]))
+
+        self.assertEqual(log, [])
+        self.assertIn(("plan", {"error": "bad plan"}), events)
+        self.assertIn(("error", "no fares"), events)
+        self.assertEqual(len(events), 2)
+
+    def test_timeout_is_an_error_event(self):
+        events = collect(Pipeline([stage("slow", value="late", delay=1, timeout=0.05)]))
+        self.assertEqual(events, [("error", "slow timed out after 0.05s")])
+
+    def test_partials_and_cache(self):
+        calls = []
+
+        async def weather(values, emit):
+            calls.append(values["city"])
+            emit("daily", values["city"])
+            return {"city": values["city"]}
+
+        def pipeline():
+            return Pipeline([Stage("weather", weather, inputs=("city",), label="weather", cacheable=True)])
+
+        first = collect(pipeline(), {"city": "Lima"})
+        self.assertEqual(first[0], ("partial", {"stage": "weather", "key": "daily", "item": "Lima"}))
+        self.assertEqual(collect(pipeline(), {"city": "Lima"}), [("weather", {"city": "Lima"})])
+        collect(pipeline(), {"city": "Quito"})
+        self.assertEqual(calls, ["Lima", "Quito"])
+
+    def test_invalid_graphs(self):
+        with self.assertRaises(ValueError):
+            Pipeline([stage("a", ("b",)), stage("b", ("a",))])
+        with self.assertRaises(ValueError):
+            Pipeline([stage("a"), Stage("b", None, outputs=("a",))])
+        with self.assertRaises(ValueError):
+            collect(Pipeline([stage("a", ("goal",))]))
+
+
+if __name__ == '__main__':
+    unittest.main()
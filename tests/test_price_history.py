@@ -0,0 +1,137 @@
+import unittest
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import Config
+import tools.price_history as price_history
+from tools.price_history import DAY, PriceHistory
+from tools.finance_tool import FinanceTool
+from benchmarks.stub_server import StubServer
+
+
+class FakeFeed:
+    """Daily bars with close = day number, up to today."""
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, symbol, start, end):
+        self.requests.append((start // DAY, end // DAY))
+        days = np.arange(start // DAY, end // DAY + 1)
+        close = days.astype(float)
+        return {"ts": days * DAY, "open": close, "high": close + 1, "low": close - 1,
+                "close": close, "volume": np.full(len(days), 10.0)}
+
+
+class WeekdayFeed(FakeFeed):
+    """FakeFeed without Saturday and Sunday bars, like an exchange-traded symbol."""
+
+    def __call__(self, symbol, start, end):
+        bars = super().__call__(symbol, start, end)
+        weekday = (bars["ts"] // DAY + 3) % 7  # 1970-01-01 was a Thursday
+        return {c: v[weekday < 5] for c, v in bars.items()}
+
+
+class TestPriceHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.feed = FakeFeed()
+        self.store = PriceHistory(self.tmp.name, fetcher=self.feed, max_age=3600, backfill_days=120)
+        self.today = int(time.time()) // DAY
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_backfill_then_fresh_reads(self):
+        self.assertEqual(self.store.update("AAPL"), 121)
+        self.assertEqual(self.store.update("AAPL"), 0)  # fresh: no fetch
+        self.assertEqual(len(self.feed.requests), 1)
+
+        bar = self.store.latest("aapl")
+        self.assertEqual(bar["close"], float(self.today))
+        self.assertEqual(len(self.feed.requests), 1)
+
+    def test_delta_fetch_appends_only_missing_bars(self):
+        store = PriceHistory(self.tmp.name, fetcher=self.feed, max_age=0, backfill_days=120)
+        store.append("BTC-USD", self.feed("BTC-USD", (self.today - 30) * DAY, (self.today - 5) * DAY))
+        # The last stored day is re-fetched (it may have been partial), then 5 new days
+        self.assertEqual(store.update("BTC-USD"), 6)
+        self.assertEqual(self.feed.requests[-1], (self.today - 5, self.today))
+
+        frame = store.read("BTC-USD")
+        self.assertEqual(len(frame), 31)
+        self.assertTrue(frame.index.is_monotonic_increasing)
+        self.assertEqual(frame["close"].iloc[-1], float(self.today))
+
+    def test_last_bar_replaced_and_uneven_columns(self):
+        bars = self.feed("ETH-USD", (self.today - 3) * DAY, self.today * DAY)
+        self.store.append("ETH-USD", bars)
+        updated = {c: v[-1:].copy() for c, v in bars.items()}
+        updated["close"][:] = 1.5
+        self.assertEqual(self.store.append("ETH-USD", updated), 1)
+        self.assertEqual(self.store.read("ETH-USD")["close"].tolist()[-2:], [float(self.today - 1), 1.5])
+
+        # A write cut short between columns: the partial row is ignored and then overwritten
+        with open(os.path.join(self.store._dir("ETH-USD"), "ts"), "ab") as f:
+            f.write(np.int64(0).tobytes())
+        self.assertEqual(len(self.store.read("ETH-USD")), 4)
+        self.store.append("ETH-USD", self.feed("ETH-USD", (self.today + 1) * DAY, (self.today + 1) * DAY))
+        self.assertEqual(self.store.read("ETH-USD").index[-1].value // 10 ** 9 // DAY, self.today + 1)
+
+    def test_windows_and_indicators(self):
+        self.store.update("MSFT")
+        weekly = self.store.ohlc("MSFT", days=28, freq="W")
+        self.assertLessEqual(len(weekly), 5)
+        self.assertTrue((weekly["high"] >= weekly["close"]).all())
+
+        frame = self.store.indicators("MSFT", days=30)
+        self.assertEqual(len(frame), 30)
+        closes = self.store.read("MSFT")["close"].to_numpy()
+        self.assertAlmostEqual(frame["sma_20"].iloc[-1], closes[-20:].mean())
+        # Steadily rising closes: no losses, so RSI is undefined rather than a division error
+        self.assertTrue(np.isnan(frame["rsi_14"].iloc[-1]))
+
+    def test_indicators_warm_up_over_weekends(self):
+        store = PriceHistory(self.tmp.name, fetcher=WeekdayFeed(), max_age=3600, backfill_days=365)
+        frame = store.indicators("AAPL", days=90)
+        self.assertEqual(len(frame), 90)
+        self.assertFalse(frame[["sma_50", "volatility_20"]].iloc[0].isna().any())
+
+
+class TestMarketQuotes(unittest.TestCase):
+
+    def setUp(self):
+        self._saved = {k: getattr(Config, k) for k in ("AMADEUS_BASE_URL", "BOOKING_BASE_URL", "NUMBEO_BASE_URL",
+                                                       "YAHOO_BASE_URL", "WEATHER_BASE_URL")}
+        self.tmp = tempfile.TemporaryDirectory()
+        self._patch = mock.patch.object(price_history, "_price_history", PriceHistory(self.tmp.name, max_age=3600))
+        self._patch.start()
+
+    def tearDown(self):
+        self._patch.stop()
+        self.tmp.cleanup()
+        for k, v in self._saved.items():
+            setattr(Config, k, v)
+
+    def test_market_overview_is_local_after_first_fetch(self):
+        with StubServer() as stub:
+            stub.configure()
+            tool = FinanceTool()
+            first = tool.get_market_overview(["AAPL", "BTC-USD"])
+            self.assertEqual(stub.counts["yahoo_chart"], 2)
+            self.assertEqual(len(first["AAPL"]["history"]), Config.MARKET_TREND_DAYS)
+            self.assertIsNotNone(first["AAPL"]["sma_50"])
+
+            again = tool.get_market_overview(["AAPL", "BTC-USD"])
+            self.assertEqual(stub.counts["yahoo_chart"], 2)
+            self.assertEqual(again, first)
+            self.assertEqual(tool.get_stock_price("AAPL")["price"], first["AAPL"]["price"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+import json
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from prompts import build_prompt, compact_json, count_tokens
+
+PLAN = {
+    "destination": "Tokyo",
+    "duration": "7 days",
+    "steps": [f"Day {i}: explore the neighbourhoods around station {i} and try the local food" for i in range(40)],
+    "raw_text": "planner scratchpad " * 50,
+}
+
+
+class TestPrompts(unittest.TestCase):
+
+    def test_compact_and_stage_fields(self):
+        text, stats = build_prompt("research", PLAN, "Research this trip.", budget=0, provider="fake")
+        self.assertEqual(stats["trims"], 0)
+        context = json.loads(text.split("Plan: ", 1)[1])
+        self.assertEqual(set(context), {"destination", "duration", "steps"})
+        self.assertNotIn(", ", compact_json(context))
+        self.assertLess(len(text), len(f"Research this trip.\nPlan: {PLAN}"))
+
+    def test_trims_to_budget(self):
+        wrap = lambda text: "You are a research assistant.\n" + text + "\nReturn JSON."  # noqa: E731
+        text, stats = build_prompt("research", PLAN, "Research this trip.", template=wrap,
+                                   budget=120, provider="fake")
+        self.assertLessEqual(stats["tokens"], 120)
+        self.assertEqual(stats["tokens"], count_tokens(wrap(text), "fake"))
+        context = json.loads(text.split("Plan: ", 1)[1])
+        self.assertEqual(context["destination"], "Tokyo")
+        self.assertEqual(context["steps"][0], PLAN["steps"][0])
+        self.assertLess(len(context["steps"]), len(PLAN["steps"]))
+
+    def test_token_estimates_per_provider(self):
+        text = "x" * 400
+        self.assertEqual(count_tokens(text, "fake"), 100)
+        self.assertGreater(count_tokens(text, "ollama"), count_tokens(text, "fake"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from tools.search_tool import SearchTool, SearchCache, normalize_query
+
+
+class CountingBackend:
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def __call__(self, query):
+        with self.lock:
+            self.calls.append(query)
+        time.sleep(self.delay)
+        return f"results for {query}"
+
+
+class TestSearchTool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = SearchCache(os.path.join(self.tmp.name, "search.sqlite"), ttl=60)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("  Best things to do in TOKYO?? "), normalize_query("best things to do in tokyo"))
+        self.assertNotEqual(normalize_query("flights paris to london"), normalize_query("flights london to paris"))
+
+    def test_mission_dedupe_and_disk_cache(self):
+        backend = CountingBackend()
+        first = SearchTool(backend=backend, cache=self.cache)
+        first.run("Weather in Tokyo")
+        first.run("weather in tokyo?")
+        self.assertEqual(len(backend.calls), 1)
+        self.assertEqual(first.report()["mission_hits"], 1)
+
+        second = SearchTool(backend=backend, cache=self.cache)
+        self.assertEqual(second.run("WEATHER IN TOKYO"), "results for Weather in Tokyo")
+        report = second.report()
+        self.assertEqual((report["cache_hits"], report["upstream"], report["hit_rate"]), (1, 0, 1.0))
+        self.assertGreater(report["spend_saved_usd"], 0)
+
+    def test_ttl(self):
+        backend = CountingBackend()
+        SearchTool(backend=backend, cache=self.cache).run("rome")
+        SearchTool(backend=backend, cache=SearchCache(self.cache.path, ttl=0)).run("rome")
+        self.assertEqual(len(backend.calls), 2)
+
+    def test_concurrent_identical_queries_coalesce(self):
+        backend = CountingBackend(delay=0.2)
+        tools = [SearchTool(backend=backend, cache=self.cache) for _ in range(4)]
+        threads = [threading.Thread(target=t.run, args=("visa rules japan",)) for t in tools]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(backend.calls), 1)
+        self.assertEqual(sum(t.report()["coalesced"] for t in tools), 3)
+
+    def test_batch(self):
+        backend = CountingBackend(delay=0.1)
+        tool = SearchTool(backend=backend, cache=self.cache)
+        start = time.perf_counter()
+        results = tool.batch(["paris museums", "paris food", "paris metro", "Paris museums"])
+        self.assertLess(time.perf_counter() - start, 0.35)
+        self.assertEqual(results[0], results[3])
+        self.assertEqual(len(backend.calls), 3)
+
+if __name__ == '__main__':
+    unittest.main()
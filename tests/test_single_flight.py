@@ -0,0 +1,146 @@
+import unittest
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import Config
+from utils import SingleFlight
+from orchestrator import NeuroOrchestrator
+from tools.finance_tool import FinanceTool
+from benchmarks.stub_server import StubServer
+
+
+class SlowCall:
+    def __init__(self, delay=0.05, error=None):
+        self.calls = 0
+        self.delay = delay
+        self.error = error
+        self.lock = threading.Lock()
+
+    def __call__(self, value):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return value * 2
+
+    async def acall(self, value):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return value * 2
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_threads_share_one_call(self):
+        flight, call = SingleFlight(), SlowCall()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: flight.do("k", call, 21), range(8)))
+        self.assertEqual(results, [42] * 8)
+        self.assertEqual(call.calls, 1)
+        self.assertEqual(flight.stats, {"calls": 8, "coalesced": 7})
+
+        # Settled calls are not cached
+        flight.do("k", call, 21)
+        self.assertEqual(call.calls, 2)
+
+    def test_errors_reach_every_waiter(self):
+        flight, call = SingleFlight(), SlowCall(error=ValueError("upstream down"))
+
+        def attempt(_):
+            try:
+                flight.do("k", call, 1)
+            except ValueError as e:
+                return str(e)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            self.assertEqual(list(pool.map(attempt, range(4))), ["upstream down"] * 4)
+        self.assertEqual(call.calls, 1)
+
+    def test_cancelled_waiter_leaves_call_running(self):
+        flight, call = SingleFlight(), SlowCall()
+
+        async def go():
+            owner = asyncio.create_task(flight.ado("k", call.acall, 5))
+            waiter = asyncio.create_task(flight.ado("k", call.acall, 5))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            return await owner, await asyncio.gather(waiter, return_exceptions=True)
+
+        result, (waited,) = asyncio.run(go())
+        self.assertEqual(result, 10)
+        self.assertIsInstance(waited, asyncio.CancelledError)
+        self.assertEqual(call.calls, 1)
+
+    def test_cancelled_owner_hands_over(self):
+        flight, call = SingleFlight(), SlowCall()
+
+        async def go():
+            owner = asyncio.create_task(flight.ado("k", call.acall, 5))
+            await asyncio.sleep(0.01)
+            waiters = [asyncio.create_task(flight.ado("k", call.acall, 5)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            owner.cancel()
+            return await asyncio.gather(*waiters)
+
+        self.assertEqual(asyncio.run(go()), [10, 10, 10])
+        # The owner's call was abandoned; one waiter ran it again for the rest
+        self.assertEqual(call.calls, 2)
+
+
+class CountingAgent:
+    def __init__(self, calls):
+        self.calls = calls
+
+    async def arun(self, prompt):
+        self.calls.append(prompt)
+        await asyncio.sleep(0.05)
+        return '{"destination": "Lisbon"}'
+
+
+class TestCoalescedCalls(unittest.TestCase):
+
+    def test_identical_agent_calls(self):
+        calls = []
+        orchestrator = NeuroOrchestrator()
+
+        async def go():
+            # Separate agent objects, as in separate missions
+            same = [orchestrator._arun_compat(CountingAgent(calls), "plan Lisbon") for _ in range(5)]
+            other = orchestrator._arun_compat(CountingAgent(calls), "plan Porto")
+            return await asyncio.gather(*same, other)
+
+        results = asyncio.run(go())
+        self.assertEqual(results, [{"destination": "Lisbon"}] * 6)
+        self.assertEqual(sorted(calls), ["plan Lisbon", "plan Porto"])
+
+    def test_concurrent_finance_requests(self):
+        saved = {k: getattr(Config, k) for k in ("AMADEUS_BASE_URL", "BOOKING_BASE_URL", "NUMBEO_BASE_URL",
+                                                 "YAHOO_BASE_URL", "WEATHER_BASE_URL", "DEST_ID_CACHE_PATH")}
+        tmp = tempfile.TemporaryDirectory()
+        Config.DEST_ID_CACHE_PATH = os.path.join(tmp.name, "dest_ids.json")
+        try:
+            with StubServer(latency_ms=50) as stub:
+                stub.configure()
+                tool = FinanceTool()
+                with ThreadPoolExecutor(max_workers=6) as pool:
+                    rates = list(pool.map(lambda _: tool.convert_currency(100, "USD", "EUR"), range(6)))
+                    hotels = list(pool.map(lambda _: FinanceTool().get_hotel_price("Lisbon", "2030-05-10",
+                                                                                   "2030-05-13"), range(6)))
+                self.assertEqual(len(set(rates)), 1)
+                self.assertEqual(len(set(hotels)), 1)
+                self.assertEqual(stub.counts["yahoo_chart"], 1)
+                self.assertEqual(stub.counts["booking_search"], 1)
+        finally:
+            tmp.cleanup()
+            for k, v in saved.items():
+                setattr(Config, k, v)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,10 @@
 import unittest
-from utils import extract_tickers_from_goal, safe_json_parse
+import json
+import os
+from utils import extract_tickers_from_goal, safe_json_parse, find_json_object, StreamingJSONParser
+from benchmarks.bench_json_parse import legacy_safe_json_parse, make_cases
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
 
 class TestUtils(unittest.TestCase):
 
@@ -21,6 +26,63 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(safe_json_parse("{'a': 1}"), {"a": 1})
         # Trailing comma fix
         self.assertEqual(safe_json_parse('{"a": 1, }'), {"a": 1})
+        # Prose with braces after the object
+        self.assertEqual(safe_json_parse('{"a": 1} then {b}'), {"a": 1})
+        # Repairs apply to the extracted object, not the prose after it
+        self.assertEqual(safe_json_parse("{'a': 'b',} that's it, {'c': 1,}"), {"a": "b"})
+        self.assertEqual(safe_json_parse('{"a": [1, 2,],} then {"open": ['), {"a": [1, 2]})
+
+    def test_find_json_object(self):
+        text = 'x {"s": "}{", "n": {"k": \'\\\'}\'}} y {"z": 1}'
+        begin, end = find_json_object(text)
+        self.assertEqual(text[begin:end], '{"s": "}{", "n": {"k": \'\\\'}\'}}')
+        self.assertIsNone(find_json_object('{"open": ['))
+
+    def test_safe_json_parse_corpus(self):
+        with open(os.path.join(FIXTURES, "llm_outputs.json"), encoding="utf-8") as f:
+            corpus = json.load(f)
+        for case in corpus:
+            with self.subTest(case["name"]):
+                result = safe_json_parse(case["text"])
+                if case["matches_legacy"]:
+                    self.assertEqual(result, legacy_safe_json_parse(case["text"]))
+                else:
+                    self.assertEqual(result, case["expected"])
+
+    def test_safe_json_parse_large_itinerary(self):
+        for name, text in make_cases(30).items():
+            with self.subTest(name):
+                self.assertEqual(len(safe_json_parse(text)["itinerary"]), 30)
+    def test_streaming_parser(self):
+        doc = {
+            "itinerary": [{"day": f"Day {i}", "activities": ["Visit {museum}", 'Say "hi"']} for i in range(1, 4)],
+            "insights": ["Cheap metro", 42, None],
+            "meta": {"itinerary": ["nested, not watched"]}
+        }
+        text = "Here you go:\n```json\n" + json.dumps(doc) + "\n```"
+        parser = StreamingJSONParser(["itinerary", "insights"])
+        items = []
+        for i in range(0, len(text), 5):
+            items += parser.feed(text[i:i + 5])
+        self.assertEqual([v for k, v in items if k == "itinerary"], doc["itinerary"])
+        self.assertEqual([v for k, v in items if k == "insights"], doc["insights"])
+        self.assertEqual(parser.close(), doc)
+
+    def test_streaming_parser_emits_early(self):
+        parser = StreamingJSONParser(["itinerary"])
+        items = parser.feed('{"itinerary": [{"day": "Day 1", "activities": []}, {"day": "Da')
+        self.assertEqual(items, [("itinerary", {"day": "Day 1", "activities": []})])
+        self.assertEqual(parser.feed('y 2", "activities": ["x"]}]}'),
+                         [("itinerary", {"day": "Day 2", "activities": ["x"]})])
+
+    def test_streaming_parser_skips_braces_in_prose(self):
+        text = 'Sure {x} and {"name"} ```json\n{"itinerary": [{"day": "Day 1"}, {"day": "Day 2"}]}\n```'
+        parser = StreamingJSONParser(["itinerary"])
+        items = []
+        for i in range(0, len(text), 3):
+            items += parser.feed(text[i:i + 3])
+        self.assertEqual(items, [("itinerary", {"day": "Day 1"}), ("itinerary", {"day": "Day 2"})])
+        self.assertEqual(parser.close(), {"itinerary": [{"day": "Day 1"}, {"day": "Day 2"}]})
 
 if __name__ == '__main__':
     unittest.main()
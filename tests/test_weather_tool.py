@@ -0,0 +1,61 @@
+import unittest
+import asyncio
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import Config
+from tools.gazetteer import get_gazetteer
+from tools.weather_tool import WeatherTool, clear_weather_cache
+from benchmarks.stub_server import StubServer
+
+
+class TestGazetteer(unittest.TestCase):
+
+    def test_resolve(self):
+        gaz = get_gazetteer()
+        self.assertEqual(gaz.resolve("Kyoto, Japan")["name"], "Kyoto")
+        self.assertEqual(gaz.resolve("São Paulo")["name"], "Sao Paulo")
+        self.assertEqual(gaz.resolve("NYC")["name"], "New York")
+        self.assertEqual(gaz.resolve("Barcelonna")["name"], "Barcelona")
+        self.assertIsNone(gaz.resolve("Atlantis"))
+
+
+class TestWeatherTool(unittest.TestCase):
+
+    def setUp(self):
+        self._base_url = Config.WEATHER_BASE_URL
+        clear_weather_cache()
+        self.stub = StubServer().start()
+        Config.WEATHER_BASE_URL = self.stub.base_url
+
+    def tearDown(self):
+        self.stub.stop()
+        Config.WEATHER_BASE_URL = self._base_url
+        clear_weather_cache()
+
+    def test_uses_requested_location(self):
+        tokyo, paris = WeatherTool().get_forecasts(["Tokyo", "Paris"])
+        self.assertEqual(tokyo["location"], "Tokyo")
+        self.assertAlmostEqual(paris["latitude"], 48.8566)
+        self.assertNotEqual(tokyo["daily"][0]["temp_max"], paris["daily"][0]["temp_max"])
+
+    def test_batch_then_warm_cache(self):
+        tool = WeatherTool()
+        date = tool.get_forecast("Rome")["daily"][1]["date"]
+        self.stub.reset_counts()
+
+        results = tool.get_forecasts([("Rome", date), "Florence", "Venice", "Atlantis"])
+        self.assertEqual(self.stub.counts["open_meteo_forecast"], 1)
+        self.assertEqual([r["daily"][0]["date"] for r in results[:1]], [date])
+        self.assertIn("error", results[3])
+
+        asyncio.run(tool.aget_forecasts(["Rome", "Florence", "Venice"]))
+        self.assertEqual(self.stub.counts["open_meteo_forecast"], 1)
+
+    def test_ttl_expiry(self):
+        WeatherTool().get_forecast("Oslo")
+        WeatherTool(ttl=0).get_forecast("Oslo")
+        self.assertEqual(self.stub.counts["open_meteo_forecast"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
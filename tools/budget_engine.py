@@ -0,0 +1,155 @@
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+
+# Nightly-rate multipliers applied to the fetched hotel price when no per-tier prices are known
+HOTEL_TIER_FACTORS = {"budget": 0.6, "standard": 1.0, "premium": 1.8}
+GUESTS_PER_ROOM = 2
+UNPRICED = "not priced"
+
+AXES = ("days", "hotel_tier", "travelers", "flight", "currency")
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+class BudgetEngine:
+    """
+    What-if trip budgets from prices fetched once. `sweep` prices every
+    combination of durations, hotel tiers, traveler counts, flight options and
+    currencies with array operations and returns one tidy row per scenario;
+    no method makes a network call.
+
+    Flights are per traveler, hotel tiers are nightly rates per room
+    (GUESTS_PER_ROOM guests each), meal and transport are per traveler per day,
+    and rates are units of each currency per USD.
+    """
+
+    def __init__(self, flights: Dict[str, float], hotel_tiers: Dict[str, float], meal: float = 0.0,
+                 transport: float = 0.0, rates: Optional[Dict[str, float]] = None):
+        self.flights = dict(sorted(((k, float(v)) for k, v in flights.items()), key=lambda kv: kv[1])) \
+            or {UNPRICED: 0.0}
+        self.hotel_tiers = {k: float(v) for k, v in hotel_tiers.items()} or {UNPRICED: 0.0}
+        self.meal = float(meal)
+        self.transport = float(transport)
+        self.rates = {"USD": 1.0, **{k: float(v) for k, v in (rates or {}).items()}}
+
+    @classmethod
+    def from_prices(cls, api_prices: Dict[str, Any], rates: Optional[Dict[str, float]] = None,
+                    max_flights: Optional[int] = None) -> "BudgetEngine":
+        """
+        Build from the budget stage's `api_prices`. Per-tier nightly prices are
+        used when present under "hotel_tiers"; tiers without one are scaled
+        from the hotel price. Unavailable prices count as zero.
+        """
+        max_flights = max_flights or Config.BUDGET_SWEEP_FLIGHTS
+        flights: Dict[str, float] = {}
+        search = api_prices.get("flight_search")
+        cells = search.get("cells") if isinstance(search, dict) else None
+        # Cheapest fare per date pair, the cheapest pairs first; failed queries carry an "error" instead
+        for cell in sorted((c for c in cells or [] if "price" in c), key=lambda c: c["price"]):
+            label = f"{cell['departure_date']} → {cell.get('return_date') or 'one-way'}"
+            if label not in flights:
+                flights[label] = cell["price"]
+            if len(flights) >= max_flights:
+                break
+        if not flights and _number(api_prices.get("flight")) is not None:
+            flights["cheapest"] = _number(api_prices["flight"])
+
+        hotel = _number(api_prices.get("hotel"))
+        tiers = {t: hotel * f for t, f in HOTEL_TIER_FACTORS.items()} if hotel is not None else {}
+        priced = api_prices.get("hotel_tiers")
+        if isinstance(priced, dict):
+            tiers.update(priced)
+
+        daily = api_prices.get("daily_costs")
+        daily = daily if isinstance(daily, dict) else {}
+        return cls(flights, tiers, meal=_number(daily.get("meal")) or 0.0,
+                   transport=_number(daily.get("transport")) or 0.0, rates=rates)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"flights": self.flights, "hotel_tiers": self.hotel_tiers, "meal": self.meal,
+                "transport": self.transport, "rates": self.rates}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BudgetEngine":
+        return cls(data["flights"], data["hotel_tiers"], data.get("meal", 0.0), data.get("transport", 0.0),
+                   data.get("rates"))
+
+    @property
+    def base_tier(self) -> str:
+        return "standard" if "standard" in self.hotel_tiers else next(iter(self.hotel_tiers))
+
+    @property
+    def cheapest_flight(self) -> str:
+        return next(iter(self.flights))
+
+    def sweep(self, days: Iterable[int], tiers: Optional[Sequence[str]] = None, travelers: Iterable[int] = (1,),
+              currencies: Sequence[str] = ("USD",), flights: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        One row per (days, hotel_tier, travelers, flight, currency) with the
+        cost breakdown, total, per-person and per-day cost in that currency.
+        Unknown tiers, flights or currencies raise KeyError.
+        """
+        days = np.array(sorted({int(d) for d in days}), dtype=np.int64)
+        travelers = np.array(sorted({int(t) for t in travelers}), dtype=np.int64)
+        tiers = list(tiers or self.hotel_tiers)
+        flights = list(flights or self.flights)
+        currencies = list(currencies)
+
+        # Axes broadcast as (days, tier, travelers, flight, currency)
+        d = np.maximum(days, 1).reshape(-1, 1, 1, 1, 1).astype(float)
+        h = np.array([self.hotel_tiers[t] for t in tiers]).reshape(1, -1, 1, 1, 1)
+        p = travelers.reshape(1, 1, -1, 1, 1).astype(float)
+        f = np.array([self.flights[x] for x in flights]).reshape(1, 1, 1, -1, 1)
+        r = np.array([self.rates[c] for c in currencies]).reshape(1, 1, 1, 1, -1)
+        shape = (len(days), len(tiers), len(travelers), len(flights), len(currencies))
+
+        rooms = np.ceil(p / GUESTS_PER_ROOM)
+        flight_cost = np.broadcast_to(f * p * r, shape)
+        hotel_cost = np.broadcast_to(h * rooms * d * r, shape)
+        daily_cost = np.broadcast_to((self.meal + self.transport) * p * d * r, shape)
+        total = flight_cost + hotel_cost + daily_cost
+
+        table = pd.MultiIndex.from_product([days, tiers, travelers, flights, currencies], names=AXES) \
+            .to_frame(index=False)
+        table["flight_cost"] = flight_cost.ravel().round(2)
+        table["hotel_cost"] = hotel_cost.ravel().round(2)
+        table["daily_cost"] = daily_cost.ravel().round(2)
+        table["total"] = total.ravel().round(2)
+        table["per_person"] = (total / p).ravel().round(2)
+        table["per_day"] = (total / d).ravel().round(2)
+        return table
+
+    def baseline(self, days: int) -> Dict[str, Any]:
+        """The single-scenario budget: one traveler, standard tier, cheapest flight, USD."""
+        row = self.sweep([days], tiers=[self.base_tier], flights=[self.cheapest_flight]).iloc[0]
+        return {k: v.item() if isinstance(v, np.generic) else v for k, v in row.items()}
+
+    def max_days_under(self, limit: float, currency: str = "USD", days: Optional[Iterable[int]] = None,
+                       tiers: Optional[Sequence[str]] = None, travelers: Iterable[int] = (1,),
+                       flights: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Longest trip whose total stays within `limit` (in `currency`) for each
+        tier, traveler count and flight; 0 where not even the shortest fits.
+        """
+        days = days or range(1, Config.BUDGET_SWEEP_MAX_DAYS + 1)
+        table = self.sweep(days, tiers=tiers, travelers=travelers, currencies=[currency], flights=flights)
+        table["fits"] = np.where(table["total"] <= limit, table["days"], 0)
+        keys = ["hotel_tier", "travelers", "flight"]
+        return (table.groupby(keys, as_index=False, sort=False)["fits"].max()
+                .rename(columns={"fits": "max_days"}))
+
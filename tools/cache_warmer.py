@@ -0,0 +1,242 @@
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import Config
+from goal_analyzer import analyze_goal
+from tools.city_costs import get_city_costs
+from tools.finance_tool import FinanceTool
+from tools.price_history import get_price_history
+from utils import get_logger
+
+logger = get_logger("CacheWarmer")
+
+DEFAULT_DAYS = 5  # trip length for history destinations whose goal gave none
+
+_prewarm_thread: Optional[threading.Thread] = None
+_prewarm_lock = threading.Lock()
+
+Targets = Dict[str, List]
+
+
+def load_targets(path: Optional[str] = None) -> Targets:
+    """
+    Destinations ({"city", "days", "origin"?}), currency pairs and market
+    symbols from the pre-warm list (PREWARM_LIST_PATH). The USD rates every
+    budget fetches (BUDGET_SWEEP_CURRENCIES and INR) are always included.
+    """
+    path = path or Config.PREWARM_LIST_PATH
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read pre-warm list %s: %s", path, e)
+        data = {}
+    budget_pairs = [["USD", c] for c in Config.BUDGET_SWEEP_CURRENCIES + ["INR"] if c != "USD"]
+    return merge_targets({"destinations": data.get("destinations", []),
+                          "currency_pairs": data.get("currency_pairs", []),
+                          "symbols": data.get("symbols", [])},
+                         {"currency_pairs": budget_pairs})
+
+
+def targets_from_history(missions: Optional[int] = None, top: Optional[int] = None) -> Targets:
+    """
+    The `top` most frequent destinations (PREWARM_TOP_N) among the last
+    `missions` stored goals (PREWARM_HISTORY_MISSIONS), each with its most
+    common trip length, plus the currencies and tickers those goals named.
+    """
+    from memory.mission_store import get_mission_store
+
+    missions = Config.PREWARM_HISTORY_MISSIONS if missions is None else missions
+    top = Config.PREWARM_TOP_N if top is None else top
+    cities: Counter = Counter()
+    lengths: Dict[str, Counter] = {}
+    currencies: Counter = Counter()
+    symbols: Counter = Counter()
+    for mission in get_mission_store().recent(missions) if missions else []:
+        analysis = analyze_goal(mission["goal"] or "")
+        if analysis["tickers"]:
+            symbols.update(analysis["tickers"])
+        elif analysis["destination"]:
+            city = analysis["destination"]
+            cities[city] += 1
+            lengths.setdefault(city, Counter())[analysis["duration"] or DEFAULT_DAYS] += 1
+        if analysis["currency"] and analysis["currency"] != "USD":
+            currencies[analysis["currency"]] += 1
+    return {
+        "destinations": [{"city": c, "days": lengths[c].most_common(1)[0][0]} for c, _ in cities.most_common(top)],
+        "currency_pairs": [["USD", c] for c, _ in currencies.most_common(top)],
+        "symbols": [s for s, _ in symbols.most_common(top)],
+    }
+
+
+def merge_targets(*sources: Targets) -> Targets:
+    """Union of several target lists; the first entry wins for a repeated city, pair or symbol."""
+    merged: Dict[str, Dict[Any, Any]] = {"destinations": {}, "currency_pairs": {}, "symbols": {}}
+    for source in sources:
+        for d in source.get("destinations", []):
+            d = {"city": d} if isinstance(d, str) else d
+            merged["destinations"].setdefault(d["city"].strip().lower(), d)
+        for pair in source.get("currency_pairs", []):
+            merged["currency_pairs"].setdefault(tuple(p.upper() for p in pair), list(pair))
+        for s in source.get("symbols", []):
+            merged["symbols"].setdefault(s.upper(), s.upper())
+    return {kind: list(entries.values()) for kind, entries in merged.items()}
+
+
+def trip_dates(days: int) -> Tuple[str, str]:
+    """Departure and return dates a mission starting today would search (see the trip stage)."""
+    departure = date.today() + timedelta(days=Config.FLIGHT_LEAD_DAYS)
+    return departure.isoformat(), (departure + timedelta(days=max(days, 1))).isoformat()
+
+
+def _tasks(targets: Targets, tool: FinanceTool) -> List[Tuple[str, str, Callable[[], Any]]]:
+    """(kind, target, call) per cache entry; a call returns whether the entry is now warm."""
+    tasks = []
+    for d in targets["destinations"]:
+        city = d["city"]
+        departure, ret = trip_dates(int(d.get("days") or DEFAULT_DAYS))
+        origin = d.get("origin") or Config.FLIGHT_ORIGIN
+        tasks.append(("dest_id", city, lambda city=city: tool.get_dest_id(city) is not None))
+        tasks.append(("hotels", city, lambda city=city, dep=departure, ret=ret:
+                      "error" not in tool.search_hotels(city, dep, ret)))
+        tasks.append(("flights", f"{origin}-{city}", lambda city=city, origin=origin, dep=departure, ret=ret:
+                      tool.get_flight_matrix(origin, city, dep, ret).get("cheapest") is not None))
+    for a, b in targets["currency_pairs"]:
+        tasks.append(("fx", f"{a}/{b}", lambda a=a, b=b: tool.get_exchange_rate(a, b) is not None))
+    for symbol in targets["symbols"]:
+        tasks.append(("prices", symbol, lambda symbol=symbol: get_price_history().latest(symbol) is not None))
+    return tasks
+
+
+def _warm_city_costs(cities: List[str]) -> Dict[str, bool]:
+    # Numbeo is re-priced in one batch: each refresh rewrites the whole index
+    costs = get_city_costs()
+
+    def fresh(city):
+        record = costs.lookup(city)
+        return record is not None and time.time() - record["updated"] <= costs.max_age
+
+    stale = [c for c in cities if not fresh(c)]
+    if stale:
+        costs.refresh(stale)
+    return {c: fresh(c) for c in cities}
+
+
+def prewarm(targets: Optional[Targets] = None, concurrency: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Fill the destination-id, hotel, fare, exchange-rate, city-cost and price
+    history caches for `targets` (default: the pre-warm list merged with the
+    mission history), running up to `concurrency` (PREWARM_CONCURRENCY)
+    lookups at once; fares still go through the Amadeus rate limit.
+
+    Returns {"elapsed_s", "coverage": {kind: {"warmed", "total"}}, "ratio",
+    "failures": [{"kind", "target", "error"?}]}.
+    """
+    started = time.perf_counter()
+    if targets is None:
+        targets = merge_targets(load_targets(), targets_from_history())
+    tool = FinanceTool()
+    tasks = _tasks(targets, tool)
+    cities = [d["city"] for d in targets["destinations"]]
+
+    def run(task):
+        kind, target, call = task
+        try:
+            return kind, target, bool(call()), None
+        except Exception as e:
+            logger.warning("Pre-warming %s %s failed: %s", kind, target, e)
+            return kind, target, False, str(e)
+
+    workers = max(1, concurrency or Config.PREWARM_CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        costs = pool.submit(_warm_city_costs, cities) if cities else None
+        results = list(pool.map(run, tasks))
+    if costs is not None:
+        try:
+            results += [("city_costs", c, ok, None) for c, ok in costs.result().items()]
+        except Exception as e:
+            logger.warning("Pre-warming city costs failed: %s", e)
+            results += [("city_costs", c, False, str(e)) for c in cities]
+
+    coverage: Dict[str, Dict[str, int]] = {}
+    failures = []
+    for kind, target, ok, error in results:
+        entry = coverage.setdefault(kind, {"warmed": 0, "total": 0})
+        entry["total"] += 1
+        entry["warmed"] += ok
+        if not ok:
+            failures.append({"kind": kind, "target": target, **({"error": error} if error else {})})
+    return {
+        "elapsed_s": round(time.perf_counter() - started, 3),
+        "coverage": coverage,
+        "ratio": round(sum(ok for _, _, ok, _ in results) / len(results), 3) if results else 1.0,
+        "failures": failures,
+    }
+
+
+def _load_embeddings():
+    # The memory store's model loads on first use; do it here rather than in the first mission
+    from memory.vector_store import get_embeddings
+
+    started = time.perf_counter()
+    try:
+        get_embeddings()
+        logger.info("Embeddings model loaded in %.2fs", time.perf_counter() - started)
+    except Exception as e:
+        logger.warning("Could not load the embeddings model: %s", e)
+
+
+def _prewarm_in_background():
+    _load_embeddings()
+    while True:
+        try:
+            report = prewarm()
+            logger.info("Pre-warm finished in %.2fs, %.0f%% covered (%d failures)",
+                        report["elapsed_s"], report["ratio"] * 100, len(report["failures"]))
+        except Exception as e:
+            logger.warning("Pre-warm failed: %s", e)
+        if Config.PREWARM_INTERVAL <= 0:
+            return
+        time.sleep(Config.PREWARM_INTERVAL)
+
+
+def start_prewarm() -> Optional[threading.Thread]:
+    """
+    Load the embeddings model and pre-warm the caches on a background thread,
+    once per process, when PREWARM_ON_START is on; the caches are pre-warmed
+    again every PREWARM_INTERVAL seconds when set.
+    """
+    global _prewarm_thread
+    with _prewarm_lock:
+        if _prewarm_thread is None and Config.PREWARM_ON_START:
+            _prewarm_thread = threading.Thread(target=_prewarm_in_background, name="cache-prewarm", daemon=True)
+            _prewarm_thread.start()
+        return _prewarm_thread
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Pre-warm the price caches for popular destinations")
+    parser.add_argument("--list", help=f"pre-warm list (default: {Config.PREWARM_LIST_PATH})")
+    parser.add_argument("--history", type=int, default=Config.PREWARM_HISTORY_MISSIONS,
+                        help="also take the top destinations from this many past missions (0: list only)")
+    parser.add_argument("--top", type=int, default=Config.PREWARM_TOP_N, help="destinations taken from history")
+    parser.add_argument("--concurrency", type=int, default=Config.PREWARM_CONCURRENCY)
+    parser.add_argument("--min-coverage", type=float, default=0.0,
+                        help="exit with 1 when less than this share of the targets was warmed")
+    args = parser.parse_args(argv)
+
+    targets = merge_targets(load_targets(args.list), targets_from_history(args.history, args.top))
+    report = prewarm(targets, args.concurrency)
+    print(json.dumps(report, indent=2))
+    return 0 if report["ratio"] >= args.min_coverage else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
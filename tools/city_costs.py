@@ -0,0 +1,384 @@
+"""
+Offline city-cost index.
+
+Daily meal and local-transport prices for cities live in a compact binary file
+(fixed-width records sorted by normalized city name) that is memory-mapped and
+binary-searched, so lookups need no network and no parsing. The bundled file is
+built from data/city_costs.csv:
+
+    python -m tools.city_costs build
+    python -m tools.city_costs lookup "Kyoto, Japan"
+    python -m tools.city_costs refresh Tokyo Paris
+
+Entries that are stale, and cities missing from the index, are re-priced from
+Numbeo on a background thread; the refreshed index is written to the cache
+directory and swapped in while lookups keep serving the current copy.
+"""
+import argparse
+import csv
+import difflib
+import json
+import mmap
+import os
+import statistics
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+from config import Config
+from tools.gazetteer import get_gazetteer, normalize_place
+from utils import get_logger
+
+logger = get_logger("CityCosts")
+
+MAGIC = b"NNCC"
+FORMAT_VERSION = 1
+# magic, format version, record size, record count, data version (YYYYMMDD), built at (epoch seconds)
+_HEADER = struct.Struct("<4sHHIId")
+# normalized name, display name, country, meal price, transit ticket price, updated (epoch seconds)
+_RECORD = struct.Struct("<32s32s2s2xffI")
+_KEY_SIZE = 32
+
+# A day of budget travel: two inexpensive restaurant meals and four local transit rides
+MEALS_PER_DAY = 2
+RIDES_PER_DAY = 4
+
+_session = requests.Session()
+
+
+def _fit(text: str, size: int) -> bytes:
+    """UTF-8 bytes of `text` cut to at most `size` bytes on a character boundary."""
+    return text.encode("utf-8")[:size].decode("utf-8", "ignore").encode("utf-8")
+
+
+def _country_code(value: str) -> bytes:
+    code = (value or "").strip().upper()
+    if len(code) == 2 and code.isascii() and code.isalpha():
+        return code.encode("ascii")
+    if code:
+        logger.warning("Ignoring invalid country code %r", value)
+    return b""
+
+
+def city_key(name: str) -> str:
+    return _fit(normalize_place(name), _KEY_SIZE).decode("utf-8")
+
+
+def write_index(path: str, records: Iterable[Dict], data_version: int, built_at: Optional[float] = None):
+    """Write records ({"name", "country", "meal", "transit_ticket", "updated"}) atomically to `path`."""
+    built_at = time.time() if built_at is None else built_at
+    rows = {}
+    for r in records:
+        rows[city_key(r["name"])] = r
+    ordered = sorted(rows.items(), key=lambda kv: kv[0].encode("utf-8"))
+
+    buf = bytearray(_HEADER.size + _RECORD.size * len(ordered))
+    _HEADER.pack_into(buf, 0, MAGIC, FORMAT_VERSION, _RECORD.size, len(ordered), data_version, built_at)
+    for i, (key, r) in enumerate(ordered):
+        _RECORD.pack_into(
+            buf, _HEADER.size + i * _RECORD.size,
+            _fit(key, _KEY_SIZE), _fit(r["name"], 32), _country_code(r["country"]),
+            float(r["meal"]), float(r["transit_ticket"]), int(r.get("updated") or built_at)
+        )
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(buf)
+    os.replace(tmp, path)
+
+
+def build_index(source: Optional[str] = None, path: Optional[str] = None, data_version: Optional[int] = None) -> int:
+    """Compile the CSV source into the bundled binary index; returns the record count."""
+    with open(source or Config.CITY_COSTS_SOURCE, encoding="utf-8", newline="") as f:
+        records = list(csv.DictReader(f))
+    version = data_version or int(date.today().strftime("%Y%m%d"))
+    write_index(path or Config.CITY_COSTS_PATH, records, version)
+    return len(records)
+
+
+class CityCostIndex:
+    """Read-only view of one index file through mmap; lookups are a binary search."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, size, count, data_version, built_at = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION or size != _RECORD.size:
+            self._mm.close()
+            raise ValueError(f"Not a city-cost index (format {FORMAT_VERSION}): {path}")
+        self.count = count
+        self.data_version = data_version
+        self.built_at = built_at
+        self._keys: Optional[List[str]] = None
+
+    def __len__(self):
+        return self.count
+
+    def _key_at(self, i: int) -> bytes:
+        offset = _HEADER.size + i * _RECORD.size
+        return self._mm[offset:offset + _KEY_SIZE].rstrip(b"\0")
+
+    def record(self, i: int) -> Dict:
+        key, name, country, meal, ticket, updated = _RECORD.unpack_from(self._mm, _HEADER.size + i * _RECORD.size)
+        return {
+            "key": key.rstrip(b"\0").decode("utf-8"),
+            "name": name.rstrip(b"\0").decode("utf-8"),
+            "country": country.decode("ascii").strip("\0"),
+            "meal": round(meal, 2),
+            "transit_ticket": round(ticket, 2),
+            "updated": updated,
+        }
+
+    def find(self, key: str) -> Optional[Dict]:
+        target = key.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._key_at(lo) == target:
+            return self.record(lo)
+        return None
+
+    def keys(self) -> List[str]:
+        if self._keys is None:
+            self._keys = [self._key_at(i).decode("utf-8") for i in range(self.count)]
+        return self._keys
+
+    def records(self) -> Iterator[Dict]:
+        return (self.record(i) for i in range(self.count))
+
+    def close(self):
+        self._mm.close()
+
+
+def fetch_numbeo_prices(city: str) -> Optional[Tuple[float, float]]:
+    """(meal, transit ticket) prices in USD from Numbeo, or None if Numbeo lacks either."""
+    params = {"api_key": os.getenv("NUMBEO_API_KEY"), "query": city}
+    r = _session.get(f"{Config.NUMBEO_BASE_URL}/api/price_items", params=params, timeout=15)
+    r.raise_for_status()
+    prices = r.json().get("prices") or []
+    meal = next((i["average_price"] for i in prices if i["item_name"].startswith("Meal, Inexpensive")), None)
+    ticket = next((i["average_price"] for i in prices if i["item_name"].startswith("One-way Ticket")), None)
+    if meal is None or ticket is None:
+        return None
+    return float(meal), float(ticket)
+
+
+class CityCosts:
+    """
+    Daily costs for a city from the newest available index (bundled or
+    refreshed). Lookups never touch the network: stale entries and unknown
+    cities are queued and re-priced from Numbeo on a background thread.
+    """
+
+    def __init__(self, path: Optional[str] = None, cache_path: Optional[str] = None,
+                 max_age: Optional[int] = None, auto_refresh: Optional[bool] = None):
+        self.cache_path = cache_path or Config.CITY_COSTS_CACHE_PATH
+        self.max_age = Config.CITY_COST_MAX_AGE if max_age is None else max_age
+        self.auto_refresh = Config.CITY_COST_AUTO_REFRESH if auto_refresh is None else auto_refresh
+        self.index = CityCostIndex(path or Config.CITY_COSTS_PATH)
+        if os.path.exists(self.cache_path):
+            try:
+                cached = CityCostIndex(self.cache_path)
+                if cached.built_at > self.index.built_at:
+                    self.index.close()
+                    self.index = cached
+                else:
+                    cached.close()
+            except (OSError, ValueError, struct.error) as e:
+                logger.warning("Ignoring cache %s: %s", self.cache_path, e)
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._country_medians: Optional[Dict[str, Tuple[float, float]]] = None
+        self._refresher: Optional[threading.Thread] = None
+        self._retired: Optional[CityCostIndex] = None
+
+    def lookup(self, city: str) -> Optional[Dict]:
+        """Index record for a free-form city name: exact, first comma part, gazetteer alias, then fuzzy."""
+        index = self.index
+        if not city:
+            return None
+        for key in (city_key(city), city_key(city.split(",")[0])):
+            record = index.find(key)
+            if record:
+                return record
+        place = get_gazetteer().resolve(city)
+        if place:
+            record = index.find(city_key(place["name"]))
+            if record:
+                return record
+        close = difflib.get_close_matches(city_key(city.split(",")[0]), index.keys(), n=1, cutoff=0.85)
+        return index.find(close[0]) if close else None
+
+    def get(self, city: str) -> Dict:
+        """
+        {"meal", "transport", "city", "as_of", "estimated"}: per-day USD costs.
+        Cities missing from the index get their country's median (or the global
+        median) with "estimated": True.
+        """
+        record = self.lookup(city)
+        if record is None or time.time() - record["updated"] > self.max_age:
+            self._queue(record["name"] if record else city)
+
+        if record:
+            meal, ticket, updated = record["meal"], record["transit_ticket"], record["updated"]
+            name = record["name"]
+        else:
+            place = get_gazetteer().resolve(city)
+            meal, ticket = self._median(place["country"] if place else None)
+            updated, name = self.index.built_at, None
+        return {
+            "meal": round(meal * MEALS_PER_DAY, 2),
+            "transport": round(ticket * RIDES_PER_DAY, 2),
+            "city": name,
+            "as_of": datetime.fromtimestamp(updated, tz=timezone.utc).date().isoformat(),
+            "estimated": record is None,
+        }
+
+    def _median(self, country: Optional[str]) -> Tuple[float, float]:
+        if self._country_medians is None:
+            columns: Dict[str, List[Tuple[float, float]]] = {}
+            for r in self.index.records():
+                pair = (r["meal"], r["transit_ticket"])
+                columns.setdefault(r["country"], []).append(pair)
+                columns.setdefault("", []).append(pair)
+            self._country_medians = {
+                c: (statistics.median(p[0] for p in pairs), statistics.median(p[1] for p in pairs))
+                for c, pairs in columns.items()
+            }
+        return self._country_medians.get(country or "") or self._country_medians[""]
+
+    def _queue(self, city: str):
+        if city_key(city) in ("", "unknown"):
+            return
+        with self._lock:
+            self._pending.add(city)
+        if self.auto_refresh and os.getenv("NUMBEO_API_KEY"):
+            self.start_refresh()
+
+    def start_refresh(self) -> Optional[threading.Thread]:
+        """Drain the refresh queue on a daemon thread unless one is already running."""
+        with self._lock:
+            if self._refresher is not None:
+                return None
+            self._refresher = threading.Thread(target=self._drain, name="city-cost-refresh", daemon=True)
+            self._refresher.start()
+            return self._refresher
+
+    def _drain(self):
+        # Cities queued while a refresh runs are picked up by the next pass
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._refresher = None
+                    return
+            self.refresh()
+
+    def refresh(self, cities: Optional[Iterable[str]] = None) -> int:
+        """
+        Re-price `cities` (default: everything queued by lookups) from Numbeo,
+        write the merged index to the cache path and swap it in. Returns the
+        number of cities updated.
+        """
+        if cities is None:
+            with self._lock:
+                cities, self._pending = sorted(self._pending), set()
+        cities = list(cities)
+        if not cities or not os.getenv("NUMBEO_API_KEY"):
+            return 0
+
+        def fetch(city):
+            try:
+                return city, fetch_numbeo_prices(city)
+            except Exception as e:
+                logger.warning("Refresh failed for %s: %s", city, e)
+                return city, None
+
+        index = self.index
+        records = {r["key"]: r for r in index.records()}
+        now = time.time()
+        updated = 0
+        with ThreadPoolExecutor(max_workers=min(len(cities), Config.CITY_COST_REFRESH_CONCURRENCY)) as pool:
+            for city, prices in pool.map(fetch, cities):
+                if prices is None:
+                    continue
+                key = city_key(city)
+                place = get_gazetteer().resolve(city)
+                previous = records.get(key, {})
+                records[key] = {
+                    "name": previous.get("name") or (place["name"] if place else city.split(",")[0].strip()),
+                    "country": previous.get("country") or (place["country"] if place else ""),
+                    "meal": prices[0],
+                    "transit_ticket": prices[1],
+                    "updated": now,
+                }
+                updated += 1
+
+        if updated:
+            write_index(self.cache_path, records.values(), int(date.today().strftime("%Y%m%d")), built_at=now)
+            fresh = CityCostIndex(self.cache_path)
+            with self._lock:
+                # A lookup may still be reading the index just replaced; it is closed at the next swap
+                if self._retired is not None:
+                    self._retired.close()
+                self._retired, self.index = self.index, fresh
+                self._country_medians = None
+        return updated
+
+    def wait_for_refresh(self, timeout: Optional[float] = None):
+        """Block until the background refresh (if any) has drained the queue."""
+        refresher = self._refresher
+        if refresher is not None:
+            refresher.join(timeout)
+
+
+_city_costs = None
+
+
+def get_city_costs() -> CityCosts:
+    """Return the shared city-cost index, mapping it on first use."""
+    global _city_costs
+    if _city_costs is None:
+        _city_costs = CityCosts()
+    return _city_costs
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline city-cost index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="compile the CSV source into the bundled index")
+    build.add_argument("--source", default=Config.CITY_COSTS_SOURCE)
+    build.add_argument("--out", default=Config.CITY_COSTS_PATH)
+    build.add_argument("--data-version", type=int, help="YYYYMMDD (default: today)")
+    lookup = sub.add_parser("lookup", help="print the daily costs for cities")
+    lookup.add_argument("cities", nargs="+")
+    refresh = sub.add_parser("refresh", help="re-price cities from Numbeo into the cache index")
+    refresh.add_argument("cities", nargs="*", help="default: every city in the index")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        count = build_index(args.source, args.out, args.data_version)
+        print(f"Wrote {count} cities to {args.out}")
+    elif args.command == "lookup":
+        costs = CityCosts(auto_refresh=False)
+        print(json.dumps({city: costs.get(city) for city in args.cities}, indent=2))
+    else:
+        costs = CityCosts(auto_refresh=False)
+        cities = args.cities or [r["name"] for r in costs.index.records()]
+        print(f"Updated {costs.refresh(cities)} of {len(cities)} cities in {costs.cache_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
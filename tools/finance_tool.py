@@ -1,60 +1,302 @@
+import codecs
+import functools
+import json
+import numpy as np
+import pandas as pd
 import requests
 import yfinance as yf
 import os
-import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from config import Config
+from goal_analyzer import analyze_goal
+from tools.city_costs import get_city_costs
+from tools.gazetteer import get_gazetteer
+from tools.price_history import get_price_history
+from utils import RateLimiter, SingleFlight, StreamingJSONParser, get_logger
+
+logger = get_logger("FinanceTool")
+
+# Shared by every FinanceTool: Amadeus connection pool, tokens, rate limit and fare cache
+_amadeus_session = requests.Session()
+_amadeus_lock = threading.Lock()
+_amadeus_tokens: Dict[str, Tuple[str, float]] = {}
+_amadeus_limiter = RateLimiter(Config.AMADEUS_RATE_LIMIT)
+_flight_cache: Dict[Tuple, Tuple[float, float]] = {}
+# Identical concurrent upstream requests (from any mission) share one call
+_finance_flight = SingleFlight()
+# Booking.com connection pool and hotel search summaries per (base URL, dest_id, dates, pages)
+_booking_session = requests.Session()
+_hotel_lock = threading.Lock()
+_hotel_cache: Dict[Tuple, Tuple[float, Dict[str, Any]]] = {}
+# Booking.com destination ids never change; kept on disk per (base URL, city)
+_dest_lock = threading.Lock()
+_dest_ids: Dict[str, Dict[str, str]] = {}  # per cache file
+DEST_ID_CACHE_MAX = 5000
+# Exchange rates per (base URL, Yahoo pair), for FX_CACHE_TTL
+_fx_lock = threading.Lock()
+_fx_cache: Dict[Tuple[Optional[str], str], Tuple[float, float]] = {}
+# Star classes per hotel tier (unrated listings count as budget)
+HOTEL_TIERS = {"budget": (0, 2), "standard": (3, 3), "premium": (4, 5)}
+
+FlightCell = Tuple[str, str, str, Optional[str]]  # origin, destination, departure, return
+
+
+def clear_flight_cache():
+    with _amadeus_lock:
+        _flight_cache.clear()
+        _amadeus_tokens.clear()
+
+
+def clear_hotel_cache():
+    with _hotel_lock:
+        _hotel_cache.clear()
+
+
+def clear_fx_cache():
+    with _fx_lock:
+        _fx_cache.clear()
+
+
+def clear_dest_id_cache():
+    """Forget every stored destination id, in memory and on disk."""
+    with _dest_lock:
+        _dest_ids[Config.DEST_ID_CACHE_PATH] = {}
+        if os.path.exists(Config.DEST_ID_CACHE_PATH):
+            os.remove(Config.DEST_ID_CACHE_PATH)
+
+
+def _stored_dest_ids() -> Dict[str, str]:
+    # Loaded once per process; callers hold _dest_lock
+    path = Config.DEST_ID_CACHE_PATH
+    if path not in _dest_ids:
+        try:
+            with open(path, encoding="utf-8") as f:
+                _dest_ids[path] = json.load(f)
+        except (OSError, ValueError):
+            _dest_ids[path] = {}
+    return _dest_ids[path]
+
+
+def _store_dest_id(key: str, dest_id: str):
+    with _dest_lock:
+        ids = _stored_dest_ids()
+        ids[key] = dest_id
+        while len(ids) > DEST_ID_CACHE_MAX:
+            del ids[next(iter(ids))]
+        try:
+            os.makedirs(os.path.dirname(Config.DEST_ID_CACHE_PATH), exist_ok=True)
+            tmp = f"{Config.DEST_ID_CACHE_PATH}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(ids, f)
+            os.replace(tmp, Config.DEST_ID_CACHE_PATH)
+        except OSError as e:
+            logger.warning("Could not store destination ids: %s", e)
+
+
+def _price_summary(prices: pd.Series) -> Dict[str, Any]:
+    return {"min": round(float(prices.min()), 2), "median": round(float(prices.median()), 2),
+            "p75": round(float(prices.quantile(0.75)), 2), "count": int(prices.size)}
+
+
+def hotel_price_stats(stars: List[float], prices: List[float]) -> Dict[str, Any]:
+    """Min, median and p75 overall, per star class and per tier, in one vectorized pass per grouping."""
+    frame = pd.DataFrame({"stars": np.nan_to_num(np.asarray(stars, dtype=float)).round().clip(0, 5).astype(int),
+                          "price": np.asarray(prices, dtype=float)})
+    if frame.empty:
+        return {"nightly": None, "by_class": {}, "by_tier": {}}
+
+    def grouped(keys) -> Dict[str, Dict[str, Any]]:
+        table = frame.groupby(keys, observed=True)["price"].agg(
+            min="min", median="median", p75=lambda p: p.quantile(0.75), count="size")
+        return {str(k): {"min": round(float(r["min"]), 2), "median": round(float(r["median"]), 2),
+                         "p75": round(float(r["p75"]), 2), "count": int(r["count"])}
+                for k, r in table.iterrows()}
+
+    tiers = pd.cut(frame["stars"], bins=[-1] + [hi for _, hi in HOTEL_TIERS.values()],
+                   labels=list(HOTEL_TIERS))
+    return {"nightly": _price_summary(frame["price"]), "by_class": grouped("stars"), "by_tier": grouped(tiers)}
+
+
+def coalesced(method):
+    """Run concurrent identical calls of a FinanceTool method once (keyed by name and arguments)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        return _finance_flight.do(key, method, self, *args, **kwargs)
+    return wrapper
+
+
+def _date_window(center: str, flex: int) -> List[Tuple[int, str]]:
+    """(offset, "YYYY-MM-DD") for every day within +/- flex of center."""
+    base = date.fromisoformat(center)
+    return [(d, (base + timedelta(days=d)).isoformat()) for d in range(-flex, flex + 1)]
 
 
 class FinanceTool:
     """Handles real-world price lookups (flights, hotels, daily costs, forex, stocks, currency normalization)."""
 
-    def __init__(self):
-        # Map symbols/names → ISO codes
-        self.currency_map = {
-            "$": "USD", "usd": "USD", "dollar": "USD",
-            "rupee": "INR", "₹": "INR", "inr": "INR",
-            "€": "EUR", "eur": "EUR", "euro": "EUR",
-            "£": "GBP", "gbp": "GBP", "pound": "GBP",
-            "¥": "JPY", "jpy": "JPY", "yen": "JPY"
-        }
-
     # --- Detect currency from user text ---
     def detect_currency(self, text: str, default="USD"):
         """Detect currency and amount from text (supports symbols, names, short codes)."""
-        text_low = text.lower().strip()
-
-        # Extract numeric value
-        amount = re.findall(r"[\d,.]+", text_low)
-        amount = float(amount[0].replace(",", "")) if amount else None
-
-        # Detect currency
-        for k, v in self.currency_map.items():
-            if k in text_low:
-                return amount, v
-
-        return amount, default
+        analysis = analyze_goal(text)
+        amount = analysis["amount"]
+        if amount is None and analysis["numbers"]:
+            amount = analysis["numbers"][0]
+        return amount, analysis["currency"] or default
 
     # --- Amadeus: Get OAuth token ---
     def get_amadeus_token(self):
-        url = "https://test.api.amadeus.com/v1/security/oauth2/token"
+        """OAuth token, reused until shortly before it expires."""
+        base_url = Config.AMADEUS_BASE_URL
+        with _amadeus_lock:
+            cached = _amadeus_tokens.get(base_url)
+        if cached and time.time() < cached[1]:
+            return cached[0]
+
+        url = f"{base_url}/v1/security/oauth2/token"
         data = {
             "grant_type": "client_credentials",
             "client_id": os.getenv("AMADEUS_CLIENT_ID"),
             "client_secret": os.getenv("AMADEUS_CLIENT_SECRET")
         }
         try:
-            r = requests.post(url, data=data)
+            r = _amadeus_session.post(url, data=data, timeout=15)
             r.raise_for_status()
-            return r.json().get("access_token")
+            payload = r.json()
+            token = payload.get("access_token")
+            if token:
+                expires_at = time.time() + max(int(payload.get("expires_in", 0)) - 60, 0)
+                with _amadeus_lock:
+                    _amadeus_tokens[base_url] = (token, expires_at)
+            return token
         except Exception:
             return None
 
     # --- Flights ---
     def get_flight_price(self, origin, destination, departure_date, return_date=None):
+        cell = (origin, destination, departure_date, return_date)
+        price = self._cached_fare(cell)
+        if price is not None:
+            return price
+
         token = self.get_amadeus_token()
         if not token:
             return "Flight price unavailable - Amadeus auth failed"
+        try:
+            return self._fetch_fare(token, cell)
+        except Exception:
+            return "Flight price unavailable - check Amadeus API"
+
+    @coalesced
+    def get_flight_matrix(self, origin, destination, departure_date, return_date=None,
+                          flex_days=None, return_flex_days=None, max_airports=None) -> Dict[str, Any]:
+        """
+        Flexible-date fare search. Every pair of nearby origin/destination airports
+        is priced for departures (and returns) within +/- flex days of the requested
+        dates, concurrently under the Amadeus rate limit, with each cell cached.
 
-        url = "https://test.api.amadeus.com/v2/shopping/flight-offers"
+        Cached cells are always included; at most FLIGHT_MAX_QUERIES uncached
+        cells are queried, the nearest dates first, and the rest are left out
+        (counted in stats["skipped"]).
+
+        Returns {"cheapest", "matrix", "cells", "stats"}: "matrix" maps departure
+        date -> return date ("one-way") -> cheapest fare across airports, "cheapest"
+        is the best cell overall (None if nothing priced).
+        """
+        started = time.perf_counter()
+        flex = Config.FLIGHT_FLEX_DAYS if flex_days is None else flex_days
+        return_flex = flex if return_flex_days is None else return_flex_days
+        limit = max_airports or Config.FLIGHT_MAX_AIRPORTS
+
+        gazetteer = get_gazetteer()
+        origins = gazetteer.airports(origin)[:limit]
+        destinations = gazetteer.airports(destination)[:limit]
+        if not origins or not destinations:
+            return {"error": f"No airports found for {destination if origins else origin}"}
+
+        returns = _date_window(return_date, return_flex) if return_date else [(0, None)]
+        grid = [
+            ((abs(dep_off) + abs(ret_off), i + j), (o, d, dep, ret))
+            for dep_off, dep in _date_window(departure_date, flex)
+            for ret_off, ret in returns
+            if ret is None or ret > dep
+            for i, o in enumerate(origins)
+            for j, d in enumerate(destinations)
+            if o != d
+        ]
+        # Cached cells are free; over the query budget, query the dates closest to the requested ones
+        # first and, at the same distance, the main airports first
+        grid.sort(key=lambda g: g[0])
+        prices = {cell: self._cached_fare(cell) for _, cell in grid}
+        misses = [cell for _, cell in grid if prices[cell] is None]
+        skipped = len(misses[Config.FLIGHT_MAX_QUERIES:])
+        misses = misses[:Config.FLIGHT_MAX_QUERIES]
+        queried = set(misses)
+        cells = [cell for _, cell in grid if prices[cell] is not None or cell in queried]
+        errors = {}
+        if misses:
+            token = self.get_amadeus_token()
+            if not token:
+                errors = {cell: "Amadeus auth failed" for cell in misses}
+            else:
+                def quote(cell):
+                    try:
+                        return cell, self._fetch_fare(token, cell), None
+                    except Exception as e:
+                        return cell, None, str(e)
+
+                workers = min(len(misses), Config.AMADEUS_MAX_CONCURRENCY)
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    for cell, price, error in pool.map(quote, misses):
+                        prices[cell] = price
+                        if error:
+                            errors[cell] = error
+
+        results, matrix = [], {}
+        for cell in cells:
+            o, d, dep, ret = cell
+            entry = {"origin": o, "destination": d, "departure_date": dep, "return_date": ret}
+            price = prices[cell]
+            if price is None:
+                entry["error"] = errors.get(cell, "Flight price unavailable")
+            else:
+                entry["price"] = price
+                row = matrix.setdefault(dep, {})
+                key = ret or "one-way"
+                row[key] = min(row.get(key, price), price)
+            results.append(entry)
+
+        priced = [c for c in results if "price" in c]
+        return {
+            "cheapest": min(priced, key=lambda c: c["price"]) if priced else None,
+            "matrix": matrix,
+            "cells": results,
+            "stats": {
+                "cells": len(cells),
+                "cached": len(cells) - len(misses),
+                "queried": len(misses),
+                "skipped": skipped,
+                "errors": len(errors),
+                "elapsed_s": round(time.perf_counter() - started, 3),
+            },
+        }
+
+    def _cached_fare(self, cell: FlightCell) -> Optional[float]:
+        with _amadeus_lock:
+            entry = _flight_cache.get((Config.AMADEUS_BASE_URL,) + cell)
+        if entry and time.time() - entry[1] < Config.FLIGHT_CACHE_TTL:
+            return entry[0]
+        return None
+
+    @coalesced
+    def _fetch_fare(self, token: str, cell: FlightCell) -> float:
+        """Cheapest offer (USD) for one route and date pair; raises on failure."""
+        origin, destination, departure_date, return_date = cell
+        url = f"{Config.AMADEUS_BASE_URL}/v2/shopping/flight-offers"
         headers = {"Authorization": f"Bearer {token}"}
         params = {
             "originLocationCode": origin,
@@ -66,19 +308,37 @@ class FinanceTool:
         if return_date:
             params["returnDate"] = return_date
 
-        try:
-            r = requests.get(url, headers=headers, params=params)
-            r.raise_for_status()
-            data = r.json()
-            return data["data"][0]["price"]["total"]
-        except Exception:
-            return "Flight price unavailable - check Amadeus API"
+        for attempt in range(2):
+            _amadeus_limiter.wait()
+            r = _amadeus_session.get(url, headers=headers, params=params, timeout=15)
+            if r.status_code != 429 or attempt:
+                break
+            # Rate limited: honour Retry-After once, then give up on this cell
+            retry_after = r.headers.get("Retry-After", "1")
+            time.sleep(min(float(retry_after), 5.0) if retry_after.isdigit() else 1.0)
+        r.raise_for_status()
+
+        offers = r.json().get("data") or []
+        if not offers:
+            raise ValueError(f"No offers for {origin}-{destination} on {departure_date}")
+        price = min(float(o["price"]["total"]) for o in offers)
+        with _amadeus_lock:
+            _flight_cache[(Config.AMADEUS_BASE_URL,) + cell] = (price, time.time())
+        return price
 
     # --- Helper: Get Booking.com dest_id ---
+    @coalesced
     def get_dest_id(self, city: str):
-        url = "https://{}/v1/hotels/locations".format(
+        base_url = Config.BOOKING_BASE_URL or "https://{}".format(
             os.getenv("RAPIDAPI_HOST", "booking-com15.p.rapidapi.com")
         )
+        key = f"{base_url}|{city.strip().lower()}"
+        with _dest_lock:
+            cached = _stored_dest_ids().get(key)
+        if cached:
+            return cached
+
+        url = f"{base_url}/v1/hotels/locations"
         headers = {
             "X-RapidAPI-Key": os.getenv("RAPIDAPI_KEY"),
             "X-RapidAPI-Host": os.getenv("RAPIDAPI_HOST", "booking-com15.p.rapidapi.com")
@@ -86,7 +346,7 @@ class FinanceTool:
 
         variations = [city, city.split(",")[0], "New Delhi"]
 
-        for q in variations:
+        for i, q in enumerate(variations):
             try:
                 params = {"name": q.strip(), "locale": "en-us"}
                 r = requests.get(url, headers=headers, params=params)
@@ -96,21 +356,24 @@ class FinanceTool:
                 if data and isinstance(data, list):
                     dest_id = data[0].get("dest_id")
                     if dest_id:
-                        print(f"[get_dest_id] Found dest_id {dest_id} for query: {q}")
+                        logger.debug("Found dest_id %s for query: %s", dest_id, q)
+                        if i < 2:  # the New Delhi fallback is not this city's id
+                            _store_dest_id(key, dest_id)
                         return dest_id
             except Exception as e:
-                print(f"[get_dest_id] Error for query {q}:", e)
+                logger.warning("dest_id lookup failed for %s: %s", q, e)
 
-        print(f"[get_dest_id] No dest_id found for {city}")
+        logger.warning("No dest_id found for %s", city)
         return None
 
     # --- Hotels ---
+    @coalesced
     def get_hotel_price(self, city, checkin, checkout):
         dest_id = self.get_dest_id(city)
         if not dest_id:
             return f"Hotel price unavailable for {city} (dest_id not found)"
 
-        url = "https://booking-com.p.rapidapi.com/v1/hotels/search"
+        url = f"{Config.BOOKING_BASE_URL or 'https://booking-com.p.rapidapi.com'}/v1/hotels/search"
         headers = {
             "X-RapidAPI-Key": os.getenv("RAPIDAPI_KEY"),
             "X-RapidAPI-Host": "booking-com.p.rapidapi.com"
@@ -132,47 +395,194 @@ class FinanceTool:
             data = r.json()
             return data["result"][0]["price_breakdown"]["gross_price"]
         except Exception as e:
-            print("[get_hotel_price] Error:", e)
+            logger.warning("Hotel price lookup failed: %s", e)
             return f"Hotel price unavailable for {city}"
 
+    @coalesced
+    def search_hotels(self, city, checkin, checkout, pages=None) -> Dict[str, Any]:
+        """
+        Price distribution for a stay: the first `pages` result pages
+        (HOTEL_SEARCH_PAGES) are fetched concurrently and parsed as they stream
+        in. Returns min/median/p75 overall ("nightly"), per star class
+        ("by_class") and per tier ("by_tier"), cached per (dest_id, dates) for
+        HOTEL_CACHE_TTL.
+
+        All prices are per night: Booking.com's gross price covers the whole
+        stay and is divided by the number of nights (get_hotel_price still
+        returns the stay total). Budgets multiply them by the trip length.
+        """
+        started = time.perf_counter()
+        pages = pages or Config.HOTEL_SEARCH_PAGES
+        # Destination ids are stored on disk, so resolving one before the cache check is local
+        dest_id = self.get_dest_id(city)
+        if not dest_id:
+            return {"error": f"Hotel price unavailable for {city} (dest_id not found)"}
+
+        key = (Config.BOOKING_BASE_URL, dest_id, checkin, checkout, pages)
+        with _hotel_lock:
+            entry = _hotel_cache.get(key)
+        if entry and time.time() - entry[0] < Config.HOTEL_CACHE_TTL:
+            return dict(entry[1], cached=True)
+
+        workers = min(pages, Config.HOTEL_SEARCH_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda page: self._hotel_page(dest_id, checkin, checkout, page), range(pages)))
+
+        stars = [s for page_stars, _, _ in results for s in page_stars]
+        prices = [p for _, page_prices, _ in results for p in page_prices]
+        errors = [e for _, _, e in results if e]
+        if not prices:
+            return {"error": f"Hotel price unavailable for {city}" + (f" ({errors[0]})" if errors else "")}
+
+        # Booking.com quotes the whole stay; budgets work per night
+        nights = max((date.fromisoformat(checkout) - date.fromisoformat(checkin)).days, 1)
+        summary = {
+            "dest_id": dest_id, "checkin": checkin, "checkout": checkout, "nights": nights,
+            "listings": len(prices), "pages": pages - len(errors), "errors": len(errors),
+            **hotel_price_stats(stars, np.asarray(prices) / nights),
+            "elapsed_s": round(time.perf_counter() - started, 3),
+        }
+        if not errors:
+            with _hotel_lock:
+                _hotel_cache[key] = (time.time(), summary)
+        return dict(summary, cached=False)
+
+    def _hotel_page(self, dest_id, checkin, checkout, page) -> Tuple[List[float], List[float], Optional[str]]:
+        """(stars, prices) of one result page, collected hotel by hotel while the body streams in."""
+        url = f"{Config.BOOKING_BASE_URL or 'https://booking-com.p.rapidapi.com'}/v1/hotels/search"
+        headers = {
+            "X-RapidAPI-Key": os.getenv("RAPIDAPI_KEY"),
+            "X-RapidAPI-Host": "booking-com.p.rapidapi.com"
+        }
+        params = {
+            "dest_type": "city",
+            "locale": "en-us",
+            "order_by": "popularity",
+            "checkin_date": checkin,
+            "checkout_date": checkout,
+            "dest_id": dest_id,
+            "adults_number": 1,
+            "units": "metric",
+            "currency": "USD",
+            "page_number": page,
+        }
+        stars, prices = [], []
+        try:
+            with _booking_session.get(url, headers=headers, params=params, timeout=15, stream=True) as r:
+                r.raise_for_status()
+                parser = StreamingJSONParser(["result"])
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                for chunk in r.iter_content(chunk_size=16384):
+                    for _, hotel in parser.feed(decoder.decode(chunk)):
+                        if not isinstance(hotel, dict):
+                            continue
+                        price = (hotel.get("price_breakdown") or {}).get("gross_price") or hotel.get("min_total_price")
+                        try:
+                            prices.append(float(price))
+                        except (TypeError, ValueError):
+                            continue
+                        stars.append(float(hotel.get("class") or 0))
+            return stars, prices, None
+        except Exception as e:
+            logger.warning("Hotel search page %d failed: %s", page, e)
+            return stars, prices, str(e)
+
     # --- Daily living costs ---
     def get_city_cost(self, city):
-        api_key = os.getenv("NUMBEO_API_KEY")
-        if not api_key:
-            return {"meal": 15.0, "transport": 10.0}
+        """Daily meal and transport costs (USD) from the offline city-cost index; no network on this path."""
+        return get_city_costs().get(city)
 
-        url = f"https://www.numbeo.com/api/price_items?api_key={api_key}&query={city}"
-        try:
-            r = requests.get(url)
+    # --- Yahoo: latest close ---
+    @coalesced
+    def get_latest_close(self, symbol: str):
+        """Latest daily close for a Yahoo symbol, or None when Yahoo has no data."""
+        if Config.YAHOO_BASE_URL:
+            # Direct chart endpoint (same payload Yahoo serves), used against local stubs
+            url = f"{Config.YAHOO_BASE_URL}/v8/finance/chart/{symbol}"
+            r = requests.get(url, params={"range": "1d", "interval": "1d"})
             r.raise_for_status()
-            data = r.json()
-            return {
-                "meal": next((i["average_price"] for i in data["prices"] if "Meal" in i["item_name"]), 15.0),
-                "transport": next((i["average_price"] for i in data["prices"] if "Taxi" in i["item_name"]), 10.0)
-            }
-        except Exception:
-            return {"meal": 15.0, "transport": 10.0}
+            result = r.json()["chart"]["result"]
+            closes = result[0]["indicators"]["quote"][0]["close"] if result else []
+            closes = [c for c in closes if c is not None]
+            return closes[-1] if closes else None
+
+        data = yf.Ticker(symbol).history(period="1d")
+        if data.empty:
+            return None
+        return data["Close"].iloc[-1]
 
     # --- Forex / Currency conversion ---
+    def _fx_rate(self, from_currency, to_currency) -> Optional[float]:
+        """Latest close of the Yahoo currency pair, kept for FX_CACHE_TTL."""
+        key = (Config.YAHOO_BASE_URL, f"{from_currency}{to_currency}=X")
+        with _fx_lock:
+            entry = _fx_cache.get(key)
+        if entry and time.time() - entry[1] < Config.FX_CACHE_TTL:
+            return entry[0]
+        rate = self.get_latest_close(key[1])
+        if not rate:
+            return None
+        with _fx_lock:
+            _fx_cache[key] = (float(rate), time.time())
+        return float(rate)
+
+    def get_exchange_rate(self, from_currency="USD", to_currency="INR"):
+        """Units of `to_currency` per `from_currency`, or None when unavailable."""
+        if from_currency == to_currency:
+            return 1.0
+        try:
+            return self._fx_rate(from_currency, to_currency)
+        except Exception:
+            return None
+
     def convert_currency(self, amount, from_currency="USD", to_currency="INR"):
         try:
-            ticker = f"{from_currency}{to_currency}=X"
-            rate = yf.Ticker(ticker).history(period="1d")["Close"].iloc[-1]
-            return round(amount * rate, 2)
+            return round(amount * self._fx_rate(from_currency, to_currency), 2)
         except Exception:
             return "N/A"
 
     # --- Stocks / Crypto ---
     def get_stock_price(self, symbol: str):
+        """Latest close from the local price history; fetches only the missing bars when it is stale."""
         try:
-            stock = yf.Ticker(symbol)
-            data = stock.history(period="1d")
-            if data.empty:
+            bar = get_price_history().latest(symbol)
+            if bar is None:
                 return f"No data found for {symbol}"
-            latest_price = round(data["Close"].iloc[-1], 2)
-            return {"symbol": symbol, "price": latest_price}
+            return {"symbol": symbol, "price": round(bar["close"], 2), "as_of": bar["date"]}
         except Exception as e:
             return {"error": str(e)}
 
     def get_multiple_prices(self, symbols: list):
         return {s: self.get_stock_price(s) for s in symbols}
+
+    def get_price_trend(self, symbol: str, days=None):
+        """Latest price plus trend indicators and daily closes for the last `days` days."""
+        days = days or Config.MARKET_TREND_DAYS
+        quote = self.get_stock_price(symbol)
+        if not isinstance(quote, dict) or "error" in quote:
+            return quote
+        try:
+            # get_stock_price just refreshed the symbol; everything below is a local read
+            frame = get_price_history().indicators(symbol, days, refresh=False)
+        except Exception as e:
+            return dict(quote, error=str(e))
+        close = frame["close"]
+        last = frame.iloc[-1]
+
+        def value(v):
+            return None if pd.isna(v) else round(float(v), 2)
+
+        return dict(
+            quote,
+            change_pct=value((close.iloc[-1] / close.iloc[0] - 1) * 100) if len(close) > 1 else None,
+            high=value(close.max()),
+            low=value(close.min()),
+            sma_20=value(last["sma_20"]),
+            sma_50=value(last["sma_50"]),
+            rsi_14=value(last["rsi_14"]),
+            volatility_20=value(last["volatility_20"]),
+            history=[{"date": d.date().isoformat(), "close": round(float(c), 4)} for d, c in close.items()],
+        )
+
+    def get_market_overview(self, symbols: list, days=None):
+        return {s: self.get_price_trend(s, days) for s in symbols}
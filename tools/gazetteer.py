@@ -0,0 +1,72 @@
+import csv
+import difflib
+import re
+import unicodedata
+from typing import Dict, List, Optional
+
+from config import Config
+
+
+def normalize_place(name: str) -> str:
+    """Lowercase, strip accents and punctuation: "São Paulo, Brazil" -> "sao paulo brazil"."""
+    text = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+class Gazetteer:
+    """Offline place-name index over the bundled gazetteer CSV (no geocoding API needed)."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.places: List[Dict] = []
+        self._index: Dict[str, Dict] = {}
+        with open(path or Config.GAZETTEER_PATH, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                place = {
+                    "name": row["name"],
+                    "country": row["country"],
+                    "latitude": float(row["latitude"]),
+                    "longitude": float(row["longitude"]),
+                    "airports": [a for a in (row.get("airports") or "").split(";") if a],
+                }
+                self.places.append(place)
+                for alias in [row["name"]] + [a for a in (row.get("aliases") or "").split(";") if a]:
+                    self._index.setdefault(normalize_place(alias), place)
+
+    def resolve(self, query: str, cutoff: float = 0.85) -> Optional[Dict]:
+        """
+        Resolve a free-form location ("Tokyo", "Kyoto, Japan", "Lisboa") to a place,
+        trying the full name, its first comma-separated part, then a fuzzy match.
+        """
+        if not query:
+            return None
+        candidates = [normalize_place(query), normalize_place(query.split(",")[0])]
+        for key in candidates:
+            if key in self._index:
+                return self._index[key]
+        close = difflib.get_close_matches(candidates[1], self._index.keys(), n=1, cutoff=cutoff)
+        return self._index[close[0]] if close else None
+
+    def airports(self, query: str) -> List[str]:
+        """
+        IATA airport codes serving a location, busiest first. Metro codes ("NYC",
+        "LON") expand to their airports; an unknown three-letter code is taken as
+        an airport code itself.
+        """
+        code = (query or "").strip()
+        place = self.resolve(code, cutoff=1.0) if len(code) == 3 else self.resolve(code)
+        if place and place["airports"]:
+            return list(place["airports"])
+        if len(code) == 3 and code.isalpha():
+            return [code.upper()]
+        return []
+
+
+_gazetteer = None
+
+
+def get_gazetteer() -> Gazetteer:
+    """Return the shared gazetteer, loading it on first use."""
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer()
+    return _gazetteer
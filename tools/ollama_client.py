@@ -0,0 +1,280 @@
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Deque, Dict, List, Optional, Union
+
+import numpy as np
+import requests
+from langchain_community.chat_models import ChatOllama
+
+from config import Config
+from utils import get_logger
+
+logger = get_logger("Ollama")
+
+_slots: Dict[str, "RequestSlots"] = {}
+_slots_lock = threading.Lock()
+_warm_up_thread: Optional[threading.Thread] = None
+_warm_up_lock = threading.Lock()
+
+
+def keep_alive_value(value: Union[int, str]) -> Union[int, str]:
+    """Ollama takes durations ("30m") or seconds; "-1" style settings are sent as numbers."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def uses_ollama() -> bool:
+    return "ollama" in (Config.DEFAULT_LLM_PROVIDER, Config.PLANNER_LLM_PROVIDER)
+
+
+def configured_models() -> List[str]:
+    """Models the agents use plus OLLAMA_PRELOAD_MODELS, in load order."""
+    return list(dict.fromkeys([Config.OLLAMA_MODEL, *Config.OLLAMA_PRELOAD_MODELS]))
+
+
+class RequestSlots:
+    """
+    Caps the requests in flight to one Ollama server, across threads and event
+    loops. Beyond OLLAMA_NUM_PARALLEL the server queues requests itself, so
+    waiting here instead keeps its timings (and our TTFT) meaningful.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(int(limit), 1)
+        self._sem = threading.BoundedSemaphore(self.limit)
+
+    @contextmanager
+    def hold(self):
+        self._sem.acquire()
+        try:
+            yield
+        finally:
+            self._sem.release()
+
+    @asynccontextmanager
+    async def ahold(self):
+        # Polling keeps the event loop free and a cancelled waiter holds nothing
+        while not self._sem.acquire(blocking=False):
+            await asyncio.sleep(0.005)
+        try:
+            yield
+        finally:
+            self._sem.release()
+
+
+def request_slots(base_url: str) -> RequestSlots:
+    with _slots_lock:
+        if base_url not in _slots:
+            _slots[base_url] = RequestSlots(Config.OLLAMA_MAX_CONCURRENCY)
+        return _slots[base_url]
+
+
+class LLMMetrics:
+    """Recent local LLM calls per model: queue wait, time to first token, total time and model load."""
+
+    def __init__(self, window: int = 500):
+        self._calls: Dict[str, Deque[Dict[str, float]]] = defaultdict(lambda: deque(maxlen=window))
+        self._errors: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, model: str, **timings: float):
+        with self._lock:
+            self._calls[model].append(timings)
+
+    def record_error(self, model: str):
+        with self._lock:
+            self._errors[model] += 1
+
+    def reset(self):
+        with self._lock:
+            self._calls.clear()
+            self._errors.clear()
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            calls = {m: list(c) for m, c in self._calls.items()}
+            errors = dict(self._errors)
+        report = {}
+        for model in dict.fromkeys([*calls, *errors]):
+            rows = calls.get(model, [])
+            ttft = np.array([c["ttft_s"] for c in rows if c.get("ttft_s") is not None])
+            queued = np.array([c["queued_s"] for c in rows])
+            load = np.array([c["load_s"] for c in rows])
+            tokens, decode = sum(c["tokens"] for c in rows), sum(c["total_s"] - (c.get("ttft_s") or 0) for c in rows)
+            report[model] = {
+                "calls": len(rows),
+                "errors": errors.get(model, 0),
+                "cold_starts": int((load > 0).sum()),
+                "ttft_p50_s": round(float(np.percentile(ttft, 50)), 4) if ttft.size else None,
+                "ttft_p95_s": round(float(np.percentile(ttft, 95)), 4) if ttft.size else None,
+                "queued_p95_s": round(float(np.percentile(queued, 95)), 4) if queued.size else None,
+                "load_s": round(float(load.sum()), 3),
+                "tokens_per_s": round(tokens / decode, 1) if decode > 0 else None,
+            }
+        return report
+
+
+llm_metrics = LLMMetrics()
+
+
+class _CallTimer:
+    """Timings of one streamed chat call, read off the NDJSON lines as they pass."""
+
+    def __init__(self, model: str):
+        self.model = model
+        self.created = time.perf_counter()
+        self.sent = self.created
+        self.ttft = None
+        self.final: Optional[Dict[str, Any]] = None
+
+    def started(self):
+        self.sent = time.perf_counter()
+
+    def line(self, raw: str):
+        # Only the lines up to the first token and the final one are decoded
+        if self.ttft is not None and '"done":true' not in raw.replace(" ", ""):
+            return
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return
+        if self.ttft is None and (data.get("message") or {}).get("content"):
+            self.ttft = time.perf_counter() - self.sent
+        if data.get("done"):
+            self.final = data
+
+    def finish(self):
+        if self.final is None:
+            llm_metrics.record_error(self.model)
+            return
+        total = time.perf_counter() - self.sent
+        load = self.final.get("load_duration", 0) / 1e9
+        llm_metrics.record(self.model, queued_s=self.sent - self.created, ttft_s=self.ttft, total_s=total,
+                           load_s=load, tokens=self.final.get("eval_count", 0))
+        logger.info("%s: first token %.3fs, total %.3fs (queued %.3fs, model load %.3fs)", self.model,
+                    self.ttft or total, total, self.sent - self.created, load)
+
+
+class ManagedChatOllama(ChatOllama):
+    """
+    ChatOllama that takes one of OLLAMA_MAX_CONCURRENCY request slots for its
+    server and records queue wait, time to first token and model load time
+    (from Ollama's final stream line) in `llm_metrics`. Blocking and streaming
+    calls, sync and async, all go through the chat streams below.
+    """
+
+    def _create_chat_stream(self, messages, stop=None, **kwargs):
+        call = _CallTimer(self.model)
+        with request_slots(self.base_url).hold():
+            call.started()
+            try:
+                for line in super()._create_chat_stream(messages, stop, **kwargs):
+                    call.line(line)
+                    yield line
+            finally:
+                call.finish()
+
+    async def _acreate_chat_stream(self, messages, stop=None, **kwargs):
+        call = _CallTimer(self.model)
+        async with request_slots(self.base_url).ahold():
+            call.started()
+            try:
+                async for line in super()._acreate_chat_stream(messages, stop, **kwargs):
+                    call.line(line)
+                    yield line
+            finally:
+                call.finish()
+
+
+# --- Residency ---
+def resident_models(base_url: Optional[str] = None) -> Dict[str, str]:
+    """Models the server has loaded, with their expiry (`/api/ps`)."""
+    r = requests.get(f"{base_url or Config.OLLAMA_BASE_URL}/api/ps", timeout=10)
+    r.raise_for_status()
+    return {m["name"]: m.get("expires_at") for m in r.json().get("models", [])}
+
+
+def _is_resident(model: str, resident: Dict[str, str]) -> bool:
+    return model in resident or (":" not in model and f"{model}:latest" in resident)
+
+
+def warm_up(models: Optional[List[str]] = None, base_url: Optional[str] = None,
+            keep_alive: Optional[Union[int, str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Load `models` (default: configured_models()) one after another with an
+    empty generate request, which loads a model without generating, and keep
+    them resident for `keep_alive` (default OLLAMA_KEEP_ALIVE). Returns per
+    model whether it loaded, how long it took and whether it is now resident.
+    """
+    base_url = base_url or Config.OLLAMA_BASE_URL
+    keep_alive = keep_alive_value(Config.OLLAMA_KEEP_ALIVE if keep_alive is None else keep_alive)
+    report: Dict[str, Dict[str, Any]] = {}
+    for model in models or configured_models():
+        started = time.perf_counter()
+        try:
+            r = requests.post(f"{base_url}/api/generate", json={"model": model, "keep_alive": keep_alive,
+                                                                "stream": False}, timeout=Config.OLLAMA_TIMEOUT)
+            r.raise_for_status()
+            report[model] = {"ok": True, "elapsed_s": round(time.perf_counter() - started, 3),
+                             "load_s": round(r.json().get("load_duration", 0) / 1e9, 3)}
+        except Exception as e:
+            logger.warning("Warm-up failed for %s: %s", model, e)
+            report[model] = {"ok": False, "elapsed_s": round(time.perf_counter() - started, 3), "error": str(e)}
+
+    try:
+        resident = resident_models(base_url)
+    except Exception as e:
+        logger.warning("Could not list loaded models: %s", e)
+        resident = {}
+    for model, entry in report.items():
+        entry["resident"] = _is_resident(model, resident)
+    return report
+
+
+def _warm_up_in_background():
+    started = time.perf_counter()
+    report = warm_up()
+    logger.info("Warm-up finished in %.2fs: %s", time.perf_counter() - started,
+                ", ".join(f"{m} {'ok' if r['ok'] else 'failed'}" for m, r in report.items()))
+
+
+def start_warm_up() -> Optional[threading.Thread]:
+    """
+    Preload the configured models on a background thread, once per process,
+    when a provider is ollama and OLLAMA_WARMUP is on. Missions started
+    meanwhile queue behind the load on the server instead of loading again.
+    """
+    global _warm_up_thread
+    with _warm_up_lock:
+        if _warm_up_thread is None and Config.OLLAMA_WARMUP and uses_ollama():
+            _warm_up_thread = threading.Thread(target=_warm_up_in_background, name="ollama-warm-up", daemon=True)
+            _warm_up_thread.start()
+        return _warm_up_thread
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Local Ollama models")
+    sub = parser.add_subparsers(dest="command", required=True)
+    warm = sub.add_parser("warm", help="load models and keep them resident for OLLAMA_KEEP_ALIVE")
+    warm.add_argument("models", nargs="*", help="default: OLLAMA_MODEL and OLLAMA_PRELOAD_MODELS")
+    warm.add_argument("--keep-alive", help="override OLLAMA_KEEP_ALIVE (e.g. 1h, -1)")
+    sub.add_parser("status", help="print the loaded models and when they expire")
+    args = parser.parse_args(argv)
+
+    if args.command == "warm":
+        report = warm_up(args.models or None, keep_alive=args.keep_alive)
+        print(json.dumps(report, indent=2))
+        return 0 if all(r["ok"] for r in report.values()) else 1
+    print(json.dumps(resident_models(), indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+import requests
+
+from config import Config
+from utils import SingleFlight, get_logger
+
+logger = get_logger("PriceHistory")
+
+# One file per column; rows are daily bars in timestamp order
+COLUMNS = {"ts": np.int64, "open": np.float64, "high": np.float64, "low": np.float64,
+           "close": np.float64, "volume": np.float64}
+DAY = 86400
+# Bars before the first returned day that the slowest indicator (SMA 50) needs
+WARMUP_BARS = 50
+
+Bars = Dict[str, np.ndarray]
+Fetcher = Callable[[str, int, int], Bars]
+
+_price_history = None
+
+
+def fetch_daily_bars(symbol: str, start: int, end: int) -> Bars:
+    """Daily OHLCV bars from Yahoo between two UTC timestamps (inclusive), as column arrays."""
+    if Config.YAHOO_BASE_URL:
+        # Direct chart endpoint (same payload Yahoo serves), used against local stubs
+        r = requests.get(f"{Config.YAHOO_BASE_URL}/v8/finance/chart/{symbol}",
+                         params={"period1": start, "period2": end, "interval": "1d"}, timeout=15)
+        r.raise_for_status()
+        result = r.json()["chart"]["result"]
+        if not result:
+            return _empty()
+        quote = result[0]["indicators"]["quote"][0]
+        frame = pd.DataFrame({"ts": result[0].get("timestamp") or [],
+                              **{c: quote.get(c) or [] for c in COLUMNS if c != "ts"}})
+    else:
+        import yfinance as yf
+        data = yf.Ticker(symbol).history(start=pd.Timestamp(start, unit="s").date(),
+                                         end=pd.Timestamp(end + DAY, unit="s").date(), interval="1d")
+        frame = pd.DataFrame({
+            "ts": data.index.tz_localize(None).normalize().astype("int64") // 10 ** 9 if len(data) else [],
+            **{c: data[c.capitalize()].to_numpy() if len(data) else [] for c in COLUMNS if c != "ts"},
+        })
+    frame = frame.dropna(subset=["close"])
+    # Bars are keyed by UTC day
+    frame["ts"] = frame["ts"].astype(np.int64) // DAY * DAY
+    return {c: frame[c].to_numpy(dtype=t) for c, t in COLUMNS.items()}
+
+
+def _empty() -> Bars:
+    return {c: np.empty(0, dtype=t) for c, t in COLUMNS.items()}
+
+
+class PriceHistory:
+    """
+    Local columnar store of daily bars: one append-only binary file per column
+    under `<root>/<symbol>/`, read through memory maps. `update` fetches only
+    the bars after the last stored one (re-fetching that last, possibly
+    partial, day) and is skipped while the symbol was refreshed within
+    `max_age`, so fresh symbols are answered without any network call.
+    """
+
+    def __init__(self, root: Optional[str] = None, fetcher: Optional[Fetcher] = None,
+                 max_age: Optional[float] = None, backfill_days: Optional[int] = None):
+        self.root = root or Config.PRICE_HISTORY_PATH
+        self.fetcher = fetcher or fetch_daily_bars
+        self.max_age = Config.PRICE_HISTORY_MAX_AGE if max_age is None else max_age
+        self.backfill_days = backfill_days or Config.PRICE_HISTORY_BACKFILL_DAYS
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._updates = SingleFlight()
+        self.stats = {"reads": 0, "fetches": 0, "bars_appended": 0}
+
+    def _dir(self, symbol: str) -> str:
+        return os.path.join(self.root, re.sub(r"[^A-Za-z0-9=.^_-]", "_", symbol.upper()))
+
+    def _lock(self, symbol: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(symbol.upper(), threading.Lock())
+
+    # --- Storage ---
+    def _rows(self, folder: str) -> int:
+        # A write interrupted between columns leaves them uneven; the shortest one wins
+        try:
+            return min(os.path.getsize(os.path.join(folder, c)) // np.dtype(t).itemsize
+                       for c, t in COLUMNS.items())
+        except OSError:
+            return 0
+
+    def _column(self, folder: str, name: str, rows: int) -> np.ndarray:
+        if not rows:
+            return np.empty(0, dtype=COLUMNS[name])
+        return np.memmap(os.path.join(folder, name), dtype=COLUMNS[name], mode="r", shape=(rows,))
+
+    def _meta(self, folder: str) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(folder, "meta.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def read(self, symbol: str, start: Optional[int] = None, end: Optional[int] = None) -> pd.DataFrame:
+        """Stored bars with start <= ts <= end (UTC seconds), without fetching."""
+        folder = self._dir(symbol)
+        rows = self._rows(folder)
+        ts = self._column(folder, "ts", rows)
+        lo = int(np.searchsorted(ts, start, side="left")) if start is not None else 0
+        hi = int(np.searchsorted(ts, end, side="right")) if end is not None else rows
+        self.stats["reads"] += 1
+        frame = pd.DataFrame({c: np.array(self._column(folder, c, rows)[lo:hi]) for c in COLUMNS})
+        frame.index = pd.to_datetime(frame["ts"], unit="s")
+        frame.index.name = "date"
+        return frame.drop(columns="ts")
+
+    def append(self, symbol: str, bars: Bars) -> int:
+        """
+        Store bars newer than the last stored one; a bar for the last stored day
+        replaces it (today's bar changes until the close). Returns rows written.
+        """
+        folder = self._dir(symbol)
+        order = np.argsort(bars["ts"], kind="stable")
+        bars = {c: np.asarray(bars[c], dtype=t)[order] for c, t in COLUMNS.items()}
+        with self._lock(symbol):
+            os.makedirs(folder, exist_ok=True)
+            rows = self._rows(folder)
+            last = int(self._column(folder, "ts", rows)[-1]) if rows else None
+            written = 0
+            if last is not None and last in bars["ts"]:
+                i = int(np.flatnonzero(bars["ts"] == last)[-1])
+                for c, t in COLUMNS.items():
+                    with open(os.path.join(folder, c), "r+b") as f:
+                        f.seek((rows - 1) * np.dtype(t).itemsize)
+                        f.write(bars[c][i:i + 1].tobytes())
+                written += 1
+            new = bars["ts"] > last if last is not None else np.ones(len(bars["ts"]), dtype=bool)
+            # Drop duplicate days within the batch, keeping the latest bar for each
+            _, keep = np.unique(bars["ts"][new][::-1], return_index=True)
+            idx = np.flatnonzero(new)[::-1][keep]
+            if len(idx):
+                for c, t in COLUMNS.items():
+                    with open(os.path.join(folder, c), "ab") as f:
+                        if os.path.getsize(f.name) > rows * np.dtype(t).itemsize:
+                            f.truncate(rows * np.dtype(t).itemsize)
+                        f.write(bars[c][idx].tobytes())
+                written += len(idx)
+            self.stats["bars_appended"] += int(len(idx))
+        return written
+
+    # --- Refresh ---
+    def is_fresh(self, symbol: str) -> bool:
+        fetched_at = self._meta(self._dir(symbol)).get("fetched_at", 0)
+        return time.time() - fetched_at < self.max_age
+
+    def update(self, symbol: str, force: bool = False) -> int:
+        """Fetch the bars missing since the last stored day unless the symbol is fresh; returns rows written."""
+        if not force and self.is_fresh(symbol):
+            return 0
+        return self._updates.do(symbol.upper(), self._update, symbol)
+
+    def _update(self, symbol: str) -> int:
+        folder = self._dir(symbol)
+        rows = self._rows(folder)
+        now = int(time.time())
+        if rows:
+            start = int(self._column(folder, "ts", rows)[-1])
+        else:
+            start = (now // DAY - self.backfill_days) * DAY
+        self.stats["fetches"] += 1
+        written = self.append(symbol, self.fetcher(symbol, start, now))
+        with open(os.path.join(folder, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"symbol": symbol.upper(), "fetched_at": time.time()}, f)
+        logger.info("Price history %s: %d bars written (%d stored)", symbol, written, self._rows(folder))
+        return written
+
+    # --- Queries ---
+    def latest(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Last bar, fetching the delta first when the stored data is not fresh enough."""
+        try:
+            self.update(symbol)
+        except Exception as e:
+            # Serve what is stored when the refresh fails
+            logger.warning("Price history refresh failed for %s: %s", symbol, e)
+        frame = self.read(symbol, start=(int(time.time()) // DAY - 10) * DAY)
+        if frame.empty:
+            frame = self.read(symbol)
+        if frame.empty:
+            return None
+        bar = frame.iloc[-1]
+        return {"date": frame.index[-1].date().isoformat(), **{c: float(bar[c]) for c in frame.columns}}
+
+    def ohlc(self, symbol: str, days: int = 90, freq: str = "1D", refresh: bool = True) -> pd.DataFrame:
+        """Bars for the last `days` days, resampled to `freq` ("1D", "W", "MS", ...)."""
+        if refresh:
+            self.update(symbol)
+        frame = self.read(symbol, start=(int(time.time()) // DAY - days) * DAY)
+        if freq in ("1D", "D") or frame.empty:
+            return frame
+        return frame.resample(freq).agg({"open": "first", "high": "max", "low": "min",
+                                         "close": "last", "volume": "sum"}).dropna(subset=["close"])
+
+    def indicators(self, symbol: str, days: int = 90, refresh: bool = True) -> pd.DataFrame:
+        """Last `days` daily bars with SMA 20/50, EMA 12, RSI 14, daily returns and 20-day volatility."""
+        # Markets trade about 5 days in 7; the margin covers a couple of weeks of holidays
+        window = math.ceil((days + WARMUP_BARS) * 7 / 5) + 10
+        frame = self.ohlc(symbol, window, refresh=refresh)[["close"]].copy()
+        close = frame["close"]
+        frame["sma_20"] = close.rolling(20).mean()
+        frame["sma_50"] = close.rolling(50).mean()
+        frame["ema_12"] = close.ewm(span=12, adjust=False).mean()
+        delta = close.diff()
+        gain = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+        loss = (-delta.clip(upper=0)).ewm(alpha=1 / 14, adjust=False).mean()
+        frame["rsi_14"] = 100 - 100 / (1 + gain / loss.replace(0, np.nan))
+        frame["return"] = close.pct_change()
+        frame["volatility_20"] = frame["return"].rolling(20).std() * np.sqrt(252)
+        return frame.iloc[-days:] if len(frame) > days else frame
+
+
+def get_price_history() -> PriceHistory:
+    global _price_history
+    if _price_history is None:
+        _price_history = PriceHistory()
+    return _price_history
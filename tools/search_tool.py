@@ -1,5 +1,141 @@
-from langchain_community.utilities import SerpAPIWrapper
+import asyncio
 import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from config import Config
+from utils import SingleFlight
+
+# Filler words that do not change what a web search returns
+_FILLER = {"a", "an", "the", "please", "me", "find", "search", "for", "about", "some", "info", "information"}
+
+# One SerpAPI client and one table of in-flight queries for the whole process
+_wrapper = None
+_search_flight = SingleFlight()
+_search_cache = None
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form used for dedupe and caching: "Best  things to do in Tokyo?" -> "best things to do in tokyo"."""
+    text = unicodedata.normalize("NFKC", str(query)).lower()
+    words = re.sub(r"[^\w\s$€£₹¥-]", " ", text).split()
+    return " ".join(w for w in words if w not in _FILLER) or " ".join(words)
+
+
+def _serpapi_search(query: str) -> str:
+    global _wrapper
+    if _wrapper is None:
+        from langchain_community.utilities import SerpAPIWrapper
+        _wrapper = SerpAPIWrapper(serpapi_api_key=os.getenv("SERPAPI_API_KEY"))
+    return _wrapper.run(query)
+
+
+class SearchCache:
+    """Search results on disk (SQLite) with a TTL, shared across missions and restarts."""
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[int] = None):
+        self.path = path or Config.SEARCH_CACHE_PATH
+        self.ttl = Config.SEARCH_CACHE_TTL if ttl is None else ttl
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS search_cache "
+                         "(query TEXT PRIMARY KEY, result TEXT NOT NULL, created REAL NOT NULL)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT result, created FROM search_cache WHERE query = ?", (key,)).fetchone()
+        if row and time.time() - row[1] < self.ttl:
+            return row[0]
+        return None
+
+    def set(self, key: str, result: str):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?)", (key, result, time.time()))
+
+
+def get_search_cache() -> SearchCache:
+    global _search_cache
+    if _search_cache is None:
+        _search_cache = SearchCache()
+    return _search_cache
+
+
+class SearchTool:
+    """
+    Web search for one mission. Queries are normalized, answered from the
+    mission's own results, then the disk cache, and only then from SerpAPI;
+    identical queries already in flight (from any mission) share one call.
+    """
+
+    def __init__(self, backend: Optional[Callable[[str], str]] = None, cache: Optional[SearchCache] = None):
+        self.backend = backend or _serpapi_search
+        self.cache = cache or get_search_cache()
+        self._seen: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.stats = {"queries": 0, "mission_hits": 0, "cache_hits": 0, "coalesced": 0, "upstream": 0}
+
+    def _count(self, field: str):
+        with self._lock:
+            self.stats[field] += 1
+
+    def run(self, query: str) -> str:
+        key = normalize_query(query)
+        self._count("queries")
+        with self._lock:
+            if key in self._seen:
+                self.stats["mission_hits"] += 1
+                return self._seen[key]
+
+        result = self.cache.get(key)
+        if result is not None:
+            self._count("cache_hits")
+        else:
+            result = self._fetch(key, query)
+        with self._lock:
+            self._seen[key] = result
+        return result
+
+    def _fetch(self, key: str, query: str) -> str:
+        def upstream():
+            self._count("upstream")
+            result = self.backend(query)
+            self.cache.set(key, result)
+            return result
+
+        result, shared = _search_flight.call(key, upstream)
+        if shared:
+            self._count("coalesced")
+        return result
+
+    def batch(self, queries: List[str], max_workers: Optional[int] = None) -> List[str]:
+        """Run several queries concurrently; results are in input order."""
+        if not queries:
+            return []
+        workers = min(len(queries), max_workers or Config.SEARCH_MAX_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(self.run, queries))
+
+    async def abatch(self, queries: List[str], max_workers: Optional[int] = None) -> List[str]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.batch, queries, max_workers)
+
+    def report(self) -> Dict[str, float]:
+        """Mission search stats, hit rate and estimated spend saved (USD)."""
+        with self._lock:
+            stats = dict(self.stats)
+        saved = stats["queries"] - stats["upstream"]
+        stats["hit_rate"] = round(saved / stats["queries"], 3) if stats["queries"] else 0.0
+        stats["spend_saved_usd"] = round(saved * Config.SERPAPI_COST_PER_SEARCH, 4)
+        return stats
+
 
 def get_search_tool():
-    return SerpAPIWrapper(serpapi_api_key=os.getenv("SERPAPI_API_KEY"))
+    return SearchTool()
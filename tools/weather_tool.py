@@ -1,18 +1,142 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
 import requests
-import os
 
-def get_weather_tool():
-    def weather_lookup(location, date=None):
-        # Free API: https://open-meteo.com/
-        url = f"https://api.open-meteo.com/v1/forecast"
+from config import Config
+from tools.gazetteer import get_gazetteer
+from utils import get_logger
+
+logger = get_logger("WeatherTool")
+
+DAILY_FIELDS = ["temperature_2m_max", "temperature_2m_min", "precipitation_sum"]
+
+# Shared by every WeatherTool: one connection pool and one forecast cache
+_session = requests.Session()
+_cache_lock = threading.Lock()
+_forecast_cache: Dict[Tuple[float, float], Dict[str, Any]] = {}
+
+Stop = Union[str, Tuple[str, Optional[str]]]
+
+
+def clear_weather_cache():
+    with _cache_lock:
+        _forecast_cache.clear()
+
+
+class WeatherTool:
+    """
+    Daily forecasts from Open-Meteo (free, no key) for named places.
+
+    Locations are geocoded offline through the bundled gazetteer. Forecasts are
+    cached per rounded lat/lon with a TTL, each entry holding every forecast
+    date, and several stops are fetched with a single multi-location request.
+    """
+
+    def __init__(self, ttl: Optional[int] = None):
+        self.ttl = Config.WEATHER_CACHE_TTL if ttl is None else ttl
+        self.gazetteer = get_gazetteer()
+
+    @staticmethod
+    def cache_key(place: Dict) -> Tuple[float, float]:
+        return round(place["latitude"], 2), round(place["longitude"], 2)
+
+    def get_forecast(self, location: str, date: Optional[str] = None) -> Dict[str, Any]:
+        return self.get_forecasts([(location, date)])[0]
+
+    def get_forecasts(self, stops: Sequence[Stop]) -> List[Dict[str, Any]]:
+        """
+        Forecasts for several stops, each a location or a (location, "YYYY-MM-DD")
+        pair, in input order. Uses at most one HTTP request; none when the cache is warm.
+        """
+        stops = [(s, None) if isinstance(s, str) else tuple(s) for s in stops]
+        places = [self.gazetteer.resolve(location) for location, _ in stops]
+
+        misses = {}
+        for place in places:
+            if place and self._cached(place) is None:
+                misses[self.cache_key(place)] = place
+        error = self._fetch(list(misses.values())) if misses else None
+
+        results = []
+        for (location, date), place in zip(stops, places):
+            if place is None:
+                results.append({"location": location, "error": f"Unknown location: {location}"})
+                continue
+            entry = self._cached(place)
+            if entry is None:
+                results.append({"location": place["name"], "error": error or "Forecast unavailable"})
+                continue
+            days = entry["days"]
+            daily = [days[date]] if date in days else ([] if date else [days[d] for d in sorted(days)])
+            result = {"location": place["name"], "latitude": place["latitude"],
+                      "longitude": place["longitude"], "daily": daily}
+            if date and not daily:
+                result["error"] = f"No forecast for {date}"
+            results.append(result)
+        return results
+
+    async def aget_forecast(self, location: str, date: Optional[str] = None) -> Dict[str, Any]:
+        return (await self.aget_forecasts([(location, date)]))[0]
+
+    async def aget_forecasts(self, stops: Sequence[Stop]) -> List[Dict[str, Any]]:
+        """Async get_forecasts; served inline on a warm cache, otherwise fetched off the event loop."""
+        places = [self.gazetteer.resolve(s if isinstance(s, str) else s[0]) for s in stops]
+        if all(p is None or self._cached(p) is not None for p in places):
+            return self.get_forecasts(stops)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.get_forecasts, stops)
+
+    def _cached(self, place: Dict) -> Optional[Dict[str, Any]]:
+        with _cache_lock:
+            entry = _forecast_cache.get(self.cache_key(place))
+        if entry and time.time() - entry["fetched_at"] < self.ttl:
+            return entry
+        return None
+
+    def _fetch(self, places: List[Dict]) -> Optional[str]:
+        """Fetch all places in one request and fill the cache; returns an error message on failure."""
         params = {
-            "latitude": 35.6762,  # default Tokyo for demo
-            "longitude": 139.6503,
-            "daily": "temperature_2m_max,temperature_2m_min",
-            "timezone": "Asia/Tokyo"
+            "latitude": ",".join(str(p["latitude"]) for p in places),
+            "longitude": ",".join(str(p["longitude"]) for p in places),
+            "daily": ",".join(DAILY_FIELDS),
+            "timezone": "auto",
+            "forecast_days": Config.WEATHER_FORECAST_DAYS,
         }
-        response = requests.get(url, params=params)
-        data = response.json()
-        return data
+        try:
+            r = _session.get(f"{Config.WEATHER_BASE_URL}/v1/forecast", params=params, timeout=10)
+            r.raise_for_status()
+            data = r.json()
+        except Exception as e:
+            logger.warning("Forecast request failed: %s", e)
+            return f"Forecast unavailable ({e})"
+
+        # Open-Meteo returns a list for multiple coordinates, a single object otherwise
+        payloads = data if isinstance(data, list) else [data]
+        now = time.time()
+        with _cache_lock:
+            for place, payload in zip(places, payloads):
+                daily = payload.get("daily", {})
+                columns = {f: daily.get(f) or [] for f in DAILY_FIELDS}
+                days = {}
+                for i, date in enumerate(daily.get("time", [])):
+                    row = {f: values[i] if i < len(values) else None for f, values in columns.items()}
+                    days[date] = {
+                        "date": date,
+                        "temp_max": row["temperature_2m_max"],
+                        "temp_min": row["temperature_2m_min"],
+                        "precipitation": row["precipitation_sum"],
+                    }
+                _forecast_cache[self.cache_key(place)] = {"fetched_at": now, "days": days}
+        return None
+
+
+def get_weather_tool():
+    tool = WeatherTool()
+
+    def weather_lookup(location, date=None):
+        return tool.get_forecast(location, date)
 
     return weather_lookup
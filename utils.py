@@ -1,84 +1,465 @@
 import logging
+import logging.handlers
+import atexit
 import json
+import queue
 import re
 import ast
-from typing import Any, Dict, List, Optional
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from config import Config
+
+# Fields every LogRecord has; anything else on a record came from `extra` or the log context
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+_TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Fields added to every record logged in the current context (e.g. the mission id)
+log_context: ContextVar[Dict[str, Any]] = ContextVar("log_context", default={})
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, context and `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update((k, v) for k, v in vars(record).items() if k not in _RECORD_ATTRS)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DebugSampler(logging.Filter):
+    """
+    Keeps one in every `1 / rate` DEBUG records per call site (logger and
+    message template); kept records carry `sampled` = how many each stands
+    for. Other levels always pass.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = max(round(1 / rate), 1) if rate > 0 else 0
+        self._seen: Dict[Tuple[str, Any], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.every == 1:
+            return True
+        if not self.every:
+            return False
+        if len(self._seen) > 10000:  # templates built with f-strings never repeat
+            self._seen.clear()
+        key = (record.name, record.msg)
+        count = self._seen.get(key, 0)
+        self._seen[key] = count + 1
+        if count % self.every:
+            return False
+        record.sampled = self.every
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records as they are; the message is formatted on the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        for key, value in log_context.get().items():
+            record.__dict__.setdefault(key, value)
+        return record
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None,
+                      debug_sample_rate: Optional[float] = None, stream=None) -> logging.handlers.QueueListener:
+    """
+    Route all logging through a queue: callers only enqueue the record, and a
+    listener thread formats it (JSON, or text with LOG_FORMAT=text) and writes
+    it to `stream` (stderr). Calling it again replaces the previous setup.
+    """
+    global _listener
+    root = logging.getLogger()
+    for handler in [h for h in root.handlers if isinstance(h, _QueueHandler)]:
+        root.removeHandler(handler)
+    if _listener:
+        _listener.stop()
+
+    fmt = (fmt or Config.LOG_FORMAT).lower()
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(_TEXT_FORMAT))
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    handler = _QueueHandler(records)
+    handler.addFilter(DebugSampler(Config.LOG_DEBUG_SAMPLE_RATE if debug_sample_rate is None else debug_sample_rate))
+    root.addHandler(handler)
+    root.setLevel((level or Config.LOG_LEVEL).upper())
+
+    _listener = logging.handlers.QueueListener(records, output)
+    _listener.start()
+    return _listener
+
+
+def flush_logging():
+    """Write out everything queued so far (the listener keeps running)."""
+    if _listener:
+        _listener.stop()
+        _listener.start()
+
+
+@atexit.register
+def _stop_logging():
+    if _listener:
+        _listener.stop()
+
+
+# Like basicConfig: leave logging alone if the host application configured it
+if not logging.getLogger().handlers:
+    configure_logging()
 logger = logging.getLogger("NeuroNavigator")
 
 def get_logger(name: str):
     """Get a named logger."""
     return logging.getLogger(name)
 
+_JSON_DECODER = json.JSONDecoder()
+# Whole quoted strings or braces; text in between is skipped by the regex engine
+_SCAN_TOKENS = re.compile(r""""[^"\\]*(?:\\.[^"\\]*)*"|'[^'\\]*(?:\\.[^'\\]*)*'|[{}]""")
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_FENCE = re.compile(r"```(?:json)?\s*")
+_MAX_CANDIDATES = 8
+
+
+def find_json_object(text: str, start: int = 0) -> Optional[Tuple[int, int]]:
+    """
+    Locate the first balanced {...} span at or after `start`.
+    Braces inside single- or double-quoted strings (including escaped quotes)
+    are ignored. Returns (begin, end) or None if no balanced object exists.
+    """
+    begin = text.find("{", start)
+    if begin == -1:
+        return None
+
+    depth = 0
+    for m in _SCAN_TOKENS.finditer(text, begin):
+        tok = m.group()
+        if tok == "{":
+            depth += 1
+        elif tok == "}":
+            depth -= 1
+            if depth == 0:
+                return begin, m.end()
+    return None
+
+
+def _decode_object(text: str, begin: int) -> Optional[Dict[str, Any]]:
+    """Decode the JSON object starting at `begin`, ignoring anything after it."""
+    try:
+        value, _ = _JSON_DECODER.raw_decode(text, begin)
+    except json.JSONDecodeError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def _repair_object(text: str, begin: int) -> Optional[Dict[str, Any]]:
+    """Repair passes for the balanced object starting at `begin`, cheapest first."""
+    span = find_json_object(text, begin)
+    if span is None:
+        return None
+    # Only the extracted object is rewritten; prose and later objects are left alone
+    candidate = text[span[0]:span[1]]
+
+    # Trailing commas
+    no_commas = _TRAILING_COMMA.sub(r"\1", candidate)
+    if no_commas != candidate:
+        value = _decode_object(no_commas, 0)
+        if value is not None:
+            return value
+
+    # JSON written with single quotes
+    if "'" in candidate:
+        value = _decode_object(no_commas.replace("'", '"'), 0)
+        if value is not None:
+            return value
+
+    # Python dict syntax (True/None, mixed quotes)
+    try:
+        value = ast.literal_eval(candidate)
+        if isinstance(value, dict):
+            return value
+    except Exception:
+        pass
+    return None
+
+
 def safe_json_parse(text: str) -> Dict[str, Any]:
     """
     Robustly parse JSON from text, handling common LLM output issues 
-    like markdown code blocks, single quotes, or trailing commas.
+    like markdown code blocks, prose around the object, single quotes,
+    or trailing commas.
     """
     if isinstance(text, dict):
         return text
-        
-    # Remove markdown code blocks
-    cleaned_text = re.sub(r"```json\s*", "", text)
-    cleaned_text = re.sub(r"```\s*", "", cleaned_text)
-    cleaned_text = cleaned_text.strip()
-    
-    # Extract JSON object if embedded in text
-    match = re.search(r"\{.*\}", cleaned_text, re.DOTALL)
-    if match:
-        cleaned_text = match.group(0)
 
+    # Fast path: decode the first object in place; prose and fences around it are ignored
+    begin = text.find("{")
+    for _ in range(_MAX_CANDIDATES):
+        if begin == -1:
+            break
+        value = _decode_object(text, begin)
+        if value is None:
+            value = _repair_object(text, begin)
+        if value is not None:
+            return value
+
+        # Skip past this candidate (e.g. a "{placeholder}" in prose) to the next one
+        span = find_json_object(text, begin)
+        if span is None:
+            break
+        begin = text.find("{", span[1])
+
+    # No usable object: try the whole text without markdown fences
+    cleaned_text = _FENCE.sub("", text).strip()
     try:
         return json.loads(cleaned_text)
+    except Exception:
+        logger.error("Failed to parse JSON: %s...", text[:100])
+        return {"raw_text": text}
+
+def _decode_fragment(raw: str) -> Any:
+    """Decode one complete JSON value, tolerating Python-style quoting."""
+    try:
+        return json.loads(raw)
     except json.JSONDecodeError:
         try:
-            # Try to fix single quotes
-            fixed = cleaned_text.replace("'", '"')
-            # Fix trailing commas
-            fixed = re.sub(r",\s*}", "}", fixed)
-            fixed = re.sub(r",\s*]", "]", fixed)
-            return json.loads(fixed)
+            return ast.literal_eval(raw)
         except Exception:
+            return safe_json_parse(raw) if raw.startswith("{") else raw
+
+
+class StreamingJSONParser:
+    """
+    Incremental parser for a JSON completion that arrives in chunks.
+
+    `feed()` returns (key, element) pairs for every element of the watched
+    top-level arrays that closed within the chunk, e.g. each day of
+    "itinerary" or each string of "insights". Prose or markdown fences before
+    the object are skipped, as are braces in that prose that do not open a
+    valid object; `close()` parses the full text.
+    """
+
+    def __init__(self, keys):
+        self.keys = set(keys)
+        self.text = ""
+        self._pos = 0
+        self._started = False
+        self._begin = -1
+        self._done = False
+        self._quote = None
+        self._escape = False
+        self._string_start = -1
+        self._item_start = -1
+        # Open containers: [bracket, current key, expecting a key]
+        self._stack: List[list] = []
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self.text += chunk
+        text = self.text
+        items: List[Tuple[str, Any]] = []
+        i = self._pos
+        while i < len(text) and not self._done:
+            ch = text[i]
+            if not self._started:
+                if ch == "{":
+                    # An object opens with a key or closes at once; "{x}" in prose is skipped
+                    j = i + 1
+                    while j < len(text) and text[j].isspace():
+                        j += 1
+                    if j == len(text):
+                        break  # decide once the next chunk arrives
+                    if text[j] in "\"'}":
+                        self._started = True
+                        self._begin = i
+                        self._stack.append(["{", None, True])
+            elif self._quote:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == self._quote:
+                    self._quote = None
+                    self._end_string(i, items)
+            elif ch == '"' or ch == "'":
+                self._start_value(i)
+                self._quote = ch
+                self._string_start = i
+            elif ch == "{" or ch == "[":
+                self._start_value(i)
+                self._stack.append([ch, None, ch == "{"])
+            elif ch == "}" or ch == "]":
+                self._end_scalar(i, items)
+                self._stack.pop()
+                if not self._stack:
+                    if _decode_object(text, self._begin) is None and _repair_object(text, self._begin) is None:
+                        # Not an object after all (e.g. "{'placeholder'}"): keep scanning after it
+                        self._started = False
+                        self._item_start = -1
+                    else:
+                        self._done = True
+                else:
+                    self._end_value(i + 1, items)
+            elif ch == ",":
+                self._end_scalar(i, items)
+                top = self._stack[-1]
+                if top[0] == "{":
+                    top[2] = True
+            elif ch != ":" and not ch.isspace():
+                self._start_value(i)
+            i += 1
+        self._pos = i
+        return items
+
+    def close(self) -> Dict[str, Any]:
+        """Parse the complete text once the stream has ended."""
+        return safe_json_parse(self.text)
+
+    def _watching(self) -> bool:
+        stack = self._stack
+        return len(stack) == 2 and stack[1][0] == "[" and stack[0][1] in self.keys
+
+    def _start_value(self, i: int):
+        if self._item_start == -1 and self._watching():
+            self._item_start = i
+
+    def _end_value(self, end: int, items: List[Tuple[str, Any]]):
+        if self._item_start != -1 and self._watching():
+            items.append((self._stack[0][1], _decode_fragment(self.text[self._item_start:end])))
+            self._item_start = -1
+
+    def _end_scalar(self, i: int, items: List[Tuple[str, Any]]):
+        # Numbers and literals have no closing token; they end at "," or the bracket
+        if self._item_start != -1 and self._watching():
+            raw = self.text[self._item_start:i].strip()
+            if raw:
+                items.append((self._stack[0][1], _decode_fragment(raw)))
+            self._item_start = -1
+
+    def _end_string(self, i: int, items: List[Tuple[str, Any]]):
+        top = self._stack[-1]
+        if top[0] == "{" and top[2]:
+            top[1] = _decode_fragment(self.text[self._string_start:i + 1])
+            top[2] = False
+        else:
+            self._end_value(i + 1, items)
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across threads (a rate of 0 disables it)."""
+
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class _Abandoned(Exception):
+    """The caller running a shared call was cancelled before it finished."""
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls: the first caller for a key runs it and
+    callers arriving while it is in flight (from any thread or event loop) get
+    the same result or exception. Nothing is kept once the call settles.
+
+    In `ado`, a waiter cancelled while waiting leaves the shared call running for
+    the others; if the caller running it is cancelled, the waiters retry and one
+    of them runs it instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.stats = {"calls": 0, "coalesced": 0}
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        with self._lock:
+            self.stats["calls"] += 1
+            future = self._calls.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def _settle(self, key: Hashable, future: Future, result: Any = None, error: Optional[BaseException] = None):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def call(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Tuple[Any, bool]:
+        """Run or join the call for `key`; returns (result, shared) where shared means another caller ran it."""
+        future, owner = self._join(key)
+        if not owner:
+            return future.result(), True
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, result)
+        return result, False
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        return self.call(key, fn, *args, **kwargs)[0]
+
+    async def ado(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Async `do`: `fn(*args, **kwargs)` returns an awaitable."""
+        while True:
+            future, owner = self._join(key)
+            if not owner:
+                try:
+                    # Shielded so cancelling this waiter does not cancel the shared call
+                    return await asyncio.shield(asyncio.wrap_future(future))
+                except _Abandoned:
+                    continue
             try:
-                # Last resort: ast.literal_eval for python dict syntax
-                return ast.literal_eval(cleaned_text)
-            except Exception:
-                logger.error(f"Failed to parse JSON: {text[:100]}...")
-                return {"raw_text": text}
+                result = await fn(*args, **kwargs)
+            except asyncio.CancelledError:
+                self._settle(key, future, error=_Abandoned())
+                raise
+            except BaseException as e:
+                self._settle(key, future, error=e)
+                raise
+            self._settle(key, future, result)
+            return result
+
+    def report(self) -> Dict[str, Any]:
+        calls = self.stats["calls"]
+        return dict(self.stats, coalesced_rate=round(self.stats["coalesced"] / calls, 3) if calls else 0.0)
+
 
 def extract_tickers_from_goal(goal: str) -> List[str]:
     """Extract known stock/crypto tickers from a goal string."""
-    ticker_map = {
-        "apple": "AAPL",
-        "tesla": "TSLA",
-        "google": "GOOG",
-        "microsoft": "MSFT",
-        "bitcoin": "BTC-USD",
-        "ethereum": "ETH-USD",
-        "btc": "BTC-USD",
-        "eth": "ETH-USD",
-        "nvidia": "NVDA",
-        "meta": "META",
-        "amazon": "AMZN"
-    }
-    
-    tickers = []
-    goal_lower = goal.lower()
-    for name, symbol in ticker_map.items():
-        if name in goal_lower:
-            tickers.append(symbol)
-    
-    # Also look for uppercase tickers (3-5 chars)
-    # This is a basic regex, might match non-tickers, but helps for unknowns
-    potential_tickers = re.findall(r'\b[A-Z]{3,5}\b', goal)
-    # Filter common words if necessary, for now we just add them if not already found
-    for pt in potential_tickers:
-        if pt not in tickers and pt not in ["AND", "FOR", "THE", "WITH"]:
-             tickers.append(pt)
-             
-    return list(set(tickers))
+    from goal_analyzer import analyze_goal
+    return analyze_goal(goal)["tickers"]